@@ -1,9 +1,70 @@
 from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from dataclasses import dataclass, asdict, field
 import pandas as pd
+import argparse
+import asyncio
 import os
 import time
 import json
+import urllib.request
+
+
+# Bisa diarahkan ke fixture server lokal dengan --maps-url
+MAPS_URL = "https://www.google.com/maps"
+HEADLESS = False
+# Proxy cache aset statis bersama (Google_Maps_Scraping_v02/cache_proxy.py), diisi dengan --asset-proxy
+ASSET_PROXY = None
+ASSET_PROXY_SPKI = ""
+LISTING_SELECTOR = 'a[href*="/maps/place/"]'
+NAME_SELECTOR = "h1.DUwDvf"
+END_OF_LIST_SELECTOR = "span.HlvSq"
+# Satu round trip per tempat: semua field mentah panel detail dibaca sekaligus.
+# Salinan dari Google_Maps_Scraping_v02/place_panel.js (dipakai App_2.0.py); ubah keduanya bersamaan.
+PLACE_PANEL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "place_panel.js")
+with open(PLACE_PANEL_FILE, encoding="utf-8") as file:
+    PLACE_PANEL_JS = file.read()
+# Profil blokir: (resource type, potongan URL). Extractor hanya membaca teks, aria-label
+# dan URL, jadi gambar, tile peta, font dan media bisa dibatalkan tanpa memengaruhi data.
+BLOCK_PROFILES = {
+    "off": (set(), ()),
+    "media": (
+        {"image", "font", "media"},
+        ("/maps/vt", "/kh/v", "khms", "streetviewpixels", "googleusercontent.com", "ggpht.com", "fonts.gstatic.com"),
+    ),
+}
+# Scroll feed sekali lalu selesai begitu kartu baru muncul atau penanda "akhir daftar" terlihat
+FEED_WATCH_JS = """
+([cardSelector, endSelector, timeout, total]) => new Promise(resolve => {
+    const feed = document.querySelector('div[role="feed"]');
+    const count = () => document.querySelectorAll(cardSelector).length;
+    const ended = () => document.querySelector(endSelector) !== null;
+    const before = count();
+    if (!feed || ended() || before >= total) {
+        resolve({count: before, ended: !feed || ended(), stalled: false});
+        return;
+    }
+    let timer = null;
+    const observer = new MutationObserver(() => {
+        if (count() > before || ended()) {
+            finish(false);
+        }
+    });
+    function finish(stalled) {
+        observer.disconnect();
+        clearTimeout(timer);
+        resolve({count: count(), ended: ended(), stalled: stalled});
+    }
+    observer.observe(feed, {childList: true, subtree: true});
+    timer = setTimeout(() => finish(true), timeout);
+    feed.scrollTop = feed.scrollHeight;
+})
+"""
+# Batas waktu menunggu event (bukan jeda tetap); hanya tercapai kalau halaman memang tidak berubah
+EVENT_TIMEOUT = 15000
+# Halaman detail yang gagal sebanyak ini berturut-turut dianggap rusak dan berhenti mengambil URL
+PAGE_FAILURE_LIMIT = 3
 
 
 @dataclass
@@ -25,10 +86,34 @@ class Business:
 
 @dataclass
 class BusinessList:
-    """Holds list of Business objects and provides methods to save data"""
+    """Holds list of Business objects and provides methods to save data
+
+    The browser loop only captures the raw PLACE_PANEL_JS fields of each
+    place; from_snapshots parses them afterwards, outside the loop, and the
+    raw snapshots are kept in <filename>.raw.jsonl for --reparse.
+    """
     business_list: list[Business] = field(default_factory=list)
     save_at = "output"
 
+    @classmethod
+    def from_snapshots(cls, snapshots):
+        business_list = cls()
+        for raw in snapshots:
+            try:
+                business_list.business_list.append(business_from_panel(raw))
+            except Exception as e:
+                print(f"Error occurred: {e} ({raw.get('url')})")
+        return business_list
+
+    @classmethod
+    def save_raw(cls, snapshots, filename):
+        """Saves raw panel snapshots as JSON lines"""
+        if not os.path.exists(cls.save_at):
+            os.makedirs(cls.save_at)
+        with open(f"{cls.save_at}/{filename}.raw.jsonl", "w", encoding="utf-8") as file:
+            for raw in snapshots:
+                file.write(json.dumps(raw, ensure_ascii=False) + "\n")
+
     def dataframe(self):
         """Transforms business_list to pandas dataframe"""
         return pd.json_normalize(
@@ -48,6 +133,56 @@ class BusinessList:
         self.dataframe().to_csv(f"{self.save_at}/{filename}.csv", index=False)
 
 
+def save_results(filename, snapshots):
+    """Keeps the raw snapshots of one search term, then parses them into the xlsx and csv output."""
+    BusinessList.save_raw(snapshots, filename)
+    business_list = BusinessList.from_snapshots(snapshots)
+    business_list.save_to_excel(filename)
+    business_list.save_to_csv(filename)
+
+
+def output_name(search_for):
+    return f"google_maps_data_{search_for}".replace(" ", "_")
+
+
+def reparse(raw_path):
+    """Rebuilds the xlsx and csv output of a search term from its .raw.jsonl, without a browser."""
+    with open(raw_path, encoding="utf-8") as file:
+        snapshots = [json.loads(line) for line in file if line.strip()]
+    filename = os.path.basename(raw_path)
+    if filename.endswith(".raw.jsonl"):
+        filename = filename[:-len(".raw.jsonl")]
+    business_list = BusinessList.from_snapshots(snapshots)
+    business_list.save_to_excel(filename)
+    business_list.save_to_csv(filename)
+    print(f"{len(business_list.business_list)} places re-parsed into {BusinessList.save_at}/{filename}.csv")
+
+
+class TransferStats:
+    """Bytes transferred (from CDP Network.loadingFinished) and per-place latency of a run."""
+
+    def __init__(self):
+        self.bytes = 0
+        self.place_seconds = []
+
+    def on_loading_finished(self, params):
+        self.bytes += params.get("encodedDataLength", 0)
+
+    def report(self, block_profile):
+        places = len(self.place_seconds)
+        average = sum(self.place_seconds) / places if places else 0
+        print(
+            f"Block profile '{block_profile}': {self.bytes / 1_000_000:.1f} MB transferred, "
+            f"{places} places, {average:.2f} s/place"
+        )
+
+
+def should_block(request, block_profile):
+    """True if the request belongs to a resource class the block profile aborts."""
+    resource_types, url_patterns = BLOCK_PROFILES[block_profile]
+    return request.resource_type in resource_types or any(pattern in request.url for pattern in url_patterns)
+
+
 def extract_coordinates_from_url(url: str) -> tuple[float, float]:
     """Helper function to extract coordinates from a URL"""
     coordinates = url.split("!3d")[1].split("!4d")
@@ -70,6 +205,55 @@ def format_phone_number(phone: str):
     return phone
 
 
+def apply_address(business: Business, address: str):
+    """Fills address, district, city, province and postal_code from the panel address."""
+    business.address = address
+    # Pisahkan alamat berdasarkan koma
+    address_parts = address.split(",")
+    if len(address_parts) >= 4:
+        business.district = address_parts[-3].strip()  # Kecamatan
+        business.city = address_parts[-2].strip()      # Kabupaten/Kota
+        province_and_postal = address_parts[-1].strip()        # Provinsi + kode pos
+        business.province = " ".join(province_and_postal.split()[:-1])  # Nama provinsi tanpa kode pos
+        business.postal_code = province_and_postal[-5:]     # Kode Pos
+    else:
+        business.district = business.city = business.province = business.postal_code = ""
+
+
+def parse_reviews_count(label: str) -> str:
+    """Turns a review count aria-label such as '1.234 ulasan' into '1234'."""
+    return str(label.split()[0].replace(".", "").strip())
+
+
+def parse_rating(label: str) -> float:
+    """Turns a rating aria-label such as '4,5 bintang' into 4.5."""
+    return float(label.split()[0].replace(",", ".").strip())
+
+
+def business_from_panel(raw: dict) -> Business:
+    """Builds a Business from the raw fields returned by PLACE_PANEL_JS."""
+    business = Business()
+    business.location_link = raw["url"]
+
+    if raw["name"]:
+        business.name = raw["name"]
+
+    if raw["address"]:
+        apply_address(business, raw["address"])
+
+    if raw["phone"]:
+        business.phone_number = format_phone_number(raw["phone"])
+
+    if raw["reviews_label"]:
+        business.reviews = parse_reviews_count(raw["reviews_label"])
+
+    if raw["rating_label"]:
+        business.rating = parse_rating(raw["rating_label"])
+
+    business.latitude, business.longitude = extract_coordinates_from_url(raw["url"])
+    return business
+
+
 # def load_config(config_file='config.json'):
 #     """Load configuration from config.json"""
 #     with open(config_file, 'r', encoding="utf-8") as file:
@@ -93,23 +277,71 @@ def load_config():
     }
 
 
-def main():
-    start_time = time.time()
-    print("Script dimulai.")
+def feed_finished(result, total):
+    """Prints a FEED_WATCH_JS result and tells whether scrolling should stop."""
+    if result["count"] >= total:
+        return True
+    if result["ended"]:
+        print("Arrived at all available")
+        return True
+    if result["stalled"]:
+        print("Feed stopped growing")
+        return True
+    print("Currently Scraped: ", result["count"])
+    return False
 
-    # Load configuration
-    config = load_config()
-    search_list = config.get("search_terms", [])
-    total = config.get("max_results", 1000)
 
+def scroll_feed(page, total):
+    """Scrolls the results feed until total listings are loaded or the end-of-list marker shows.
+
+    Each step is a single page.evaluate that resolves as soon as a
+    MutationObserver sees new cards, instead of wheel + 3 s sleep.
+    """
+    while True:
+        result = page.evaluate(FEED_WATCH_JS, [LISTING_SELECTOR, END_OF_LIST_SELECTOR, EVENT_TIMEOUT, total])
+        if feed_finished(result, total):
+            break
+
+    listings = page.locator(LISTING_SELECTOR).all()[:total]
+    print(f"Total Scraped: {len(listings)}")
+    return listings
+
+
+def launch_options():
+    """Keyword arguments of chromium.launch: headless mode and the optional asset cache proxy."""
+    options = {"headless": HEADLESS}
+    if ASSET_PROXY:
+        options["proxy"] = {"server": ASSET_PROXY}
+        if ASSET_PROXY_SPKI:
+            options["args"] = [f"--ignore-certificate-errors-spki-list={ASSET_PROXY_SPKI}"]
+    return options
+
+
+def fetch_proxy_spki(proxy_url):
+    # Kunci sertifikat yang dipakai proxy untuk membuka HTTPS aset Maps ("" bila tidak dibuka)
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    with opener.open(f"{proxy_url.rstrip('/')}/spki", timeout=10) as response:
+        return response.read().decode("ascii").strip()
+
+
+def sync_main(search_list, total, block_profile, stats):
     ###########
     # Scraping
     ###########
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
+        browser = p.chromium.launch(**launch_options())
         page = browser.new_page()
 
-        page.goto("https://www.google.com/maps", timeout=60000)
+        if block_profile != "off":
+            page.route(
+                "**/*",
+                lambda route: route.abort() if should_block(route.request, block_profile) else route.continue_(),
+            )
+        client = page.context.new_cdp_session(page)
+        client.send("Network.enable")
+        client.on("Network.loadingFinished", stats.on_loading_finished)
+
+        page.goto(MAPS_URL, timeout=60000)
         page.wait_for_timeout(5000)
 
         for search_for_index, search_for in enumerate(search_list):
@@ -118,130 +350,230 @@ def main():
             page.locator('//input[@id="searchboxinput"]').fill(search_for)
             page.wait_for_timeout(3000)
             page.keyboard.press("Enter")
-            page.wait_for_timeout(5000)
 
             # Scrolling
-            page.hover('//a[contains(@href, "https://www.google.com/maps/place")]')
-
-            previously_counted = 0
-            while True:
-                page.mouse.wheel(0, 10000)
-                page.wait_for_timeout(3000)
-
-                if (
-                    page.locator(
-                        '//a[contains(@href, "https://www.google.com/maps/place")]'
-                    ).count()
-                    >= total
-                ):
-                    listings = page.locator(
-                        '//a[contains(@href, "https://www.google.com/maps/place")]'
-                    ).all()[:total]
-                    listings = [listing.locator("xpath=..") for listing in listings]
-                    print(f"Total Scraped: {len(listings)}")
-                    break
-                else:
-                    if (
-                        page.locator(
-                            '//a[contains(@href, "https://www.google.com/maps/place")]'
-                        ).count()
-                        == previously_counted
-                    ):
-                        listings = page.locator(
-                            '//a[contains(@href, "https://www.google.com/maps/place")]'
-                        ).all()
-                        print(
-                            f"Arrived at all available\nTotal Scraped: {len(listings)}"
-                        )
-                        break
-                    else:
-                        previously_counted = page.locator(
-                            '//a[contains(@href, "https://www.google.com/maps/place")]'
-                        ).count()
-                        print(
-                            f"Currently Scraped: ",
-                            page.locator(
-                                '//a[contains(@href, "https://www.google.com/maps/place")]'
-                            ).count(),
-                        )
-
-            business_list = BusinessList()
+            page.wait_for_selector(LISTING_SELECTOR, timeout=EVENT_TIMEOUT)
+            listings = scroll_feed(page, total)
+
+            snapshots = []
 
             for listing in listings:
                 try:
+                    started = time.time()
                     listing.click()
                     page.wait_for_timeout(5000)
 
-                    business = Business()
-                    business.location_link = page.url
-                    name_attribute = "aria-label"
-                    name_xpath = '//h1[@class="DUwDvf lfPIob"]'
-                    address_xpath = '//button[@data-item-id="address"]//div[contains(@class, "fontBodyMedium")]'
-                    phone_xpath = '//button[contains(@data-item-id, "phone:tel:")]//div[contains(@class, "fontBodyMedium")]'
-                    review_count_xpath = "//div[2]/span[2]/span/span"
-                    reviews_xpath = '//div[@jsaction="pane.reviewChart.moreReviews"]//div[@role="img"]'
-
-                    if page.locator(name_xpath).count() > 0:
-                        business.name = page.locator(name_xpath).inner_text()
-
-                    if page.locator(address_xpath).count() > 0:
-                        address = page.locator(address_xpath).inner_text()
-                        business.address = address
-                        # Pisahkan alamat berdasarkan koma
-                        address_parts = address.split(",")
-                        if len(address_parts) >= 4:
-                            business.district = address_parts[-3].strip()  # Kecamatan
-                            business.city = address_parts[-2].strip()      # Kabupaten/Kota
-                            province_and_postal = address_parts[-1].strip()        # Provinsi + kode pos
-                            business.province = " ".join(province_and_postal.split()[:-1])  # Nama provinsi tanpa kode pos
-                            business.postal_code = province_and_postal[-5:]     # Kode Pos
-                            # business.province = address_parts[-1].strip()   # Provinsi
-                            # business.postal_code = business.province[-5:]  # Kode Pos
-                        else:
-                            business.district = business.city = business.province = business.postal_code = ""
-
-                    if page.locator(phone_xpath).count() > 0:
-                        business.phone_number = page.locator(phone_xpath).inner_text()
-                        business.phone_number = format_phone_number(business.phone_number)
-
-                    if page.locator(review_count_xpath).count() > 0:
-                        business.reviews = str(
-                            page.locator(review_count_xpath)
-                            .get_attribute(name_attribute)
-                            .split()[0]
-                            .replace(".", "")
-                            .strip()
-                        )
-
-                    if page.locator(reviews_xpath).count() > 0:
-                        business.rating = float(
-                            page.locator(reviews_xpath)
-                            .get_attribute(name_attribute)
-                            .split()[0]
-                            .replace(",", ".")
-                            .strip()
-                        )
-
-                    business.latitude, business.longitude = (
-                        extract_coordinates_from_url(page.url)
-                    )
-
-                    business_list.business_list.append(business)
+                    # Hanya field mentah yang dibaca di sini; parsing dilakukan setelah loop browser
+                    snapshots.append(page.evaluate(PLACE_PANEL_JS))
+                    stats.place_seconds.append(time.time() - started)
                 except Exception as e:
                     print(f"Error occurred: {e}")
 
             #########
             # Output
             #########
-            business_list.save_to_excel(
-                f"google_maps_data_{search_for}".replace(" ", "_")
-            )
-            business_list.save_to_csv(
-                f"google_maps_data_{search_for}".replace(" ", "_")
-            )
+            save_results(output_name(search_for), snapshots)
 
         browser.close()
 
+
+
+async def search_async(page, search_for):
+    """Submits a search and waits for the first result cards instead of a fixed sleep."""
+    await page.locator('//input[@id="searchboxinput"]').fill(search_for)
+    await page.keyboard.press("Enter")
+    await page.wait_for_selector(LISTING_SELECTOR, timeout=EVENT_TIMEOUT)
+
+
+async def scroll_feed_async(page, total):
+    """Async counterpart of scroll_feed; returns the href of the first total cards."""
+    while True:
+        result = await page.evaluate(FEED_WATCH_JS, [LISTING_SELECTOR, END_OF_LIST_SELECTOR, EVENT_TIMEOUT, total])
+        if feed_finished(result, total):
+            break
+
+    links = await page.eval_on_selector_all(
+        LISTING_SELECTOR, "(cards, total) => cards.slice(0, total).map(card => card.href)", total
+    )
+    print(f"Total Scraped: {len(links)}")
+    return links
+
+
+async def extract_snapshot_async(page):
+    """Reads the raw fields of the open detail panel in a single round trip."""
+    return await page.evaluate(PLACE_PANEL_JS)
+
+
+async def open_page(context, block_profile, stats):
+    """A new page of the shared context with the block profile and transfer counter attached."""
+    page = await context.new_page()
+
+    if block_profile != "off":
+        async def handle_route(route):
+            if should_block(route.request, block_profile):
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await page.route("**/*", handle_route)
+    client = await context.new_cdp_session(page)
+    await client.send("Network.enable")
+    client.on("Network.loadingFinished", stats.on_loading_finished)
+    return page
+
+
+async def search_worker(context, search_list, total, details, block_profile, stats):
+    """Runs every search once on a single page and queues the card URLs for the detail pages."""
+    page = await open_page(context, block_profile, stats)
+    try:
+        await page.goto(MAPS_URL, timeout=60000)
+        await page.wait_for_selector("#searchboxinput", timeout=60000)
+
+        for search_for in search_list:
+            print(f"-----\n{search_for}")
+            try:
+                await search_async(page, search_for)
+                links = await scroll_feed_async(page, total)
+            except PlaywrightTimeoutError:
+                print(f"Tidak ada hasil untuk {search_for}")
+                continue
+            for index, url in enumerate(links):
+                await details.put((search_for, index, url))
+    finally:
+        await page.close()
+
+
+async def detail_worker(context, details, results, block_profile, stats):
+    """Opens queued place URLs on its own page until it receives None.
+
+    Raises RuntimeError after PAGE_FAILURE_LIMIT places in a row fail, so a
+    broken page stops taking URLs away from the pages that still work.
+    """
+    page = await open_page(context, block_profile, stats)
+    failures = 0
+    try:
+        while True:
+            job = await details.get()
+            if job is None:
+                return
+            search_for, index, url = job
+            try:
+                started = time.time()
+                # URL dari href kartu langsung membuka panel detail, tanpa klik dan tanpa menunggu judul berganti
+                await page.goto(url, timeout=EVENT_TIMEOUT)
+                await page.wait_for_selector(NAME_SELECTOR, timeout=EVENT_TIMEOUT)
+                snapshot = await extract_snapshot_async(page)
+                results[search_for].append((index, snapshot))
+                stats.place_seconds.append(time.time() - started)
+                failures = 0
+            except Exception as e:
+                print(f"Error occurred: {e} ({url})")
+                failures += 1
+                if failures >= PAGE_FAILURE_LIMIT:
+                    raise RuntimeError(f"{failures} places in a row failed on this page") from e
+    finally:
+        await page.close()
+
+
+async def async_main(search_list, total, pages, block_profile, stats):
+    """Scrapes every search term in one browser context: one search page, pages detail pages.
+
+    Each search and scroll runs once; only opening the places is spread over
+    the detail pages. A page that fails is reported and the others keep
+    going, and URLs no detail page was left to open are counted as lost.
+    """
+    details = asyncio.Queue()
+    results = {search_for: [] for search_for in search_list}
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(**launch_options())
+        context = await browser.new_context()
+        workers = [
+            asyncio.create_task(detail_worker(context, details, results, block_profile, stats))
+            for _ in range(pages)
+        ]
+        try:
+            await search_worker(context, search_list, total, details, block_profile, stats)
+        except Exception as e:
+            print(f"Search page failed: {e!r}")
+        finally:
+            for _ in workers:
+                details.put_nowait(None)
+        for outcome in await asyncio.gather(*workers, return_exceptions=True):
+            if isinstance(outcome, Exception):
+                print(f"Detail page failed: {outcome!r}")
+        await browser.close()
+
+    # Sisa antrean selain tanda berhenti adalah tempat yang tidak sempat dibuka
+    unopened = [job for job in (details.get_nowait() for _ in range(details.qsize())) if job is not None]
+    if unopened:
+        print(f"{len(unopened)} places were not opened because every detail page failed")
+
+    for search_for, scraped in results.items():
+        snapshots = [snapshot for _, snapshot in sorted(scraped, key=lambda item: item[0])]
+        save_results(output_name(search_for), snapshots)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Google Maps Scraper")
+    parser.add_argument(
+        "--engine", choices=["sync", "async"], default="sync",
+        help="sync: satu halaman dengan jeda tetap, async: beberapa halaman dengan wait berbasis event"
+    )
+    parser.add_argument(
+        "--pages", type=int, default=4,
+        help="Jumlah halaman detail paralel untuk engine async (ditambah satu halaman pencarian)"
+    )
+    parser.add_argument(
+        "--block-profile", choices=sorted(BLOCK_PROFILES), default="off",
+        help="media: batalkan request gambar, tile peta, font dan media"
+    )
+    parser.add_argument(
+        "--maps-url", default=MAPS_URL,
+        help="URL Google Maps; arahkan ke fixture server untuk uji offline"
+    )
+    parser.add_argument(
+        "--headless", action="store_true",
+        help="Jalankan browser tanpa jendela"
+    )
+    parser.add_argument(
+        "--reparse",
+        help="Bangun ulang output dari file .raw.jsonl tanpa browser, mis. output/google_maps_data_x.raw.jsonl"
+    )
+    parser.add_argument(
+        "--asset-proxy",
+        help="Proxy cache aset statis Maps yang sedang berjalan, mis. http://127.0.0.1:8899"
+    )
+    return parser.parse_args()
+
+
+def main():
+    start_time = time.time()
+    print("Script dimulai.")
+
+    args = parse_args()
+    if args.reparse:
+        reparse(args.reparse)
+        return
+    global MAPS_URL, HEADLESS, ASSET_PROXY, ASSET_PROXY_SPKI
+    MAPS_URL = args.maps_url.rstrip("/")
+    HEADLESS = args.headless
+    if args.asset_proxy:
+        ASSET_PROXY = args.asset_proxy
+        ASSET_PROXY_SPKI = fetch_proxy_spki(args.asset_proxy)
+
+    # Load configuration
+    config = load_config()
+    search_list = config.get("search_terms", [])
+    total = config.get("max_results", 1000)
+
+    stats = TransferStats()
+    if args.engine == "async":
+        asyncio.run(async_main(search_list, total, max(1, args.pages), args.block_profile, stats))
+    else:
+        sync_main(search_list, total, args.block_profile, stats)
+    stats.report(args.block_profile)
+
     end_time = time.time()
     total_duration = (end_time - start_time) / 60
     print(f"Script selesai dijalankan dalam {total_duration:.2f} Menit.")
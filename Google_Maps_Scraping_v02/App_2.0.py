@@ -1,6 +1,14 @@
+import argparse
+import itertools
+import math
 import os
 import pandas as pd
+import queue
 import re
+import socket
+import subprocess
+import sys
+import threading
 import time
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -8,9 +16,23 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import List
 import json
+from cache_proxy import CachingProxy, fetch_spki
+from dedupe import DEFAULT_NAME_THRESHOLD, DEFAULT_RADIUS_M, merge_near_duplicates
+from driver_health import DriverHealth
+from metrics import NULL_METRICS, LiveProgress, StageMetrics
+from normalize import RAW_FIELDS, BatchNormalizer, normalize_batch
+from place_index import PlaceIndex
+from progress import ProgressStore
+from rate_control import RateController, backoff_seconds, blocked_page_reason
+from search_parser import SEARCH_RESPONSE_MARKER, parse_app_initialization_state, parse_search_response
+from refresh import RefreshIndex
+from sink import ParquetSink, StreamingSink, format_of, iter_records, write_xlsx
+from work_queue import LeaseHeartbeat, WorkQueue
+from urllib.parse import quote_plus, unquote
 
 
 @dataclass
@@ -33,16 +55,109 @@ class Business:
 
 
 class BusinessList:
-    """Holds list of Business objects and provides methods to save data"""
-    business_list: List[Business] = []  # Directly use list here
+    """Holds list of Business objects and provides methods to save data
+
+    With a sink, every Business is streamed to disk as soon as it is added
+    and nothing is kept in memory. Raw panel snapshots (add_raw) are kept in
+    <filename>.raw.jsonl and turned into Business records by a normalizer.
+    """
     save_at = "output"
+    # Kolom yang tidak ikut ke file output
+    excluded_columns = ['category', 'zone']
+    numeric_columns = ('reviews_amount', 'latitude', 'longitude')
+
+    def __init__(self, sink: StreamingSink = None):
+        self.business_list: List[Business] = []
+        self.sink = sink
+        self.raw_sink: StreamingSink = None
+        self.normalizer: BatchNormalizer = None
+
+    @classmethod
+    def columns(cls):
+        return [name for name in Business.__dataclass_fields__ if name not in cls.excluded_columns]
+
+    @classmethod
+    def streaming(cls, filename, fmt="csv", batch_size=50, append=False, on_flush=None, parse_workers=0,
+                  capture_raw=True):
+        """BusinessList that streams into output/<filename>.<fmt>.
+
+        parse_workers > 0 normalizes raw snapshots in that many worker
+        processes; 0 parses each batch in the thread that completes it.
+        fmt="parquet" writes a dataset directory partitioned by category and zone.
+        """
+        # Saat dilanjutkan, tempat yang sudah ada di file tidak ditulis dua kali
+        key = lambda record: place_key(record.get("googlemaps_link"))
+        if fmt == "parquet":
+            sink = ParquetSink(
+                f"{cls.save_at}/{filename}.parquet", cls.columns(),
+                batch_size=batch_size, append=append, on_flush=on_flush, key=key
+            )
+        else:
+            sink = StreamingSink(
+                f"{cls.save_at}/{filename}.{fmt}", cls.columns(), fmt=fmt,
+                batch_size=batch_size, append=append, on_flush=on_flush, key=key
+            )
+        business_list = cls(sink)
+        if capture_raw:
+            business_list.raw_sink = StreamingSink(
+                f"{cls.save_at}/{filename}.raw.jsonl", RAW_FIELDS, fmt="jsonl", batch_size=batch_size, append=append
+            )
+        business_list.normalizer = BatchNormalizer(business_list.add_records, workers=parse_workers, batch_size=batch_size)
+        return business_list
+
+    def add(self, business: Business):
+        if self.sink is None:
+            self.business_list.append(business)
+            return
+        if isinstance(self.sink, ParquetSink):
+            # Kategori dan zona menjadi folder partisi, bukan kolom di file
+            record = dict(business.__dict__)
+        else:
+            record = {k: v for k, v in business.__dict__.items() if k not in self.excluded_columns}
+        self.sink.write(record, source=business)
+
+    def add_raw(self, snapshot: dict):
+        """Stores the raw fields of one place; the Business is built by the normalizer."""
+        if self.raw_sink is not None:
+            self.raw_sink.write(snapshot)
+        if self.normalizer is None:
+            self.add_records(normalize_batch([snapshot]))
+        else:
+            self.normalizer.submit(snapshot)
+
+    def add_records(self, records):
+        for record in records:
+            self.add(Business(**record))
+
+    def flush(self):
+        """Normalizes every pending snapshot and flushes the sinks."""
+        if self.normalizer is not None:
+            self.normalizer.drain()
+        if self.raw_sink is not None:
+            self.raw_sink.flush()
+        if self.sink is not None:
+            self.sink.flush()
+
+    def close(self, filename=None):
+        """Closes the sinks and, given a filename, builds output/<filename>.xlsx from the streamed file."""
+        if self.normalizer is not None:
+            self.normalizer.close()
+        if self.raw_sink is not None:
+            self.raw_sink.close()
+        self.sink.close()
+        if filename is None:
+            return
+        write_xlsx(
+            self.sink.path, f"{self.save_at}/{filename}.xlsx", self.columns(),
+            fmt=self.sink.fmt, numeric_fields=self.numeric_columns
+        )
 
     def dataframe(self):
         """Transforms business_list to pandas dataframe without 'category' and 'zone'."""
         # Convert dataclass objects to dictionary
         data = [business.__dict__ for business in self.business_list]
         # Exclude 'category' and 'zone' columns
-        filtered_data = [{k: v for k, v in item.items() if k not in ['category', 'zone']} for item in data]
+        filtered_data = [{k: v for k, v in item.items() if k not in self.excluded_columns} for item in data]
         # Convert to DataFrame
         return pd.DataFrame(filtered_data)
 
@@ -61,10 +176,27 @@ class BusinessList:
 
 # Constants
 INVALID_WEBSITE_NAMES = {}
+# Bisa diarahkan ke fixture server lokal dengan --maps-url
+MAPS_URL = "https://www.google.com/maps"
+# Percobaan ulang satu permintaan halaman setelah timeout, sebelum pencarian dianggap gagal
+MAX_REQUEST_RETRIES = 2
+# Berapa kali satu pencarian diulang setelah halaman CAPTCHA/consent sebelum menyerah
+MAX_BLOCK_RETRIES = 3
+# Percobaan menyalakan ulang satu sesi Chrome daemon sebelum slotnya dilepas dari pool
+MAX_REPLACE_ATTEMPTS = 3
+# Satu pencarian berhenti di sekitar 100-120 hasil; tile yang mencapai batas ini dipecah
+RESULT_CAP = 100
+MAX_TILE_ZOOM = 18
+# Ukuran jendela Chrome, dipakai untuk menghitung luas area yang terlihat di setiap zoom
+VIEWPORT = (1366, 768)
+
+
+def load_config(spec_path=None):
+    """Load configuration from user input, or from a JSON spec file when one is given."""
+    if spec_path:
+        with open(spec_path, encoding="utf-8") as file:
+            return json.load(file)
 
-def load_config():
-    """Load configuration from user input."""
-    
     # Meminta pengguna memasukkan kategori yang dipisahkan dengan koma
     categories_input = input("Masukkan kategori (pisahkan dengan koma): ")
     categories = [category.strip() for category in categories_input.split(",") if category.strip()]
@@ -89,22 +221,166 @@ def load_config():
     }
 
 
-def open_google_maps():
+# Pola URL yang diblokir lewat CDP Network.setBlockedURLs. Extractor hanya membaca teks,
+# aria-label dan URL, jadi gambar, tile peta, font dan media tidak dibutuhkan.
+# XHR hasil pencarian (/search?tbm=map, /maps/preview/...) tidak termasuk.
+BLOCK_PROFILES = {
+    "off": [],
+    "media": [
+        "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.ico*", "*.svg*",
+        "*.woff*", "*.ttf*", "*.otf*", "*.mp4*", "*.webm*",
+        "*/maps/vt*", "*/kh/v*", "*khms*.googleapis.com*", "*streetviewpixels*",
+        "*googleusercontent.com*", "*ggpht.com*", "*fonts.gstatic.com*",
+    ],
+}
+
+
+class TransferStats:
+    """Bytes transferred (from Chrome performance logs) and per-place latency of a run."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bytes = 0
+        self.place_seconds = []
+
+    def add_place(self, seconds):
+        with self.lock:
+            self.place_seconds.append(seconds)
+
+    def add_messages(self, messages):
+        """Adds up encodedDataLength of every finished request in the performance log messages."""
+        total = sum(
+            message["params"].get("encodedDataLength", 0)
+            for message in messages
+            if message["method"] == "Network.loadingFinished"
+        )
+        with self.lock:
+            self.bytes += total
+
+    def report(self, block_profile):
+        places = len(self.place_seconds)
+        average = sum(self.place_seconds) / places if places else 0
+        print(
+            f"📊 Block profile '{block_profile}': {self.bytes / 1_000_000:.1f} MB transferred, "
+            f"{places} places, {average:.2f} s/place"
+        )
+
+
+def read_performance_log(driver):
+    """CDP messages logged by Chrome since the last call (needs log_network)."""
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return []
+    return [json.loads(entry["message"])["message"] for entry in entries]
+
+
+def open_google_maps(blocked_urls=(), log_network=False, user_data_dir=None, proxy=None, proxy_spki=None):
     # Open webdriver
     chrome_options = Options()
     chrome_options.add_argument("--headless=new") # for Chrome >= 109
     chrome_options.add_argument("--disable-usb-discovery")
+    chrome_options.add_argument(f"--window-size={VIEWPORT[0]},{VIEWPORT[1]}")
+    if user_data_dir:
+        # Profil persisten: cookie persetujuan dan cache HTTP aset Maps dipakai ulang
+        chrome_options.add_argument(f"--user-data-dir={os.path.abspath(user_data_dir)}")
+    if proxy:
+        # Aset statis Maps diambil lewat proxy cache bersama (cache_proxy.py)
+        chrome_options.add_argument(f"--proxy-server={proxy}")
+        # Tanpa ini Chrome melewati proxy untuk localhost, termasuk fixture server
+        chrome_options.add_argument("--proxy-bypass-list=<-loopback>")
+        if proxy_spki:
+            chrome_options.add_argument(f"--ignore-certificate-errors-spki-list={proxy_spki}")
+    if log_network:
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
     driver = webdriver.Chrome(options=chrome_options)
-    driver.get('https://www.google.com/maps')
+    if blocked_urls:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(blocked_urls)})
+    driver.get(MAPS_URL)
     print("⭐ Webdriver started")
     return driver
 
 
+def browser_pid(driver):
+    """PID of the chromedriver process; Chrome and its renderers are its descendants."""
+    try:
+        return driver.service.process.pid
+    except AttributeError:
+        return None
+
+
+class RecycleDriver(Exception):
+    """Raised in the middle of a search when the worker's Chrome should be replaced."""
+
+
+class PageBlocked(Exception):
+    """Raised when Google answered with a CAPTCHA or consent page instead of Maps."""
+
+
+def extract_place_id(url):
+    """Stable place identifier from a Maps URL: the 0x…:0x… feature ID, else the /g/… id."""
+    if not url:
+        return None
+    match = re.search(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)", url)
+    if match:
+        return match.group(1)
+    match = re.search(r"!16s([^!?&]+)", url)
+    if match:
+        return unquote(match.group(1))
+    return None
+
+
+def place_key(url):
+    """Dedup/progress key of a place URL; the URL itself when it carries no ID."""
+    return extract_place_id(url) or url
+
+
 def wait_for_elements(driver, by, value, waittime=10):
     elements_present = EC.presence_of_all_elements_located((by, value))
     WebDriverWait(driver, 10).until(elements_present)
 
 
+def current_url(driver):
+    try:
+        return driver.current_url
+    except Exception:
+        return ""
+
+
+def rate_limited(session, driver, action, *args, panel=False):
+    """Runs one page request, action(*args), under session.rate; returns (result, seconds).
+
+    seconds only covers the action itself, not the wait for a slot, a token
+    or a CAPTCHA pause. Only place panel opens (panel=True) feed their
+    latency to the AIMD limit: searches are slower than a panel by nature,
+    and an empty search only returns after the full wait.
+
+    A timeout is retried up to MAX_REQUEST_RETRIES times after a jittered
+    backoff. A timeout on a CAPTCHA or consent page is not: every worker is
+    paused and PageBlocked tells the caller to start its search over.
+    """
+    for attempt in itertools.count():
+        with session.rate.slot():
+            started = time.time()
+            try:
+                result = action(*args)
+            except TimeoutException:
+                reason = blocked_page_reason(current_url(driver))
+                if reason:
+                    cooldown = session.rate.blocked()
+                    raise PageBlocked(f"{reason} page, all workers paused for {cooldown:.0f} s")
+                session.rate.timeout()
+                if attempt >= MAX_REQUEST_RETRIES:
+                    raise
+            else:
+                seconds = time.time() - started
+                if panel:
+                    session.rate.success(seconds)
+                return result, seconds
+        time.sleep(session.rate.retry_delay(attempt))
+
+
 def search_for_category(driver, category, zone):
     # Input search category
     search = f"{category} en {zone}"
@@ -116,33 +392,117 @@ def search_for_category(driver, category, zone):
     print(f"⭐ Searching {category} in {zone} ...")
 
 
+# Pencarian selesai dimuat: ada kartu, langsung membuka satu tempat, atau feed berakhir tanpa kartu
+SEARCH_OUTCOME_JS = """
+if (document.querySelector('a.hfpxzc')) return 'cards';
+if (document.querySelector('h1.DUwDvf')) return 'place';
+if (document.querySelector('div[role="feed"] ' + arguments[0])) return 'empty';
+return null;
+"""
+# Panel hasil di kiri; bila ada tapi tetap tanpa kartu, pencarian memang kosong
+RESULTS_PANE_SELECTOR = 'div[role="main"]'
+
+
+def wait_for_search_results(driver, waittime=10):
+    """'cards', 'place' (the search jumped to a single place) or 'empty' once a search has loaded.
+
+    TimeoutException is only raised when the results never rendered, so an
+    empty search is not counted as a slow request by the rate controller.
+    """
+    try:
+        return WebDriverWait(driver, waittime).until(
+            lambda d: d.execute_script(SEARCH_OUTCOME_JS, END_OF_LIST_SELECTOR)
+        )
+    except TimeoutException:
+        if not blocked_page_reason(current_url(driver)) and driver.find_elements(By.CSS_SELECTOR, RESULTS_PANE_SELECTOR):
+            return "empty"
+        raise
+
+
+def open_search(driver, category, zone):
+    search_for_category(driver, category, zone)
+    return wait_for_search_results(driver)
+
+
+def open_tile(driver, tile, category):
+    driver.get(tile.url(category))
+    return wait_for_search_results(driver)
+
+
+def resume_after_block(driver, session):
+    """Waits out the global pause after a CAPTCHA/consent page and reloads Maps on driver."""
+    session.rate.wait_until_resumed()
+    driver.get(MAPS_URL)
+    try:
+        wait_for_elements(driver, By.ID, 'searchboxinput')
+    except TimeoutException:
+        # Masih diblokir: permintaan berikutnya akan memicu jeda yang lebih panjang
+        pass
+
+
 def scroll_into_view(driver, element):
     driver.execute_script("arguments[0].scrollIntoView(true);", element)
 
 
-def scroll_results(driver, current_amount_results, waittime=100):
-    try:
-        wait_for_elements(driver, By.CSS_SELECTOR, '.qjESne.veYFef')
-        elemento = driver.find_element(By.CSS_SELECTOR, '.qjESne.veYFef')
+# Dipasang di halaman: scroll feed sekali lalu selesai begitu kartu baru muncul atau
+# penanda "akhir daftar" terlihat. Timeout hanya pengaman bila halaman macet.
+FEED_WATCH_JS = """
+const [cardSelector, endSelector, timeout] = arguments;
+const done = arguments[arguments.length - 1];
+const feed = document.querySelector('div[role="feed"]');
+const count = () => document.querySelectorAll(cardSelector).length;
+const ended = () => document.querySelector(endSelector) !== null;
+const before = count();
+if (!feed || ended()) {
+    done({count: before, ended: true, stalled: false});
+    return;
+}
+let timer = null;
+const observer = new MutationObserver(() => {
+    if (count() > before || ended()) {
+        finish(false);
+    }
+});
+function finish(stalled) {
+    observer.disconnect();
+    clearTimeout(timer);
+    done({count: count(), ended: ended(), stalled: stalled});
+}
+observer.observe(feed, {childList: true, subtree: true});
+timer = setTimeout(() => finish(true), timeout);
+const loader = feed.querySelector('.qjESne.veYFef');
+if (loader) {
+    loader.scrollIntoView(true);
+}
+feed.scrollTop = feed.scrollHeight;
+"""
+# Satu round trip per tempat: semua field mentah panel detail dibaca sekaligus.
+# File yang sama dibaca App.py (page.evaluate), jadi selektor kedua skrip tidak bisa berbeda.
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "place_panel.js"), encoding="utf-8") as file:
+    PLACE_PANEL_JS = file.read()
+END_OF_LIST_SELECTOR = "span.HlvSq"
+FEED_STALL_TIMEOUT = 15  # detik
 
-        driver.execute_script("arguments[0].scrollIntoView(true);", elemento)
 
-        times_left = 0
-        print(f"⭐ {current_amount_results} results found ...")
-        while times_left < waittime:
-            try:
-                wait_for_elements(driver, By.CSS_SELECTOR, '.hfpxzc')
-                if int(current_amount_results) == int(len(driver.find_elements(By.CLASS_NAME, 'hfpxzc'))):
-                    times_left += 1
-                    time.sleep(0.1)
-                else:
-                    return True
-            except:
-                return False
+def scroll_results(driver):
+    """Scrolls the results feed until Google shows the end-of-list marker.
+
+    Each step is one execute_async_script call that returns as soon as new
+    cards are rendered, so no polling or fixed sleeps are involved.
+    """
+    driver.set_script_timeout(FEED_STALL_TIMEOUT + 5)
+    while True:
+        result = driver.execute_async_script(
+            FEED_WATCH_JS, '.hfpxzc', END_OF_LIST_SELECTOR, FEED_STALL_TIMEOUT * 1000
+        )
+        if result["ended"]:
+            print(f"⭐ {result['count']} results found, end of list reached")
+            return result["count"]
+        if result["stalled"]:
+            print(f"❓ Feed stopped growing at {result['count']} results")
+            return result["count"]
+        print(f"⭐ {result['count']} results found ...")
 
-        return False
-    except:
-        return False
 
 def format_phone_number(phone: str):
     """Format phone number to remove non-numeric characters and add country code if necessary."""
@@ -161,150 +521,1487 @@ def format_phone_number(phone: str):
     return phone
 
 
-def get_place_data(driver, place, previous_url, previous_name, category, location, business_list: BusinessList):
-    # Scroll ke elemen
-    scroll_into_view(driver, place)
-    place.click()
+def parse_address(address):
+    """Splits an address into (full_address, district, city, province, postal_code)."""
+    address_parts = address.split(',')
 
-    try:
-        wait_for_elements(driver, By.CSS_SELECTOR, ".DUwDvf.lfPIob")
-        place_name = re.sub(r"['\"&]", "", driver.find_element(By.CSS_SELECTOR, ".DUwDvf.lfPIob").text)
-    except:
-        place.click()
-        wait_for_elements(driver, By.CSS_SELECTOR, ".DUwDvf.lfPIob")
-        place_name = re.sub(r"['\"&]", "", driver.find_element(By.CSS_SELECTOR, ".DUwDvf.lfPIob").text)
+    # Parsing alamat
+    full_address = re.sub(r'[^\w\s,.]', '', address).strip()
+    district = address_parts[-3].strip()  # Kecamatan
+    city = address_parts[-2].strip()      # Kabupaten/Kota
+    province_and_postal = address_parts[-1].strip()  # Provinsi + kode pos
+    province = " ".join(province_and_postal.split()[:-1])  # Nama provinsi tanpa kode pos
+    postal_code = province_and_postal.split()[-1] if province_and_postal.split()[-1].isdigit() else ""
+    return full_address, district, city, province, postal_code
+
+
+def read_place_panel(driver):
+    """All raw fields of the open detail panel in a single round trip."""
+    return driver.execute_script(f"return ({PLACE_PANEL_JS})();")
 
-    while not((previous_url == driver.current_url) == False and (previous_name == place_name) == False):
+
+def get_place_data(driver, place, previous_url, previous_name, category, location, business_list: BusinessList,
+                   metrics: StageMetrics = NULL_METRICS):
+    # Scroll ke elemen
+    with metrics.timer("click", category, location):
+        scroll_into_view(driver, place)
         place.click()
-        time.sleep(0.3)
+
+    with metrics.timer("panel_wait", category, location):
+        try:
+            wait_for_elements(driver, By.CSS_SELECTOR, ".DUwDvf.lfPIob")
+            place_name = re.sub(r"['\"&]", "", driver.find_element(By.CSS_SELECTOR, ".DUwDvf.lfPIob").text)
+        except:
+            place.click()
+            wait_for_elements(driver, By.CSS_SELECTOR, ".DUwDvf.lfPIob")
+            place_name = re.sub(r"['\"&]", "", driver.find_element(By.CSS_SELECTOR, ".DUwDvf.lfPIob").text)
+
+        while not((previous_url == driver.current_url) == False and (previous_name == place_name) == False):
+            place.click()
+            time.sleep(0.3)
+            wait_for_elements(driver, By.CSS_SELECTOR, ".DUwDvf.lfPIob")
+
+            found = True
+            while found:
+                try:
+                    place_name = re.sub(r"['\"&]", "", driver.find_element(By.CSS_SELECTOR, ".DUwDvf.lfPIob").text)
+                    found = False
+                except:
+                    place.click()
+                    time.sleep(0.3)
+
+    return extract_place_data(driver, place_name, category, location, business_list, metrics)
+
+
+def get_place_data_from_url(driver, url, category, location, business_list: BusinessList,
+                            metrics: StageMetrics = NULL_METRICS):
+    """Opens a place URL taken from a card's href and extracts it, no clicking or polling needed."""
+    with metrics.timer("panel_wait", category, location):
+        driver.get(url)
         wait_for_elements(driver, By.CSS_SELECTOR, ".DUwDvf.lfPIob")
+    return extract_place_data(driver, None, category, location, business_list, metrics)
+
 
-        found = True
-        while found:
+def extract_place_data(driver, place_name, category, location, business_list: BusinessList,
+                       metrics: StageMetrics = NULL_METRICS):
+    """Captures the raw fields of the open detail panel and hands them to business_list.
+
+    Cleanup and address/phone parsing happen later in normalize.py, so the
+    browser moves on to the next place right after this single round trip.
+    """
+    with metrics.timer("extract", category, location):
+        snapshot = read_place_panel(driver)
+    if place_name is not None:
+        snapshot["name"] = place_name
+    snapshot.update(category=category, zone=location)
+
+    with metrics.timer("save", category, location):
+        business_list.add_raw(snapshot)
+
+    return snapshot
+
+
+@dataclass
+class ScrapeSession:
+    """Shared state of one scraping run, handed to every worker."""
+    business_list: BusinessList
+    block_profile: str = "off"
+    transfer_report: bool = False
+    counter: itertools.count = field(default_factory=lambda: itertools.count(1))
+    stats: TransferStats = field(default_factory=TransferStats)
+    fast_mode: bool = False
+    tiling: bool = False
+    zone_tiles: dict = field(default_factory=dict)
+    detail_pool: "DetailPool" = None
+    progress: ProgressStore = None
+    index: PlaceIndex = field(default_factory=PlaceIndex)
+    metrics: StageMetrics = field(default_factory=StageMetrics)
+    live_progress: LiveProgress = None
+    driver_pool: "DriverPool" = None
+    refresh: RefreshIndex = None
+    rate: RateController = field(default_factory=RateController)
+    asset_proxy: str = None
+    asset_proxy_spki: str = None
+    # Batas sebelum Chrome worker diganti (0 = tidak dipakai)
+    recycle_places: int = 0
+    recycle_rss: int = 0
+    recycle_drift: float = 0.0
+
+    @property
+    def log_network(self):
+        return self.transfer_report or self.fast_mode
+
+    def open_driver(self):
+        if self.driver_pool is not None:
+            return self.driver_pool.acquire()
+        return open_google_maps(
+            BLOCK_PROFILES[self.block_profile], self.log_network, proxy=self.asset_proxy, proxy_spki=self.asset_proxy_spki
+        )
+
+    def close_driver(self, driver):
+        self.poll_network(driver)
+        if self.driver_pool is not None:
+            self.driver_pool.release(driver)
+        else:
+            driver.quit()
+
+    def recycle_driver(self, driver, reason):
+        """Replaces a worn-out driver with a fresh one sitting on the Maps page."""
+        print(f"♻️ Recycling Chrome after {reason}")
+        self.poll_network(driver)
+        if self.driver_pool is not None:
+            self.driver_pool.replace(driver)
+        else:
+            driver.quit()
+        driver = self.open_driver()
+        wait_for_elements(driver, By.CLASS_NAME, 'searchboxinput')
+        return driver
+
+    def health(self, driver):
+        """DriverHealth of driver, kept on the driver so it follows it between jobs."""
+        if getattr(driver, "health", None) is None:
+            driver.health = DriverHealth(
+                browser_pid(driver), self.recycle_places, self.recycle_rss, self.recycle_drift
+            )
+        return driver.health
+
+    def poll_network(self, driver):
+        """Drains the driver's performance log, counting transferred bytes on the way."""
+        if not self.log_network:
+            return []
+        messages = read_performance_log(driver)
+        self.stats.add_messages(messages)
+        return messages
+
+    def record_place(self, driver, place_data, seconds):
+        """Bookkeeping after a place was extracted on driver in seconds."""
+        self.stats.add_place(seconds)
+        self.health(driver).add_place(seconds)
+        self.metrics.add_place()
+        self.poll_network(driver)
+        print(f"📩 {next(self.counter)} | Stored {place_data['name']}")
+
+    def add_found(self, count):
+        """Feeds the number of places a scrolled search yielded to the live progress ETA."""
+        if self.live_progress is not None:
+            self.live_progress.add_found(count)
+
+    def zone_tile(self, driver, location):
+        """Root tile of a zone, located once and shared by every category."""
+        if location not in self.zone_tiles:
+            self.zone_tiles[location] = locate_zone(driver, location)
+        return self.zone_tiles[location]
+
+    def is_search_done(self, category, location):
+        return self.progress is not None and self.progress.is_search_done(category, location)
+
+    def done_places(self, category, location):
+        if self.progress is None:
+            return set()
+        return self.progress.done_places(category, location)
+
+    def finish_search(self, category, location):
+        """Marks a search done once all of its places are flushed to the sink."""
+        if self.progress is not None:
+            self.business_list.flush()
+            self.progress.mark_search_done(category, location)
+
+    def finish_split(self, category, location, children):
+        if self.progress is not None:
+            self.business_list.flush()
+            self.progress.mark_search_split(category, location, [child.key for child in children])
+
+    def split_children(self, category, location):
+        if self.progress is None:
+            return []
+        return [Tile.from_key(key) for key in self.progress.split_children(category, location)]
+
+    def queue_tiles(self, jobs, category, location, tiles):
+        """Queues the child tiles that replace one split tile."""
+        for tile in tiles:
+            jobs.put((category, location, tile))
+        if self.live_progress is not None:
+            # Tile induk digantikan oleh tile anaknya
+            self.live_progress.add_searches(len(tiles) - 1)
+
+    def claim_place(self, url):
+        """True if the place behind a card href has not been scraped in this job yet."""
+        return self.index.claim(place_key(url))
+
+    def release_place(self, url):
+        self.index.release(place_key(url))
+
+    def carry_forward(self, driver, category, location, done_places):
+        """Refresh mode: stores the places whose card did not change since the previous run.
+
+        Carried places are claimed, so the click and href loops skip them
+        like any other place that was already taken.
+        """
+        for card in collect_place_cards(driver):
+            place_id = place_key(card["href"])
+            if place_id in done_places:
+                continue
+            previous = self.refresh.unchanged(place_id, card["rating"], card["reviews"])
+            if previous is None or not self.claim_place(card["href"]):
+                continue
+            business = Business(**{name: previous.get(name) for name in Business.__dataclass_fields__})
+            business.category = category
+            business.zone = location
+            self.business_list.add(business)
+
+    def mark_flushed(self, businesses):
+        """StreamingSink.on_flush callback: records the flushed places as extracted."""
+        keys = [(business.category, business.zone, place_key(business.googlemaps_link)) for business in businesses]
+        self.index.persist(place_id for _, _, place_id in keys)
+        if self.progress is not None:
+            self.progress.mark_places(keys)
+
+
+class DetailPool:
+    """Chrome workers that open place URLs concurrently (href detail mode)."""
+
+    def __init__(self, size, session: ScrapeSession):
+        self.session = session
+        self.urls = queue.Queue()
+        # Sisa URL per pencarian, supaya pencarian baru ditandai selesai setelah semua tempatnya diproses
+        self.pending = {}
+        # Condition, supaya close() bisa menunggu sisa URL tanpa polling
+        self.pending_lock = threading.Condition()
+        self.threads = [
+            threading.Thread(target=self._work, args=(worker_id,), daemon=True)
+            for worker_id in range(1, size + 1)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def submit_search(self, urls, category, location, search_zone=None):
+        """Queues the URLs of one search; search_zone is its progress key (a tile key in tiling mode)."""
+        search = (category, search_zone or location)
+        if not urls:
+            self.session.finish_search(*search)
+            return
+        with self.pending_lock:
+            self.pending[search] = len(urls)
+        for url in urls:
+            self.urls.put((url, category, location, search, 0))
+
+    def _place_done(self, search):
+        with self.pending_lock:
+            self.pending[search] -= 1
+            finished = self.pending[search] == 0
+            self.pending_lock.notify_all()
+        if finished:
+            self.session.finish_search(*search)
+
+    def close(self):
+        """Waits until every submitted URL is processed and shuts the workers down.
+
+        Raises RuntimeError when every detail worker died (e.g. Chrome did not
+        start) while place URLs were still queued.
+        """
+        with self.pending_lock:
+            while sum(self.pending.values()) and any(thread.is_alive() for thread in self.threads):
+                self.pending_lock.wait(1)
+        for _ in self.threads:
+            self.urls.put(None)
+        for thread in self.threads:
+            thread.join()
+
+        unopened = 0
+        while True:
             try:
-                place_name = re.sub(r"['\"&]", "", driver.find_element(By.CSS_SELECTOR, ".DUwDvf.lfPIob").text)
-                found = False
-            except:
-                place.click()
-                time.sleep(0.3)
+                job = self.urls.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                # Tempat dilepas dari indeks supaya run berikutnya (--resume) membukanya lagi
+                self.session.release_place(job[0])
+                unopened += 1
+        if unopened:
+            raise RuntimeError(f"semua detail worker berhenti, {unopened} URL tempat tidak dibuka")
 
+    def _work(self, worker_id):
+        try:
+            driver = self.session.open_driver()
+        except Exception as e:
+            print(f"❌ Detail worker {worker_id}: Chrome gagal dinyalakan: {e}")
+            return
+        try:
+            while True:
+                job = self.urls.get()
+                if job is None:
+                    break
+                url, category, location, search, blocks = job
+                requeued = False
+                try:
+                    place_data, seconds = rate_limited(
+                        self.session, driver, get_place_data_from_url,
+                        driver, url, category, location, self.session.business_list, self.session.metrics,
+                        panel=True
+                    )
+                    self.session.record_place(driver, place_data, seconds)
+                except PageBlocked as e:
+                    print(f"🚧 Detail worker {worker_id}: {e}")
+                    if blocks < MAX_BLOCK_RETRIES:
+                        # URL dikembalikan ke antrean, dibuka lagi setelah jeda global
+                        self.urls.put((url, category, location, search, blocks + 1))
+                        requeued = True
+                    else:
+                        self.session.release_place(url)
+                    resume_after_block(driver, self.session)
+                except Exception as e:
+                    self.session.release_place(url)
+                    print(f"❌ Detail worker {worker_id}: {url} gagal: {e}")
+                finally:
+                    if not requeued:
+                        self._place_done(search)
+                reason = self.session.health(driver).recycle_reason()
+                if reason:
+                    driver = self.session.recycle_driver(driver, reason)
+        finally:
+            self.session.close_driver(driver)
 
-    # Nomor telepon
-    try:
-        place_phone_number = driver.find_element(By.CSS_SELECTOR, '[data-item-id^="phone:tel:"]').text
-        place_phone_number = re.sub(r'[^\w\s,.()]', '', place_phone_number).strip()
-        place_phone_number = format_phone_number(place_phone_number)
-    except:
-        place_phone_number = ""
 
-    # Alamat
-    try:
-        address_element = driver.find_element(By.CSS_SELECTOR, '[data-item-id^="address"]')
-        address = address_element.text
-        address_parts = address.split(',')
-
-        # Parsing alamat
-        full_address = re.sub(r'[^\w\s,.]', '', address).strip()
-        district = address_parts[-3].strip()  # Kecamatan
-        city = address_parts[-2].strip()      # Kabupaten/Kota
-        province_and_postal = address_parts[-1].strip()  # Provinsi + kode pos
-        province = " ".join(province_and_postal.split()[:-1])  # Nama provinsi tanpa kode pos
-        postal_code = province_and_postal.split()[-1] if province_and_postal.split()[-1].isdigit() else ""
-    except:
-        full_address = district = city = province = postal_code = ""
-
-    # Koordinat (latitude, longitude)
-    match = re.search(r"@(-?\d+\.\d+),(-?\d+\.\d+)", driver.current_url)
-    if match:
-        latitude, longitude = float(match.group(1)), float(match.group(2))
-    else:
-        latitude, longitude = None, None
+def capture_search_places(driver, session: ScrapeSession):
+    """Decodes the /search?tbm=map responses (and APP_INITIALIZATION_STATE) seen since the last poll."""
+    places = []
+    for message in session.poll_network(driver):
+        if message["method"] != "Network.responseReceived":
+            continue
+        if SEARCH_RESPONSE_MARKER not in message["params"]["response"]["url"]:
+            continue
+        try:
+            body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": message["params"]["requestId"]})
+        except Exception:
+            # Body sudah dibuang Chrome; halaman berikutnya tetap tertangkap
+            continue
+        places.extend(parse_search_response(body["body"]))
 
-    # Review score dan jumlah review
-    try:
-        place_review_score = re.sub(r"[,]", ".", driver.find_element(By.CSS_SELECTOR, 'div.F7nice span[aria-hidden="true"]').text)
-        place_review_amount = int(re.sub(r"[(\")\".]", "", driver.find_element(By.CSS_SELECTOR, 'div.F7nice span:nth-child(2) span[aria-label]').text))
-    except:
-        place_review_score = ""
-        place_review_amount = ""
-
-    # Buat objek Business
-    business = Business(
-        name=place_name,
-        phone=place_phone_number,
-        category=category,
-        full_address = full_address,
-        district=district,
-        city=city,
-        province=province,
-        postal_code=postal_code,
-        reviews_score=place_review_score,
-        reviews_amount=place_review_amount,
-        latitude=latitude,
-        longitude=longitude,
-        googlemaps_link=driver.current_url,
-        zone=location
-    )
-
-    # Tambahkan objek ke business_list
-    business_list.business_list.append(business)
-
-    return business
+    state = driver.execute_script("return window.APP_INITIALIZATION_STATE || null;")
+    if state:
+        places.extend(parse_app_initialization_state(state))
+    return places
 
 
-def main():
-    start_time = time.time()
-    print("Script dimulai.")
-    
-    config = load_config()
-    
-    business_list = BusinessList()
+def store_search_places(places, category, location, session: ScrapeSession):
+    """Fast mode: turns captured search results into Business records without opening them."""
+    done_places = session.done_places(category, location)
+    for place in places:
+        link = place["googlemaps_link"]
+        if place_key(link) in done_places or not session.claim_place(link):
+            continue
+        with session.metrics.timer("extract", category, location):
+            try:
+                full_address, district, city, province, postal_code = parse_address(place["full_address"])
+            except IndexError:
+                full_address = place["full_address"]
+                district = city = province = postal_code = ""
+            phone = re.sub(r'[^\w\s,.()]', '', place["phone"]).strip()
+            business = Business(
+                name=re.sub(r"['\"&]", "", place["name"]),
+                phone=format_phone_number(phone),
+                category=category,
+                full_address=full_address,
+                district=district,
+                city=city,
+                province=province,
+                postal_code=postal_code,
+                reviews_score="" if place["reviews_score"] is None else str(place["reviews_score"]),
+                reviews_amount="" if place["reviews_amount"] is None else place["reviews_amount"],
+                latitude=place["latitude"],
+                longitude=place["longitude"],
+                googlemaps_link=link,
+                zone=location
+            )
+        with session.metrics.timer("save", category, location):
+            session.business_list.add(business)
+        session.metrics.add_place()
+        print(f"📩 {next(session.counter)} | Stored {business.name}")
 
-    # Main logic
-    driver = open_google_maps()
-    wait_for_elements(driver, By.CLASS_NAME, 'searchboxinput')
+
+@dataclass(frozen=True)
+class Tile:
+    """Map viewport searched as one query in tiling mode."""
+    latitude: float
+    longitude: float
+    zoom: int
+
+    @property
+    def key(self):
+        return f"{self.latitude:.7f},{self.longitude:.7f},{self.zoom}z"
+
+    @classmethod
+    def from_key(cls, key):
+        latitude, longitude, zoom = key.rstrip("z").split(",")
+        return cls(float(latitude), float(longitude), int(zoom))
+
+    def url(self, query):
+        return f"{MAPS_URL}/search/{quote_plus(query)}/@{self.key}"
+
+    def span(self):
+        """(latitude, longitude) degrees covered by the viewport at this zoom."""
+        degrees_per_pixel = 360 / (256 * 2 ** self.zoom)
+        longitude_span = VIEWPORT[0] * degrees_per_pixel
+        latitude_span = VIEWPORT[1] * degrees_per_pixel * math.cos(math.radians(self.latitude))
+        return latitude_span, longitude_span
+
+    def split(self):
+        """The four quadrants of this tile, one zoom level deeper."""
+        latitude_span, longitude_span = self.span()
+        return [
+            Tile(
+                round(self.latitude + dy * latitude_span / 4, 7),
+                round(self.longitude + dx * longitude_span / 4, 7),
+                self.zoom + 1,
+            )
+            for dy in (-1, 1)
+            for dx in (-1, 1)
+        ]
+
+
+def locate_zone(driver, zone):
+    """Root tile of a zone: the viewport Maps centers on when the zone itself is searched."""
+    driver.get(f"{MAPS_URL}/search/{quote_plus(zone)}")
+    pattern = re.compile(r"@(-?\d+\.\d+),(-?\d+\.\d+),(\d+(?:\.\d+)?)z")
+    match = WebDriverWait(driver, 15).until(lambda d: pattern.search(d.current_url))
+    return Tile(float(match.group(1)), float(match.group(2)), int(float(match.group(3))))
+
+
+def collect_place_urls(driver):
+    """Returns the href of every loaded .hfpxzc card in a single round trip."""
+    return driver.execute_script(
+        "return Array.from(document.querySelectorAll('a.hfpxzc'), a => a.href);"
+    )
+
+
+# Rating (.MW4etd) dan jumlah ulasan (.UY7F9) yang tampil di setiap kartu hasil
+CARD_SUMMARY_JS = """
+return Array.from(document.querySelectorAll('a.hfpxzc'), a => {
+    const card = a.closest('div.Nv2PK') || a.parentElement;
+    const text = selector => {
+        const element = card ? card.querySelector(selector) : null;
+        return element ? element.innerText.trim() : "";
+    };
+    return {href: a.href, rating: text('.MW4etd'), reviews: text('.UY7F9')};
+});
+"""
+
+
+def collect_place_cards(driver):
+    """href, rating and review count of every loaded card in a single round trip."""
+    return driver.execute_script(CARD_SUMMARY_JS)
+
+
+def scrape_search(driver, category, location, session: ScrapeSession, jobs=None, tile=None):
+    """Runs one category × zone search on driver and stores every place found.
+
+    With a session.detail_pool the feed is only scrolled; the place URLs are
+    handed to the pool instead of being clicked one by one on this driver.
+    With a tile only that viewport is searched; a tile that hits RESULT_CAP
+    is split and its quadrants are put back on jobs instead of being scraped.
+    """
+    search_zone = location if tile is None else f"{location} @{tile.key}"
+    if session.fast_mode:
+        # Buang respons pencarian sebelumnya yang masih ada di log
+        session.poll_network(driver)
+
+    metrics = session.metrics
+    with metrics.timer("search", category, location):
+        if tile is None:
+            outcome, _ = rate_limited(session, driver, open_search, driver, category, location)
+        else:
+            print(f"⭐ Searching {category} in {location} tile {tile.key} ...")
+            outcome, _ = rate_limited(session, driver, open_tile, driver, tile, category)
+
+    if outcome == "empty":
+        print(f"❓ No results for {category} in {search_zone}")
+        session.finish_search(category, search_zone)
+        return
+    if outcome == "place":
+        store_opened_place(driver, category, location, search_zone, session)
+        return
+
+    with metrics.timer("scroll", category, location):
+        found = scroll_results(driver)
+
+    if tile is not None and found >= RESULT_CAP and tile.zoom < MAX_TILE_ZOOM:
+        # Hasil terpotong: pecah tile, hasilnya diambil dari tile anak supaya tidak diklik dua kali
+        print(f"🔍 Tile {tile.key} hit the {RESULT_CAP} result cap, splitting")
+        children = tile.split()
+        # Tile anak dicatat bersama induknya sebelum diantrekan, supaya --resume bisa mengantrekannya lagi
+        session.finish_split(category, search_zone, children)
+        session.queue_tiles(jobs, category, location, children)
+        return
+
+    session.add_found(found)
+    if session.fast_mode:
+        with metrics.timer("extract", category, location):
+            places = capture_search_places(driver, session)
+        print(f"⭐ {len(places)} places decoded from search responses for {category} in {location}")
+        store_search_places(places, category, location, session)
+        session.finish_search(category, search_zone)
+        return
+
+    done_places = session.done_places(category, location)
+    if session.refresh is not None:
+        session.carry_forward(driver, category, location, done_places)
+    urls = collect_place_urls(driver)
+
+    if session.detail_pool is not None:
+        urls = [url for url in urls if place_key(url) not in done_places and session.claim_place(url)]
+        print(f"⭐ {len(urls)} places queued for {category} in {location}")
+        session.detail_pool.submit_search(urls, category, location, search_zone)
+        return
+
+    places = driver.find_elements(By.CLASS_NAME, 'hfpxzc')
 
     last_place = ""
     last_url = ""
-    count = 0
+    for place, url in zip(places, urls):
+        # Cek ID dari href sebelum klik: tempat yang sudah ada tidak dibuka lagi
+        if place_key(url) in done_places or not session.claim_place(url):
+            continue
+        try:
+            place_data, seconds = rate_limited(
+                session, driver, get_place_data,
+                driver, place, last_url, last_place, category, location, session.business_list, metrics,
+                panel=True
+            )
+        except Exception:
+            session.release_place(url)
+            raise
+        last_place = place_data["name"]
+        last_url = driver.current_url
+        session.record_place(driver, place_data, seconds)
+        reason = session.health(driver).recycle_reason()
+        if reason:
+            raise RecycleDriver(reason)
+
+    session.finish_search(category, search_zone)
+
+
+def store_opened_place(driver, category, location, search_zone, session: ScrapeSession):
+    """Stores the place a search opened directly instead of listing results."""
+    url = driver.current_url
+    print(f"⭐ Search for {category} in {search_zone} opened a single place")
+    session.add_found(1)
+    if place_key(url) not in session.done_places(category, location) and session.claim_place(url):
+        started = time.time()
+        try:
+            place_data = extract_place_data(driver, None, category, location, session.business_list, session.metrics)
+        except Exception:
+            session.release_place(url)
+            raise
+        session.record_place(driver, place_data, time.time() - started)
+    session.finish_search(category, search_zone)
+
+
+def scrape_worker(worker_id, jobs, session: ScrapeSession):
+    """Pulls (category, zone, tile) jobs from the shared queue until a None sentinel arrives."""
+    try:
+        driver = session.open_driver()
+    except Exception as e:
+        print(f"❌ Worker {worker_id}: Chrome gagal dinyalakan: {e}")
+        return
+    try:
+        wait_for_elements(driver, By.CLASS_NAME, 'searchboxinput')
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+            category, location, tile = job
+            try:
+                if session.tiling and tile is None:
+                    tile = session.zone_tile(driver, location)
+                search_zone = location if tile is None else f"{location} @{tile.key}"
+                if session.is_search_done(category, search_zone):
+                    children = session.split_children(category, search_zone)
+                    if children:
+                        # Tile yang dipecah pada run sebelumnya: tile anak yang belum selesai dikerjakan lagi
+                        session.queue_tiles(jobs, category, location, children)
+                    else:
+                        print(f"⏭️ {category} in {search_zone} sudah selesai, dilewati")
+                else:
+                    blocks = 0
+                    while True:
+                        try:
+                            scrape_search(driver, category, location, session, jobs, tile)
+                            break
+                        except RecycleDriver as e:
+                            # Pencarian diulang di Chrome baru; tempat yang sudah diambil dilewati oleh dedup
+                            driver = session.recycle_driver(driver, e)
+                        except PageBlocked as e:
+                            blocks += 1
+                            if blocks > MAX_BLOCK_RETRIES:
+                                raise
+                            print(f"🚧 Worker {worker_id}: {e}")
+                            resume_after_block(driver, session)
+                reason = session.health(driver).recycle_reason()
+                if reason:
+                    driver = session.recycle_driver(driver, reason)
+            except Exception as e:
+                print(f"❌ Worker {worker_id}: {category} in {location} gagal: {e}")
+            finally:
+                jobs.task_done()
+    finally:
+        session.close_driver(driver)
+
 
+def wait_for_jobs(jobs, threads):
+    """jobs.join() that gives up with an error once every worker thread has died."""
+    with jobs.all_tasks_done:
+        while jobs.unfinished_tasks:
+            if not any(thread.is_alive() for thread in threads):
+                raise RuntimeError(f"semua worker berhenti, {jobs.unfinished_tasks} pencarian tidak dikerjakan")
+            jobs.all_tasks_done.wait(1)
+
+
+def run_worker_pool(config, session: ScrapeSession, workers=1, detail_workers=0):
+    """Scrapes the categories × target_locations matrix with a pool of Chrome workers.
+
+    detail_workers > 0 switches to href mode: search workers only scroll the
+    feeds and a DetailPool of that size opens the collected place URLs.
+    In tiling mode the queue keeps growing while capped tiles are split, so
+    workers run until every job, including the added tiles, is done.
+    """
+    jobs = queue.Queue()
     for category in config['categories']:
         for location in config['target_locations']:
-            search_for_category(driver, category, location)
-            wait_for_elements(driver, By.CLASS_NAME, 'hfpxzc')
+            jobs.put((category, location, None))
 
-            discovered_places = 0
-            while True:
+    # Satu worker per pencarian sudah cukup, sisanya hanya membuka Chrome tanpa pekerjaan
+    if not session.tiling:
+        workers = min(workers, jobs.qsize())
+    workers = max(1, workers)
+    session.rate.set_max_concurrency(workers + detail_workers)
+    print(f"⭐ Starting {workers} worker(s) for {jobs.qsize()} searches")
+    if session.live_progress is not None:
+        session.live_progress.add_searches(jobs.qsize())
+
+    session.detail_pool = DetailPool(detail_workers, session) if detail_workers > 0 else None
+    threads = [
+        threading.Thread(target=scrape_worker, args=(worker_id, jobs, session), daemon=True)
+        for worker_id in range(1, workers + 1)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        wait_for_jobs(jobs, threads)
+    except BaseException:
+        # Pencarian yang belum diambil dibuang, supaya worker yang masih hidup langsung berhenti
+        while True:
+            try:
+                jobs.get_nowait()
+            except queue.Empty:
+                break
+        raise
+    finally:
+        for _ in threads:
+            jobs.put(None)
+        for thread in threads:
+            thread.join()
+        if session.detail_pool is not None:
+            session.detail_pool.close()
+
+
+class DriverPool:
+    """Pre-warmed Chrome sessions waiting on the Maps page, lent to jobs in daemon mode.
+
+    ScrapeSession.open_driver borrows a driver instead of launching Chrome and
+    close_driver hands it back. A returned driver is reset to a blank Maps
+    page in the background; one that no longer responds is replaced.
+    """
+
+    def __init__(self, size, block_profile="off", profile_dir=None, proxy=None, proxy_spki=None):
+        self.size = size
+        self.block_profile = block_profile
+        self.profile_dir = profile_dir
+        self.proxy = proxy
+        self.proxy_spki = proxy_spki
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+        threads = [threading.Thread(target=self._add, args=(slot,)) for slot in range(1, size + 1)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Sesi yang gagal dinyalakan tidak dihitung, supaya pekerjaan tidak menunggu driver yang tidak ada
+        self.size = self.idle.qsize()
+        if not self.size:
+            raise RuntimeError("tidak ada sesi Chrome yang berhasil dinyalakan")
+
+    def _open(self, slot):
+        # Chrome mengunci folder profil, jadi setiap sesi memakai subfolder sendiri
+        user_data_dir = os.path.join(self.profile_dir, f"driver-{slot}") if self.profile_dir else None
+        # Log jaringan selalu aktif karena pekerjaan berikutnya bisa memakai --fast
+        driver = open_google_maps(
+            BLOCK_PROFILES[self.block_profile], log_network=True, user_data_dir=user_data_dir,
+            proxy=self.proxy, proxy_spki=self.proxy_spki
+        )
+        wait_for_elements(driver, By.CLASS_NAME, 'searchboxinput')
+        driver.pool_slot = slot
+        return driver
+
+    def _add(self, slot):
+        try:
+            self.idle.put(self._open(slot))
+            return True
+        except Exception as e:
+            print(f"❌ Chrome session {slot} failed to start: {e}")
+            return False
+
+    def acquire(self):
+        """An idle driver; raises RuntimeError once every slot has been dropped from the pool."""
+        while True:
+            try:
+                return self.idle.get(timeout=1)
+            except queue.Empty:
+                if not self.size:
+                    raise RuntimeError("semua sesi Chrome di pool gagal dinyalakan ulang")
+
+    def release(self, driver):
+        threading.Thread(target=self._reset, args=(driver,), daemon=True).start()
+
+    def replace(self, driver):
+        """Quits a driver and starts a fresh one in its slot, in the background."""
+        threading.Thread(target=self._replace, args=(driver,), daemon=True).start()
+
+    def _replace(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        for attempt in range(MAX_REPLACE_ATTEMPTS):
+            if self._add(driver.pool_slot):
+                return
+            time.sleep(backoff_seconds(attempt, 2.0, 30.0))
+        # Slot yang tidak bisa diisi lagi tidak dihitung, supaya acquire() tidak menunggu selamanya
+        with self.lock:
+            self.size -= 1
+        print(f"❌ Chrome session {driver.pool_slot} dropped from the pool, {self.size} left")
+
+    def _reset(self, driver):
+        try:
+            driver.get(MAPS_URL)
+            wait_for_elements(driver, By.CLASS_NAME, 'searchboxinput')
+            read_performance_log(driver)
+        except Exception:
+            print(f"🔄 Chrome session {driver.pool_slot} restarted")
+            self._replace(driver)
+            return
+        self.idle.put(driver)
+
+    @property
+    def available(self):
+        return self.idle.qsize()
+
+    def close(self):
+        while not self.idle.empty():
+            self.idle.get().quit()
+
+
+# Opsi job yang boleh diubah lewat POST /jobs dan tipe nilainya; tuple = pilihan yang sah
+JOB_OPTIONS = {
+    "workers": int, "detail_mode": ("click", "href"), "detail_workers": int, "fast": bool, "tiles": bool,
+    "output_format": ("csv", "jsonl", "parquet"), "batch_size": int, "resume": bool, "dedup_index": str,
+    "parse_workers": int, "refresh": str, "max_rate": float,
+}
+
+
+def valid_option(name, value):
+    """Whether value fits JOB_OPTIONS[name]; paths may be null, numbers may not be negative."""
+    expected = JOB_OPTIONS[name]
+    if isinstance(expected, tuple):
+        return value in expected
+    if expected is bool:
+        return isinstance(value, bool)
+    if expected is str:
+        return value is None or isinstance(value, str)
+    # bool adalah subclass int, jadi true/false tidak diterima sebagai angka
+    numbers = (int, float) if expected is float else (int,)
+    return isinstance(value, numbers) and not isinstance(value, bool) and value >= 0
+
+
+def string_list(payload, name):
+    """Non-blank strings of payload[name]; raises ValueError when it is not a list of strings."""
+    values = payload.get(name, [])
+    if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+        raise ValueError(f"{name} harus berupa list string")
+    return [value.strip() for value in values if value.strip()]
+
+
+class ScrapeDaemon:
+    """Local HTTP job API in front of a DriverPool.
+
+    POST /jobs queues {"categories": [...], "target_locations": [...],
+    "options": {...}, "file_name": ...}; GET /jobs/<id> reports its status.
+    Jobs run one at a time in submission order, each one using the whole
+    pool, so search and detail workers never wait on each other's drivers.
+    """
+
+    def __init__(self, args, pool: DriverPool):
+        self.args = args
+        self.pool = pool
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.queue = queue.Queue()
+        self.runner = threading.Thread(target=self._run, daemon=True)
+
+    def submit(self, payload):
+        """Validates a job request and queues it; raises ValueError when it is not runnable."""
+        if not isinstance(payload, dict):
+            raise ValueError("body harus berupa objek JSON")
+        categories = string_list(payload, "categories")
+        target_locations = string_list(payload, "target_locations")
+        if not categories or not target_locations:
+            raise ValueError("categories dan target_locations tidak boleh kosong")
+        file_name = payload.get("file_name")
+        if not isinstance(file_name, (str, type(None))):
+            raise ValueError("file_name harus berupa string")
+        # Nama file dipakai di bawah output/, jadi tidak boleh berisi folder atau keluar dari output/
+        if file_name is not None and (re.search(r"[\\/]", file_name) or file_name.strip() in ("", ".", "..")):
+            raise ValueError("file_name tidak boleh kosong atau berisi pemisah folder")
+        options = payload.get("options", {})
+        if not isinstance(options, dict):
+            raise ValueError("options harus berupa objek JSON")
+        unknown = set(options) - set(JOB_OPTIONS)
+        if unknown:
+            raise ValueError(f"opsi tidak dikenal: {', '.join(sorted(unknown))}")
+        invalid = [name for name, value in options.items() if not valid_option(name, value)]
+        if invalid:
+            raise ValueError(f"nilai opsi tidak valid: {', '.join(sorted(invalid))}")
+
+        args = argparse.Namespace(**{**vars(self.args), **options, "metrics_json": None, "metrics_prom": None})
+        args.workers = min(options.get("workers") or self.pool.size, self.pool.size)
+        if args.detail_mode == "href":
+            if self.pool.size < 2:
+                raise ValueError("mode href butuh --pool-size minimal 2")
+            # Worker pencarian dan worker detail berbagi pool yang sama
+            args.workers = min(args.workers, self.pool.size - 1)
+            args.detail_workers = min(max(1, args.detail_workers), self.pool.size - args.workers)
+
+        job = {
+            "id": str(next(self.ids)),
+            "status": "queued",
+            "categories": categories,
+            "target_locations": target_locations,
+            "file_name": file_name,
+            "submitted_at": time.time(),
+        }
+        with self.lock:
+            self.jobs[job["id"]] = job
+        self.queue.put((job, args))
+        return dict(job)
+
+    def status(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def all_jobs(self):
+        with self.lock:
+            return [dict(job) for job in self.jobs.values()]
+
+    def _run(self):
+        while True:
+            job, args = self.queue.get()
+            with self.lock:
+                job.update(status="running", started_at=time.time())
+            print(f"⭐ Job {job['id']} started")
+            try:
+                config = {"categories": job["categories"], "target_locations": job["target_locations"]}
+                summary = run_job(config, args, job["file_name"], self.pool)
+                with self.lock:
+                    job.update(status="done", **summary)
+                print(f"✅ Job {job['id']} done: {summary['places']} places")
+            except Exception as e:
+                with self.lock:
+                    job.update(status="failed", error=str(e))
+                print(f"❌ Job {job['id']} gagal: {e}")
+
+    def handle(self, request):
+        path = request.path.rstrip("/")
+        if request.command == "POST" and path == "/jobs":
+            try:
+                length = int(request.headers.get("Content-Length", 0))
+                payload = json.loads(request.rfile.read(length) or b"{}")
+                return self.send(request, self.submit(payload), status=202)
+            except ValueError as e:
+                return self.send(request, {"error": str(e)}, status=400)
+        if request.command == "GET" and path == "/jobs":
+            return self.send(request, self.all_jobs())
+        if request.command == "GET" and path.startswith("/jobs/"):
+            job = self.status(path[len("/jobs/"):])
+            return self.send(request, job or {"error": "job tidak ditemukan"}, status=200 if job else 404)
+        if request.command == "GET" and path == "/health":
+            return self.send(request, {"pool_size": self.pool.size, "idle": self.pool.available, "queued": self.queue.qsize()})
+        self.send(request, {"error": "not found"}, status=404)
+
+    def send(self, request, body, status=200):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    def serve(self, port=8766, socket_path=None):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                daemon.handle(self)
+
+            def do_POST(self):
+                daemon.handle(self)
+
+            def address_string(self):
+                # Koneksi Unix socket tidak punya alamat klien
+                return self.client_address[0] if self.client_address else "unix"
+
+            def log_message(self, format, *args):
+                pass
+
+        if socket_path:
+            class UnixHTTPServer(ThreadingHTTPServer):
+                address_family = socket.AF_UNIX
+
+                def server_bind(self):
+                    if os.path.exists(socket_path):
+                        os.remove(socket_path)
+                    self.socket.bind(socket_path)
+                    self.server_name, self.server_port = socket_path, 0
+
+            httpd = UnixHTTPServer(socket_path, Handler)
+            print(f"⭐ Daemon listening on unix:{socket_path}")
+        else:
+            httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+            print(f"⭐ Daemon listening on http://127.0.0.1:{port}")
+
+        self.runner.start()
+        try:
+            httpd.serve_forever()
+        finally:
+            httpd.server_close()
+            if socket_path and os.path.exists(socket_path):
+                os.remove(socket_path)
+
+
+def run_daemon(args):
+    """Starts the Chrome pool once and serves jobs until interrupted."""
+    started = time.time()
+    pool = DriverPool(
+        max(1, args.pool_size), args.block_profile, args.profile_dir, args.asset_proxy, args.asset_proxy_spki
+    )
+    print(f"⭐ {pool.available} Chrome session(s) warm after {time.time() - started:.1f} s")
+    try:
+        ScrapeDaemon(args, pool).serve(args.port, args.socket)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.close()
+
+
+# Jeda worker antrean saat semua unit sedang dikerjakan worker lain
+QUEUE_POLL_SECONDS = 5
+
+
+class QueueSplitter:
+    """Stands in for the jobs queue of scrape_search: split tiles become new units in the WorkQueue."""
+
+    def __init__(self, work: WorkQueue):
+        self.work = work
+
+    def put(self, job):
+        category, location, tile = job
+        self.work.enqueue([(category, location, tile.key)])
+
+
+def run_queue_worker(args):
+    """Leases units from a shared WorkQueue with one Chrome until no unit is left.
+
+    Each unit is written to its own partial file, which is only recorded in
+    the queue once the unit is complete; a unit whose worker dies is leased
+    again after its lease expires, and the coordinator drops the duplicates.
+    """
+    work = WorkQueue(args.queue_worker)
+    worker_id = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    partial_dir = work.get_meta("partial_dir")
+    session = ScrapeSession(
+        None, block_profile=args.block_profile, fast_mode=args.fast, tiling=work.get_meta("tiling") == "1",
+        recycle_places=args.recycle_places, recycle_rss=args.recycle_rss_mb * 1_000_000,
+        recycle_drift=args.recycle_drift, rate=rate_controller(args),
+        asset_proxy=args.asset_proxy, asset_proxy_spki=args.asset_proxy_spki
+    )
+    if args.refresh:
+        session.refresh = RefreshIndex.load(args.refresh, place_key)
+    driver = None
+    try:
+        while True:
+            unit = work.lease(worker_id)
+            if unit is None:
+                if work.is_finished():
+                    break
+                time.sleep(QUEUE_POLL_SECONDS)
+                continue
+            print(f"⭐ Worker {worker_id}: unit {unit.id}, {unit.category} in {unit.location} {unit.tile}".rstrip())
+            # Indeks dedup per unit: unit yang diulang di worker lain tidak boleh melewati tempatnya
+            session.index = PlaceIndex()
+            session.business_list = BusinessList.streaming(
+                f"{partial_dir}/unit-{unit.id}-{unit.attempts}", fmt=args.output_format, batch_size=args.batch_size
+            )
+            with LeaseHeartbeat(work, unit, worker_id):
                 try:
-                    available_places = len(driver.find_elements(By.CLASS_NAME, 'hfpxzc'))
-                    if available_places == discovered_places:
-                        if scroll_results(driver, available_places) == False:
+                    # Chrome dinyalakan di dalam blok ini, supaya unit yang sudah di-lease kembali lewat fail()
+                    if driver is None:
+                        driver = session.open_driver()
+                        wait_for_elements(driver, By.ID, 'searchboxinput')
+                    tile = Tile.from_key(unit.tile) if unit.tile else None
+                    if session.tiling and tile is None:
+                        tile = session.zone_tile(driver, unit.location)
+                    while True:
+                        try:
+                            scrape_search(driver, unit.category, unit.location, session, QueueSplitter(work), tile)
                             break
-                    else:
-                        discovered_places = len(driver.find_elements(By.CLASS_NAME, 'hfpxzc'))
-                except TimeoutException:
-                    print("❓ Not found")
-                    break
+                        except RecycleDriver as e:
+                            driver = session.recycle_driver(driver, e)
+                    session.business_list.close()
+                    work.complete(unit.id, worker_id, session.business_list.sink.path)
+                except Exception as e:
+                    session.business_list.close()
+                    work.fail(unit.id, worker_id, str(e))
+                    print(f"❌ Worker {worker_id}: unit {unit.id} gagal: {e}")
+                    if driver is None:
+                        # Tanpa Chrome worker ini berhenti; unitnya diambil worker lain
+                        print(f"❌ Worker {worker_id}: Chrome gagal dinyalakan, worker berhenti")
+                        break
+                    if isinstance(e, PageBlocked):
+                        resume_after_block(driver, session)
+
+            reason = session.health(driver).recycle_reason()
+            if reason:
+                driver = session.recycle_driver(driver, reason)
+    finally:
+        if driver is not None:
+            session.close_driver(driver)
+        session.rate.report()
+        work.close()
+
+
+def queue_worker_command(args, number):
+    """Command line of a local worker process spawned by the coordinator."""
+    command = [
+        sys.executable, os.path.abspath(__file__), "--queue-worker", args.coordinate,
+        "--worker-id", f"{socket.gethostname()}-{number}", "--maps-url", MAPS_URL,
+        "--block-profile", args.block_profile, "--output-format", args.output_format,
+        "--batch-size", str(args.batch_size), "--recycle-places", str(args.recycle_places),
+        "--recycle-rss-mb", str(args.recycle_rss_mb), "--recycle-drift", str(args.recycle_drift),
+        "--max-rate", str(args.max_rate), "--latency-factor", str(args.latency_factor),
+    ]
+    if args.fast:
+        command.append("--fast")
+    if args.refresh:
+        command += ["--refresh", args.refresh]
+    if args.asset_proxy:
+        # Semua proses worker di node ini memakai satu proxy cache
+        command += ["--asset-proxy", args.asset_proxy]
+    return command
+
+
+def merge_partials(work: WorkQueue, file_name, fmt="csv", batch_size=50):
+    """Merges the partial files of every finished unit into output/<file_name>, dropping duplicate places."""
+    business_list = BusinessList.streaming(file_name, fmt=fmt, batch_size=batch_size, capture_raw=False)
+    seen = set()
+    duplicates = 0
+    for unit, partial in work.done_units():
+        for record in iter_records(partial, format_of(partial)):
+            key = place_key(record.get("googlemaps_link"))
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            business = Business(**{name: record.get(name) for name in Business.__dataclass_fields__})
+            # File CSV/JSONL parsial tidak memuat kategori dan zona; ambil dari unitnya
+            business.category = business.category or unit.category
+            business.zone = business.zone or unit.location
+            business_list.add(business)
+    business_list.close(file_name)
+    print(f"⭐ {len(seen)} places merged into {business_list.sink.path}, {duplicates} duplicates dropped")
+
+
+CLUSTER_FIELDS = ["cluster", "name", "phone", "full_address", "latitude", "longitude", "googlemaps_link"]
+
+
+def dedupe_output(path, args):
+    """Writes output/<name>.dedup.* with near-duplicate places of a saved output merged.
+
+    The members of every merged cluster are listed in output/<name>.clusters.csv
+    so the merges can be checked.
+    """
+    fmt = format_of(path)
+    file_name = os.path.basename(path.rstrip("/"))
+    file_name = file_name[:-len(f".{fmt}")] if file_name.endswith(f".{fmt}") else file_name
+    records = [
+        {name: record.get(name) for name in Business.__dataclass_fields__}
+        for record in iter_records(path, fmt)
+    ]
+    merged, clusters = merge_near_duplicates(records, args.dedupe_radius, args.dedupe_threshold, key=place_key)
+
+    business_list = BusinessList.streaming(
+        f"{file_name}.dedup", fmt=fmt, batch_size=args.batch_size, capture_raw=False
+    )
+    for record in merged:
+        business_list.add(Business(**record))
+    business_list.close(f"{file_name}.dedup")
+
+    report = StreamingSink(f"{BusinessList.save_at}/{file_name}.clusters.csv", CLUSTER_FIELDS)
+    for number, members in enumerate(clusters, 1):
+        for record in members:
+            report.write({**record, "cluster": number})
+    report.close()
+    print(
+        f"⭐ {len(records)} places merged into {len(merged)} in {business_list.sink.path}, "
+        f"{len(clusters)} clusters listed in {report.path}"
+    )
+
+
+def run_coordinator(args):
+    """Queues categories × target_locations as work units, waits for the workers and merges their results."""
+    config = load_config(args.spec)
+    if config is None:
+        return
+    work = WorkQueue(args.coordinate, reset=not args.resume)
+    name = os.path.splitext(os.path.basename(args.coordinate))[0]
+    work.set_meta("tiling", int(args.tiles))
+    work.set_meta("partial_dir", f"{name}_partials")
+    added = work.enqueue(
+        (category, location, None)
+        for category in config['categories']
+        for location in config['target_locations']
+    )
+    print(f"⭐ {added} units queued in {args.coordinate}")
+
+    processes = [subprocess.Popen(queue_worker_command(args, number)) for number in range(1, args.spawn_workers + 1)]
+    counts = None
+    stranded = 0
+    while not work.is_finished():
+        if work.counts() != counts:
+            counts = work.counts()
+            print(f"⏱️ Units: {', '.join(f'{status} {count}' for status, count in sorted(counts.items()))}")
+        # Tanpa worker yang masih hidup unit yang tersisa tidak akan pernah selesai
+        if processes and all(process.poll() is not None for process in processes) and not work.is_finished():
+            counts = work.counts()
+            stranded = counts["queued"] + counts["leased"]
+            print(f"❌ Semua proses worker berhenti, {counts['queued']} unit antre dan {counts['leased']} unit di-lease")
+            break
+        time.sleep(QUEUE_POLL_SECONDS)
+    for process in processes:
+        process.wait()
+
+    failed = work.counts()["failed"]
+    if failed:
+        print(f"❌ {failed} units failed after {work.max_attempts} attempts")
+    location = config['target_locations'][-1]
+    merge_partials(work, f"google_maps_{location}".replace(" ", "_"), fmt=args.output_format, batch_size=args.batch_size)
+    work.close()
+    if stranded:
+        raise RuntimeError(f"semua proses worker berhenti, {stranded} unit belum selesai; lanjutkan dengan --resume")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Google Maps Business Scraper")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Jumlah worker Chrome headless yang berjalan paralel (0 = jumlah core CPU)"
+    )
+    parser.add_argument(
+        "--detail-mode", choices=["click", "href"], default="click",
+        help="click: klik setiap kartu, href: kumpulkan URL kartu lalu buka secara paralel"
+    )
+    parser.add_argument(
+        "--detail-workers", type=int, default=4,
+        help="Jumlah tab/worker Chrome yang membuka URL tempat pada mode href"
+    )
+    parser.add_argument(
+        "--block-profile", choices=sorted(BLOCK_PROFILES), default="off",
+        help="media: blokir gambar, tile peta, font dan media lewat CDP"
+    )
+    parser.add_argument(
+        "--transfer-report", action="store_true",
+        help="Catat byte yang ditransfer dan latensi per tempat (membandingkan block profile)"
+    )
+    parser.add_argument(
+        "--fast", action="store_true",
+        help="Ambil data dari respons JSON pencarian tanpa membuka setiap tempat"
+    )
+    parser.add_argument(
+        "--tiles", action="store_true",
+        help="Pecah setiap lokasi menjadi tile peta; tile yang mencapai batas hasil dipecah lagi"
+    )
+    parser.add_argument(
+        "--maps-url", default=MAPS_URL,
+        help="URL Google Maps; arahkan ke fixture server untuk uji offline"
+    )
+    parser.add_argument(
+        "--output-format", choices=["csv", "jsonl", "parquet"], default="csv",
+        help="Format file yang ditulis bertahap selama scraping (XLSX dibuat di akhir); parquet butuh pyarrow"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=50,
+        help="Jumlah record per flush ke disk"
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Lanjutkan run sebelumnya: lewati pencarian yang selesai dan tempat yang sudah tersimpan"
+    )
+    parser.add_argument(
+        "--dedup-index", default=None,
+        help="File indeks ID tempat yang dipakai bersama antar run; tempat di dalamnya tidak dibuka lagi"
+    )
+    parser.add_argument(
+        "--metrics-json", default=None,
+        help="Laporan waktu per tahap (JSON); default output/<file>.metrics.json"
+    )
+    parser.add_argument(
+        "--metrics-prom", default=None,
+        help="Textfile Prometheus untuk node_exporter; default output/<file>.prom"
+    )
+    parser.add_argument(
+        "--progress", type=int, default=0, metavar="SECONDS",
+        help="Cetak baris progres (tempat/menit dan ETA) setiap SECONDS detik; 0 = mati"
+    )
+    parser.add_argument(
+        "--recycle-places", type=int, default=400,
+        help="Ganti Chrome worker setelah sekian tempat (0 = mati)"
+    )
+    parser.add_argument(
+        "--recycle-rss-mb", type=int, default=1500,
+        help="Ganti Chrome worker bila memori (RSS) proses browser melewati batas ini dalam MB (0 = mati)"
+    )
+    parser.add_argument(
+        "--recycle-drift", type=float, default=2.0,
+        help="Ganti Chrome worker bila median latensi per tempat melebihi sekian kali latensi awal (0 = mati)"
+    )
+    parser.add_argument(
+        "--dedupe",
+        help="Gabungkan tempat yang sama dengan nama/URL berbeda di file output (CSV, JSONL atau Parquet), tanpa browser"
+    )
+    parser.add_argument(
+        "--dedupe-radius", type=float, default=DEFAULT_RADIUS_M,
+        help="Jarak maksimum (meter) dua listing untuk dianggap tempat yang sama"
+    )
+    parser.add_argument(
+        "--dedupe-threshold", type=float, default=DEFAULT_NAME_THRESHOLD,
+        help="Kemiripan minimum nama yang sudah dinormalkan (0-1)"
+    )
+    parser.add_argument(
+        "--cache-proxy", action="store_true",
+        help="Jalankan proxy cache aset statis Maps (JS, CSS, font) yang dipakai bersama semua worker Chrome"
+    )
+    parser.add_argument(
+        "--asset-proxy",
+        help="Pakai proxy cache yang sudah berjalan (python cache_proxy.py), mis. http://127.0.0.1:8899"
+    )
+    parser.add_argument("--cache-dir", default="output/asset_cache", help="Folder cache aset untuk --cache-proxy")
+    parser.add_argument("--cache-size-mb", type=int, default=500, help="Ukuran maksimum cache aset di disk")
+    parser.add_argument(
+        "--max-rate", type=float, default=0.0,
+        help="Batas global permintaan halaman per detik untuk semua worker (0 = tanpa batas, hanya AIMD)"
+    )
+    parser.add_argument(
+        "--latency-factor", type=float, default=2.0,
+        help="Kurangi jumlah worker aktif bila latensi panel melebihi sekian kali latensi awal (0 = mati)"
+    )
+    parser.add_argument(
+        "--parse-workers", type=int, default=1,
+        help="Jumlah proses yang menormalkan data mentah panel secara batch (0 = di thread worker)"
+    )
+    parser.add_argument(
+        "--reparse", default=None, metavar="RAW_JSONL",
+        help="Bangun ulang file output dari output/<file>.raw.jsonl tanpa scraping ulang"
+    )
+    parser.add_argument(
+        "--refresh", default=None, metavar="PREVIOUS_OUTPUT",
+        help="Bandingkan kartu hasil dengan output run sebelumnya; hanya tempat baru atau berubah yang dibuka"
+    )
+    parser.add_argument(
+        "--spec", default=None,
+        help='File JSON {"categories": [...], "target_locations": [...]} sebagai pengganti input'
+    )
+    parser.add_argument(
+        "--coordinate", default=None, metavar="QUEUE_SQLITE",
+        help="Jalankan sebagai koordinator: isi antrean kerja, tunggu worker, lalu gabungkan hasil parsial"
+    )
+    parser.add_argument(
+        "--spawn-workers", type=int, default=0,
+        help="Jumlah proses worker lokal yang dijalankan koordinator"
+    )
+    parser.add_argument(
+        "--queue-worker", default=None, metavar="QUEUE_SQLITE",
+        help="Jalankan sebagai worker yang mengambil unit dari antrean kerja bersama"
+    )
+    parser.add_argument(
+        "--worker-id", default=None,
+        help="Nama worker di antrean (default host-pid)"
+    )
+    parser.add_argument(
+        "--daemon", action="store_true",
+        help="Jalankan sebagai daemon: Chrome tetap hidup dan pekerjaan diterima lewat HTTP lokal"
+    )
+    parser.add_argument(
+        "--pool-size", type=int, default=2,
+        help="Jumlah sesi Chrome yang disiapkan daemon di halaman Maps"
+    )
+    parser.add_argument(
+        "--port", type=int, default=8766,
+        help="Port HTTP daemon (hanya 127.0.0.1)"
+    )
+    parser.add_argument(
+        "--socket", default=None,
+        help="Path Unix socket untuk API daemon, menggantikan --port"
+    )
+    parser.add_argument(
+        "--profile-dir", default=None,
+        help="Folder profil Chrome persisten daemon (cookie dan cache aset Maps), satu subfolder per sesi"
+    )
+    return parser.parse_args()
+
+
+def start_asset_proxy(args):
+    """Sets args.asset_proxy(_spki) for --cache-proxy or --asset-proxy; returns a proxy started here."""
+    args.asset_proxy_spki = None
+    if args.asset_proxy:
+        args.asset_proxy_spki = fetch_spki(args.asset_proxy)
+        return None
+    if not args.cache_proxy:
+        return None
+    proxy = CachingProxy(args.cache_dir, args.cache_size_mb * 1_000_000).start()
+    args.asset_proxy, args.asset_proxy_spki = proxy.url, proxy.spki
+    print(f"⭐ Asset cache proxy at {proxy.url}, cache in {args.cache_dir}")
+    return proxy
+
+
+def rate_controller(args):
+    return RateController(rate=args.max_rate, latency_factor=args.latency_factor)
+
+
+def run_job(config, args, file_name=None, driver_pool=None):
+    """Scrapes one config with the options in args; used by the CLI and by daemon jobs.
+
+    Returns a summary dict with the output path, the number of places stored
+    and the duration in seconds.
+    """
+    started = time.time()
+    # Nama file ditentukan di awal karena data langsung ditulis selama scraping
+    location = config['target_locations'][-1]
+    file_name = file_name or f"google_maps_{location}".replace(" ", "_")  # Proses nama file
+    session = ScrapeSession(
+        None, block_profile=args.block_profile, transfer_report=args.transfer_report, fast_mode=args.fast,
+        tiling=args.tiles, driver_pool=driver_pool, recycle_places=args.recycle_places,
+        recycle_rss=args.recycle_rss_mb * 1_000_000, recycle_drift=args.recycle_drift, rate=rate_controller(args),
+        asset_proxy=args.asset_proxy, asset_proxy_spki=args.asset_proxy_spki
+    )
+    if args.refresh:
+        # Dibaca sebelum sink dibuka, karena file output lama boleh sama dengan file output baru
+        session.refresh = RefreshIndex.load(args.refresh, place_key)
+        print(f"🔄 {len(session.refresh)} places loaded from {args.refresh}")
+    business_list = BusinessList.streaming(
+        file_name, fmt=args.output_format, batch_size=args.batch_size,
+        append=args.resume, on_flush=session.mark_flushed, parse_workers=args.parse_workers
+    )
+    session.business_list = business_list
+    session.progress = ProgressStore(f"{BusinessList.save_at}/{file_name}.progress.sqlite", reset=not args.resume)
+    session.index = PlaceIndex(args.dedup_index)
+    if args.resume:
+        # Tempat yang sudah tertulis tapi belum tercatat di progress (crash di antara keduanya) juga dilewati
+        session.index.add(session.progress.all_places() | business_list.sink.existing_keys)
+    if args.progress > 0:
+        session.live_progress = LiveProgress(session.metrics, interval=args.progress)
+        session.live_progress.start()
+
+    # Main logic
+    detail_workers = max(1, args.detail_workers) if args.detail_mode == "href" else 0
+    try:
+        run_worker_pool(config, session, workers=args.workers or os.cpu_count(), detail_workers=detail_workers)
+    finally:
+        if session.live_progress is not None:
+            session.live_progress.stop()
+        # Juga saat worker gagal: buffer sink dan batch normalizer di-flush sebelum progress ditutup,
+        # karena flush itulah yang mencatat tempat sebagai selesai
+        try:
+            # After all the data is collected, build the Excel file from the streamed output
+            with session.metrics.timer("save", "all", "all"):
+                business_list.close(file_name)
+        finally:
+            session.progress.close()
+            session.index.close()
+    session.stats.report(args.block_profile)
+    session.index.report()
+    session.rate.report()
+    if session.refresh is not None:
+        session.refresh.report()
+
+    session.metrics.print_summary()
+    session.metrics.write_json(args.metrics_json or f"{BusinessList.save_at}/{file_name}.metrics.json")
+    session.metrics.write_prometheus(args.metrics_prom or f"{BusinessList.save_at}/{file_name}.prom")
+    return {
+        "output": business_list.sink.path,
+        "places": session.metrics.places,
+        "seconds": round(time.time() - started, 2),
+    }
+
+
+def reparse(raw_path, args):
+    """Rebuilds the output files of a run from its .raw.jsonl snapshots, without a browser."""
+    file_name = os.path.basename(raw_path)
+    if file_name.endswith(".raw.jsonl"):
+        file_name = file_name[:-len(".raw.jsonl")]
+    business_list = BusinessList.streaming(
+        file_name, fmt=args.output_format, batch_size=args.batch_size,
+        parse_workers=max(1, args.parse_workers), capture_raw=False
+    )
+    count = 0
+    for snapshot in iter_records(raw_path, "jsonl"):
+        business_list.add_raw(snapshot)
+        count += 1
+    business_list.close(file_name)
+    print(f"⭐ {count} places re-parsed into {business_list.sink.path}")
+
+
+def main():
+    start_time = time.time()
+    print("Script dimulai.")
+
+    args = parse_args()
+    global MAPS_URL
+    MAPS_URL = args.maps_url.rstrip("/")
+    if args.reparse:
+        reparse(args.reparse, args)
+        return
+    if args.dedupe:
+        dedupe_output(args.dedupe, args)
+        return
+    cache_proxy = start_asset_proxy(args)
+    try:
+        if args.daemon:
+            run_daemon(args)
+            return
+        if args.queue_worker:
+            run_queue_worker(args)
+            return
+        if args.coordinate:
+            run_coordinator(args)
+            return
+        config = load_config(args.spec)
+        if config is None:
+            return
 
-            places = driver.find_elements(By.CLASS_NAME, 'hfpxzc')
-
-            for place in places:
-                place_data = get_place_data(driver, place, last_url, last_place, category, location, business_list)
-                while last_url == driver.current_url:
-                    print("Please Wait..")
-                    last_url = driver.current_url
-                last_place = place_data.name
-                count += 1
-                last_url = driver.current_url
-                print(f"📩 {count} | Stored {place_data.name}")
-
-    # After all the data is collected, save it to a file
-    file_name = f"google_maps_{location}".replace(" ", "_")  # Proses nama file
-    business_list.save_to_excel(file_name)  # Save to Excel
-    business_list.save_to_csv(file_name)    # Save to CSV
-
-    # Close the browser after processing
-    driver.quit()
+        run_job(config, args)
+    finally:
+        if cache_proxy is not None:
+            cache_proxy.report()
+            cache_proxy.stop()
 
     end_time = time.time()
     total_duration = (end_time - start_time) / 60
@@ -0,0 +1,283 @@
+import argparse
+import asyncio
+import csv
+import importlib.util
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from cache_proxy import CachingProxy
+from dedupe import normalize_phone
+from driver_health import process_tree_rss
+from fixture_server import DEFAULT_DATA, FixtureServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ENGINE_FILES = {
+    "v1": os.path.join(HERE, "..", "Google_Maps_Scraping_v01", "App.py"),
+    "v2": os.path.join(HERE, "App_2.0.py"),
+}
+ENGINES = ["v1-sync", "v1-async", "v2-click", "v2-href", "v2-fast"]
+QUERY = ("Toko Bahan Bangunan", "Semarang")
+# Kolom output (name, phone, address, link) setiap versi
+OUTPUT_COLUMNS = {
+    "v1": ("name", "phone_number", "address", "location_link"),
+    "v2": ("name", "phone", "full_address", "googlemaps_link"),
+}
+
+
+def load_engine(version):
+    """Imports App.py / App_2.0.py as a module (App_2.0 is not a valid module name)."""
+    spec = importlib.util.spec_from_file_location(f"app_{version}", ENGINE_FILES[version])
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses resolve string annotations through sys.modules
+    sys.modules[spec.name] = module
+    sys.path.insert(0, os.path.dirname(ENGINE_FILES[version]))
+    spec.loader.exec_module(module)
+    return module
+
+
+class PeakRss:
+    """Samples process_tree_rss in the background and keeps the maximum."""
+
+    def __init__(self, interval=0.25):
+        self.interval = interval
+        self.peak = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+
+    def _run(self):
+        while not self.stopped.is_set():
+            try:
+                self.peak = max(self.peak, process_tree_rss())
+            except OSError:
+                pass
+            self.stopped.wait(self.interval)
+
+
+class CallCounter:
+    """Counts browser protocol calls by wrapping a method on a class."""
+
+    def __init__(self, owner, name, key=None):
+        self.owner = owner
+        self.name = name
+        self.key = key
+        self.counts = {}
+        self.lock = threading.Lock()
+        self.original = None
+
+    def __enter__(self):
+        self.original = getattr(self.owner, self.name)
+        counter = self
+        original = self.original
+
+        def counted(*args, **kwargs):
+            label = counter.key(*args, **kwargs) if counter.key else "call"
+            with counter.lock:
+                counter.counts[label] = counter.counts.get(label, 0) + 1
+            return original(*args, **kwargs)
+
+        setattr(self.owner, self.name, counted)
+        return self
+
+    def __exit__(self, *exc):
+        setattr(self.owner, self.name, self.original)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[round(fraction * 100) - 1]
+
+
+def without_punctuation(text):
+    # Normalizer membuang sebagian tanda baca dari nama dan alamat
+    return re.sub(r"\W", "", str(text or ""))
+
+
+def check_output(path, server, version):
+    """Differences between an engine's output file and the places the fixture server returned.
+
+    Every served place must appear exactly once by feature ID (v1 writes a row per
+    card, so repeated cards are allowed there) with the name, phone and address of
+    the source CSV, ignoring punctuation.
+    """
+    expected = {place["feature_id"]: place for place in server.places[:server.cap]}
+    name, phone, address, link = OUTPUT_COLUMNS[version]
+    if not os.path.exists(path):
+        return [f"no output file at {path}"]
+    with open(path, newline="", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+
+    problems = []
+    found = {}
+    for row in rows:
+        match = re.search(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)", row.get(link) or "")
+        place = expected.get(match.group(1)) if match else None
+        if place is None:
+            problems.append(f"unexpected place {row.get(name)!r} ({row.get(link)})")
+            continue
+        if match.group(1) in found and version == "v2":
+            problems.append(f"{place['name']!r} written twice")
+        found[match.group(1)] = row
+        for column, source in ((name, "name"), (address, "address")):
+            if without_punctuation(row.get(column)) != without_punctuation(place[source]):
+                problems.append(f"{place['name']!r}: {column} {row.get(column)!r} != {place[source]!r}")
+        if normalize_phone(row.get(phone)) != normalize_phone(place["phone"]):
+            problems.append(f"{place['name']!r}: {phone} {row.get(phone)!r} != {place['phone']!r}")
+    if len(found) != len(expected):
+        problems.insert(0, f"{len(found)} of {len(expected)} served places in the output")
+    return problems
+
+
+def run_v2(mode, server, output_dir, workers, detail_workers, proxy=None):
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+    app = load_engine("v2")
+    app.MAPS_URL = server.maps_url
+    app.BusinessList.save_at = output_dir
+    session = app.ScrapeSession(None, fast_mode=mode == "fast", asset_proxy=proxy)
+    session.business_list = app.BusinessList.streaming(f"bench_{mode}")
+    config = {"categories": [QUERY[0]], "target_locations": [QUERY[1]]}
+
+    with CallCounter(WebDriver, "execute", key=lambda driver, command, params=None: command) as calls:
+        app.run_worker_pool(config, session, workers=workers, detail_workers=detail_workers if mode == "href" else 0)
+    session.business_list.close()
+
+    places = next(session.counter) - 1
+    return places, session.stats.place_seconds, {
+        "webdriver_calls": calls.total - calls.counts.get("executeCdpCommand", 0),
+        "cdp_calls": calls.counts.get("executeCdpCommand", 0),
+    }, session.business_list.sink.path
+
+
+def run_v1(mode, server, output_dir, pages, total, proxy=None):
+    from playwright._impl._connection import Connection
+
+    app = load_engine("v1")
+    app.MAPS_URL = server.maps_url
+    app.HEADLESS = True
+    app.ASSET_PROXY = proxy
+    app.BusinessList.save_at = output_dir
+    stats = app.TransferStats()
+
+    with CallCounter(Connection, "_send_message_to_server") as calls:
+        if mode == "async":
+            asyncio.run(app.async_main([" ".join(QUERY)], total, pages, "off", stats))
+        else:
+            app.sync_main([" ".join(QUERY)], total, "off", stats)
+
+    output = f"{output_dir}/{app.output_name(' '.join(QUERY))}.csv"
+    return len(stats.place_seconds), stats.place_seconds, {"cdp_calls": calls.total}, output
+
+
+def run_engine(engine, args):
+    version, mode = engine.split("-")
+    server = FixtureServer(args.data, latency=args.latency, jitter=args.jitter, cap=args.max_results).start()
+    proxy = None
+    try:
+        with tempfile.TemporaryDirectory() as output_dir, PeakRss() as rss:
+            if args.cache_proxy:
+                # Fixture server memakai HTTP biasa, jadi tidak ada HTTPS yang perlu dibuka
+                proxy = CachingProxy(os.path.join(output_dir, "asset_cache"), 100_000_000, intercept_hosts=()).start()
+            proxy_url = proxy.url if proxy is not None else None
+            started = time.time()
+            if version == "v1":
+                places, latencies, calls, output = run_v1(
+                    mode, server, output_dir, args.pages, args.max_results, proxy_url
+                )
+            else:
+                places, latencies, calls, output = run_v2(
+                    mode, server, output_dir, args.workers, args.detail_workers, proxy_url
+                )
+            duration = time.time() - started
+            problems = check_output(output, server, version)
+            if proxy is not None:
+                proxy.stop()
+    finally:
+        server.stop()
+
+    return {
+        "engine": engine,
+        "places": places,
+        "seconds": round(duration, 2),
+        "places_per_minute": round(places / duration * 60, 1) if duration else 0.0,
+        "p50_place_seconds": round(percentile(latencies, 0.50), 3),
+        "p95_place_seconds": round(percentile(latencies, 0.95), 3),
+        "webdriver_calls": calls.get("webdriver_calls", 0),
+        "cdp_calls": calls.get("cdp_calls", 0),
+        "peak_rss_mb": round(rss.peak / 1_000_000, 1),
+        "origin_requests": server.requests,
+        "cache_hits": proxy.hits if proxy is not None else 0,
+        "output_problems": problems,
+    }
+
+
+def print_report(results):
+    columns = [column for column in results[0] if column != "output_problems"]
+    widths = [max(len(column), *(len(str(result[column])) for result in results)) for column in columns]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for result in results:
+        print("  ".join(str(result[column]).ljust(width) for column, width in zip(columns, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end App.py dan App_2.0.py terhadap fixture server")
+    parser.add_argument("--engines", default=",".join(ENGINES), help=f"Daftar engine, dipisah koma: {', '.join(ENGINES)}")
+    parser.add_argument("--data", default=DEFAULT_DATA, help="CSV output yang disajikan fixture server")
+    parser.add_argument("--latency", type=float, default=0.2, help="Latensi per request fixture (detik)")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Variasi latensi acak (detik)")
+    parser.add_argument("--max-results", type=int, default=40, help="Jumlah hasil per pencarian")
+    parser.add_argument("--workers", type=int, default=1, help="Worker pencarian App_2.0.py")
+    parser.add_argument("--detail-workers", type=int, default=4, help="Worker detail untuk v2-href")
+    parser.add_argument("--pages", type=int, default=4, help="Halaman paralel untuk v1-async")
+    parser.add_argument(
+        "--cache-proxy", action="store_true",
+        help="Arahkan browser lewat cache_proxy.py, untuk membandingkan jumlah request ke fixture server"
+    )
+    parser.add_argument("--json", help="Simpan hasil ke file JSON")
+    parser.add_argument(
+        "--min-places-per-minute", type=float, default=0.0,
+        help="Gagal (exit code 1) bila engine mana pun lebih lambat dari ini"
+    )
+    args = parser.parse_args()
+
+    results = [run_engine(engine.strip(), args) for engine in args.engines.split(",") if engine.strip()]
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    failed = False
+    for result in results:
+        for problem in result["output_problems"]:
+            print(f"❌ {result['engine']}: {problem}")
+            failed = True
+    slow = [result["engine"] for result in results if result["places_per_minute"] < args.min_places_per_minute]
+    if slow:
+        print(f"❌ Below {args.min_places_per_minute} places/minute: {', '.join(slow)}")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,440 @@
+import argparse
+import base64
+import datetime
+import hashlib
+import http.client
+import json
+import os
+import re
+import select
+import socket
+import ssl
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+try:
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+except ImportError:  # cryptography opsional: tanpa itu HTTPS hanya diteruskan apa adanya (tunnel)
+    x509 = None
+
+# Host aset Maps yang koneksi HTTPS-nya dibuka oleh proxy supaya asetnya bisa disimpan
+INTERCEPT_HOSTS = (
+    "www.google.com", "maps.gstatic.com", "www.gstatic.com", "fonts.gstatic.com", "fonts.googleapis.com",
+)
+STATIC_TYPES = ("javascript", "text/css", "font/", "image/", "application/wasm", "application/font")
+# Hanya respons yang boleh di-cache minimal sehari yang dianggap aset statis
+MIN_MAX_AGE = 86400
+HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "proxy-connection",
+    "te", "trailer", "transfer-encoding", "upgrade",
+}
+UPSTREAM_TIMEOUT = 30
+
+
+def max_age(headers):
+    """Seconds a response may be reused for, 0 when it must not be stored."""
+    cache_control = (headers.get("Cache-Control") or "").lower()
+    if any(word in cache_control for word in ("no-store", "no-cache", "private")):
+        return 0
+    match = re.search(r"max-age=(\d+)", cache_control)
+    if match:
+        return int(match.group(1))
+    return MIN_MAX_AGE if "immutable" in cache_control else 0
+
+
+def is_static_asset(status, headers):
+    """Whether a GET response is a long-lived JS/CSS/font/image file that every worker can share."""
+    if status != 200 or headers.get("Set-Cookie"):
+        return False
+    vary = {value.strip().lower() for value in (headers.get("Vary") or "").split(",") if value.strip()}
+    if vary - {"accept-encoding", "origin"}:
+        return False
+    content_type = (headers.get("Content-Type") or "").lower()
+    return max_age(headers) >= MIN_MAX_AGE and any(kind in content_type for kind in STATIC_TYPES)
+
+
+def cache_key(url, accept_encoding=""):
+    return hashlib.sha256(f"{url}\n{accept_encoding}".encode("utf-8")).hexdigest()
+
+
+def fetch_spki(proxy_url):
+    """SPKI pin published by a running CachingProxy, "" when it does not intercept HTTPS."""
+    # Tanpa proxy dari environment: permintaan ini langsung ke proxy cache
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    with opener.open(f"{proxy_url.rstrip('/')}/spki", timeout=10) as response:
+        return response.read().decode("ascii").strip()
+
+
+class DiskLRU:
+    """Cache entries as files under directory, least recently used evicted beyond max_bytes.
+
+    Each entry is one file: a JSON line with status, headers and expiry,
+    then the body. Entries left by an earlier run are picked up in mtime
+    order, and a hit touches the file, so the order survives restarts.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        files = [entry for entry in os.scandir(directory) if entry.name.endswith(".entry")]
+        for entry in sorted(files, key=lambda entry: entry.stat().st_mtime):
+            size = entry.stat().st_size
+            self.entries[entry.name[:-len(".entry")]] = size
+            self.size += size
+        with self.lock:
+            self._evict()
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.entry")
+
+    def get(self, key):
+        """(meta, body) of a stored entry, or None."""
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+        try:
+            with open(self.path(key), "rb") as file:
+                meta = json.loads(file.readline())
+                body = file.read()
+            os.utime(self.path(key))
+        except (OSError, ValueError):
+            self._drop(key)
+            return None
+        return meta, body
+
+    def put(self, key, meta, body):
+        data = json.dumps(meta).encode("utf-8") + b"\n" + body
+        if len(data) > self.max_bytes:
+            return
+        temporary = f"{self.path(key)}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(data)
+        os.replace(temporary, self.path(key))
+        with self.lock:
+            self.size += len(data) - self.entries.pop(key, 0)
+            self.entries[key] = len(data)
+            self._evict()
+
+    def _drop(self, key):
+        with self.lock:
+            self.size -= self.entries.pop(key, 0)
+
+    def _evict(self):
+        while self.size > self.max_bytes and self.entries:
+            key, size = self.entries.popitem(last=False)
+            self.size -= size
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+
+
+class CertificateAuthority:
+    """Local CA issuing a certificate per intercepted host, all on the CA's own key.
+
+    Chrome trusts that one key through --ignore-certificate-errors-spki-list,
+    so nothing has to be installed in the system trust store.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        key_path = os.path.join(directory, "ca.key")
+        if os.path.exists(key_path):
+            with open(key_path, "rb") as file:
+                self.key = serialization.load_pem_private_key(file.read(), password=None)
+        else:
+            self.key = ec.generate_private_key(ec.SECP256R1())
+            with open(key_path, "wb") as file:
+                file.write(self.key.private_bytes(
+                    serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+                ))
+        self.name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "Google Maps Scraper asset cache")])
+        self.key_pem = self.key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        self.contexts = {}
+        self.lock = threading.Lock()
+
+    @property
+    def spki(self):
+        public_key = self.key.public_key().public_bytes(
+            serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        return base64.b64encode(hashlib.sha256(public_key).digest()).decode("ascii")
+
+    def context(self, host):
+        """Server-side SSLContext presenting a certificate for host."""
+        with self.lock:
+            if host not in self.contexts:
+                path = os.path.join(self.directory, f"{host}.pem")
+                with open(path, "wb") as file:
+                    file.write(self._certificate(host).public_bytes(serialization.Encoding.PEM) + self.key_pem)
+                context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+                # Proxy hanya memahami HTTP/1.1 di dalam koneksi yang dibuka
+                context.set_alpn_protocols(["http/1.1"])
+                context.load_cert_chain(path)
+                self.contexts[host] = context
+            return self.contexts[host]
+
+    def _certificate(self, host):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return (
+            x509.CertificateBuilder()
+            .subject_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, host)]))
+            .issuer_name(self.name)
+            .public_key(self.key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(days=1))
+            .not_valid_after(now + datetime.timedelta(days=365))
+            .add_extension(x509.SubjectAlternativeName([x509.DNSName(host)]), critical=False)
+            .sign(self.key, hashes.SHA256())
+        )
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # host:port asal koneksi HTTPS yang sedang dibuka proxy, None untuk HTTP biasa
+    tls_origin = None
+
+    def do_CONNECT(self):
+        proxy = self.server.proxy
+        host, _, port = self.path.rpartition(":")
+        if proxy.intercepts(host):
+            self.send_response(200, "Connection Established")
+            self.end_headers()
+            try:
+                self.connection = proxy.ca.context(host).wrap_socket(self.connection, server_side=True)
+            except (ssl.SSLError, OSError):
+                self.close_connection = True
+                return
+            self.rfile = self.connection.makefile("rb")
+            self.wfile = self.connection.makefile("wb")
+            self.tls_origin = host if port == "443" else self.path
+            self.close_connection = False
+            return
+        try:
+            upstream = socket.create_connection((host, int(port or 443)), timeout=UPSTREAM_TIMEOUT)
+        except OSError as e:
+            self.send_error(502, str(e))
+            return
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        proxy.tunnel(self.connection, upstream)
+        self.close_connection = True
+
+    def do_GET(self):
+        if self.tls_origin:
+            url = f"https://{self.tls_origin}{self.path}"
+        elif self.path == "/spki":
+            # Dipakai worker lain untuk mengetahui kunci yang harus dipercaya Chrome
+            return self.server.proxy.respond(self, 200, [("Content-Type", "text/plain")], self.server.proxy.spki.encode())
+        elif self.path.startswith("/"):
+            return self.send_error(404)
+        else:
+            url = self.path
+        self.server.proxy.forward(self, url)
+
+    do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CachingProxy:
+    """Local HTTP proxy shared by every Chrome worker that keeps Maps static assets on disk.
+
+    Long-lived JS, CSS, font and image responses are stored in a DiskLRU of
+    max_bytes and served from disk afterwards; everything else, including
+    all search and place traffic, is passed through untouched. HTTPS to
+    intercept_hosts is opened with a local CertificateAuthority (needs the
+    optional cryptography package); other HTTPS connections are tunnelled.
+    """
+
+    def __init__(self, cache_dir, max_bytes, host="127.0.0.1", port=0, intercept_hosts=INTERCEPT_HOSTS):
+        self.cache = DiskLRU(os.path.join(cache_dir, "entries"), max_bytes)
+        self.intercept_hosts = set(intercept_hosts)
+        self.ca = CertificateAuthority(os.path.join(cache_dir, "ca")) if x509 is not None and intercept_hosts else None
+        if intercept_hosts and self.ca is None:
+            print("❓ cryptography is not installed, HTTPS assets are tunnelled without caching")
+        self.hits = 0
+        self.stored = 0
+        self.passed = 0
+        self.bytes_saved = 0
+        self.stats_lock = threading.Lock()
+        # Koneksi keep-alive ke server asal, dipakai ulang antar permintaan
+        self.idle = {}
+        self.idle_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), ProxyHandler)
+        self.httpd.proxy = self
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def spki(self):
+        return self.ca.spki if self.ca is not None else ""
+
+    def intercepts(self, host):
+        return self.ca is not None and host in self.intercept_hosts
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def forward(self, request, url):
+        body = request.rfile.read(int(request.headers.get("Content-Length") or 0))
+        key = None
+        if request.command == "GET" and "Range" not in request.headers:
+            key = cache_key(url, request.headers.get("Accept-Encoding", ""))
+            cached = self.cache.get(key)
+            if cached is not None and cached[0]["expires"] > time.time():
+                meta, data = cached
+                with self.stats_lock:
+                    self.hits += 1
+                    self.bytes_saved += len(data)
+                return self.respond(request, meta["status"], meta["headers"], data)
+
+        parts = urlsplit(url)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        headers = {name: value for name, value in request.headers.items() if name.lower() not in HOP_HEADERS}
+        origin = (parts.scheme, parts.hostname, parts.port)
+        try:
+            response, data = self._fetch(origin, request.command, path, body, headers)
+        except (OSError, http.client.HTTPException) as e:
+            return request.send_error(502, str(e))
+
+        response_headers = [
+            (name, value) for name, value in response.getheaders()
+            if name.lower() not in HOP_HEADERS and (name.lower() != "content-length" or request.command == "HEAD")
+        ]
+        if key is not None and is_static_asset(response.status, response.headers):
+            meta = {"status": response.status, "headers": response_headers, "expires": time.time() + max_age(response.headers)}
+            self.cache.put(key, meta, data)
+            with self.stats_lock:
+                self.stored += 1
+        else:
+            with self.stats_lock:
+                self.passed += 1
+        self.respond(request, response.status, response_headers, data)
+
+    def respond(self, request, status, headers, data):
+        request.send_response(status)
+        for name, value in headers:
+            request.send_header(name, value)
+        if request.command != "HEAD":
+            request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        if request.command != "HEAD":
+            request.wfile.write(data)
+
+    def tunnel(self, client, upstream):
+        sockets = [client, upstream]
+        try:
+            while True:
+                readable, _, failed = select.select(sockets, [], sockets, UPSTREAM_TIMEOUT)
+                if failed or not readable:
+                    break
+                for source in readable:
+                    data = source.recv(65536)
+                    if not data:
+                        return
+                    (upstream if source is client else client).sendall(data)
+        except OSError:
+            pass
+        finally:
+            upstream.close()
+
+    def _fetch(self, origin, method, path, body, headers):
+        while True:
+            connection, reused = self._connection(*origin)
+            try:
+                connection.request(method, path, body=body or None, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                # Koneksi keep-alive lama bisa sudah ditutup server asal: ulangi sekali dengan koneksi baru
+                if reused:
+                    continue
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(origin, connection)
+            return response, data
+
+    def _connection(self, scheme, host, port):
+        """(connection, reused) to an origin, reusing an idle keep-alive connection when there is one."""
+        with self.idle_lock:
+            connections = self.idle.get((scheme, host, port))
+            if connections:
+                return connections.pop(), True
+        if scheme == "https":
+            connection = http.client.HTTPSConnection(
+                host, port, timeout=UPSTREAM_TIMEOUT, context=ssl.create_default_context()
+            )
+        else:
+            connection = http.client.HTTPConnection(host, port, timeout=UPSTREAM_TIMEOUT)
+        return connection, False
+
+    def _release(self, origin, connection):
+        with self.idle_lock:
+            self.idle.setdefault(origin, []).append(connection)
+
+    def report(self):
+        requests = self.hits + self.stored + self.passed
+        print(
+            f"🗄️ Asset cache: {self.hits}/{requests} requests served from disk "
+            f"({self.bytes_saved / 1_000_000:.1f} MB saved), {self.stored} stored, {self.passed} passed through, "
+            f"{self.cache.size / 1_000_000:.1f} MB on disk"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Proxy cache aset statis Google Maps untuk semua worker Chrome")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--cache-dir", default="output/asset_cache", help="Folder cache aset dan kunci CA lokal")
+    parser.add_argument("--cache-size-mb", type=int, default=500, help="Ukuran maksimum cache di disk")
+    parser.add_argument(
+        "--no-intercept", action="store_true",
+        help="Teruskan semua HTTPS tanpa dibuka (hanya aset HTTP, mis. fixture server, yang di-cache)"
+    )
+    args = parser.parse_args()
+
+    proxy = CachingProxy(
+        args.cache_dir, args.cache_size_mb * 1_000_000, args.host, args.port,
+        intercept_hosts=() if args.no_intercept else INTERCEPT_HOSTS
+    )
+    print(f"⭐ Asset cache proxy at {proxy.url}, pass it to App_2.0.py with --asset-proxy {proxy.url}")
+    try:
+        proxy.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import math
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+from refresh import parse_review_count
+
+DEFAULT_RADIUS_M = 150
+DEFAULT_NAME_THRESHOLD = 0.85
+EARTH_RADIUS_M = 6_371_000
+METERS_PER_DEGREE = 111_320
+# Jenis toko dan badan usaha di depan nama, tidak membedakan satu toko dengan yang lain
+NAME_PREFIXES = re.compile(
+    r"^(?:toko bahan bangunan|toko bangunan|toko material|bahan bangunan|toko|tb|ud|cv|pt)\s+"
+)
+NAME_SUFFIXES = re.compile(r"\s+(?:ud|cv|pt|tbk)$")
+# Titik tempat itu sendiri di URL; "@lat,lng" hanya pusat viewport pencarian
+PLACE_POINT = re.compile(r"!3d(-?\d+(?:\.\d+)?)!4d(-?\d+(?:\.\d+)?)")
+
+
+def normalize_name(name):
+    """'subur makmur' from 'TB. Subur Makmur', 'Toko Bangunan Subur Makmur' or 'CV Subur Makmur | Semarang'."""
+    # Bagian setelah "|" biasanya hanya keterangan tambahan (kota, produk)
+    name = str(name or "").split("|")[0].lower()
+    name = re.sub(r"[^\w\s]", " ", name).replace("_", " ")
+    name = re.sub(r"\s+", " ", name).strip()
+    previous = None
+    while name != previous:
+        previous = name
+        name = NAME_SUFFIXES.sub("", NAME_PREFIXES.sub("", name))
+    return name
+
+
+def normalize_phone(phone):
+    """Digits of a phone number in the local 0… form, '' when there is none."""
+    digits = re.sub(r"\D", "", str(phone or ""))
+    if digits.startswith("62"):
+        digits = "0" + digits[2:]
+    return digits
+
+
+def coordinates(record):
+    """(latitude, longitude) of the place: the !3d…!4d… point of its link, else the stored columns.
+
+    Older output files filled the latitude/longitude columns from the
+    "@lat,lng" viewport centre, which can be kilometres from the place, so
+    the link is preferred whenever it carries the place point.
+    """
+    match = PLACE_POINT.search(str(record.get("googlemaps_link") or ""))
+    if match:
+        return float(match.group(1)), float(match.group(2))
+    try:
+        latitude, longitude = float(record.get("latitude")), float(record.get("longitude"))
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(latitude) or math.isnan(longitude):
+        return None
+    return latitude, longitude
+
+
+def distance_m(a, b):
+    """Haversine distance in metres between two (latitude, longitude) points."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(h))
+
+
+def similar_names(a, b, threshold=DEFAULT_NAME_THRESHOLD):
+    if not a or not b:
+        return False
+    if a == b:
+        return True
+    # "Subur Makmur 2" adalah cabang lain dari "Subur Makmur", bukan duplikat
+    if set(re.findall(r"\d+", a)) != set(re.findall(r"\d+", b)):
+        return False
+    return SequenceMatcher(None, a, b).ratio() >= threshold
+
+
+class UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, item):
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+
+def find_clusters(records, radius_m=DEFAULT_RADIUS_M, threshold=DEFAULT_NAME_THRESHOLD, key=None):
+    """Groups of record indexes that are the same place, in input order.
+
+    Records with the same key(googlemaps_link) are always one place. Beyond
+    that, candidates are only looked up in the neighbouring cells of a
+    radius_m grid over latitude/longitude, so the cost grows with the
+    number of records rather than with every pair of them. Two candidates
+    within radius_m match when their normalized names are similar or their
+    phones are equal; different phones on both sides veto a name match.
+    """
+    union = UnionFind(len(records))
+    if key is not None:
+        first = {}
+        for index, record in enumerate(records):
+            place_id = key(record.get("googlemaps_link"))
+            if place_id:
+                union.union(first.setdefault(place_id, index), index)
+
+    points = {index: point for index, point in enumerate(map(coordinates, records)) if point is not None}
+    if points:
+        # Sel cukup lebar di lintang tertinggi data, jadi tetangga dalam radius selalu ada di 3×3 sel sekitar
+        max_latitude = min(89.0, max(abs(latitude) for latitude, _ in points.values()))
+        cell_latitude = radius_m / METERS_PER_DEGREE
+        cell_longitude = cell_latitude / math.cos(math.radians(max_latitude))
+        grid = defaultdict(list)
+        for index, (latitude, longitude) in points.items():
+            grid[(math.floor(latitude / cell_latitude), math.floor(longitude / cell_longitude))].append(index)
+
+        names = {}
+        phones = {}
+        for index in points:
+            names[index] = normalize_name(records[index].get("name"))
+            phones[index] = normalize_phone(records[index].get("phone"))
+
+        for (row, column), members in grid.items():
+            neighbours = [
+                other
+                for d_row in (-1, 0, 1)
+                for d_column in (-1, 0, 1)
+                for other in grid.get((row + d_row, column + d_column), ())
+            ]
+            for index in members:
+                for other in neighbours:
+                    # Setiap pasangan cukup dibandingkan sekali
+                    if other <= index or union.find(index) == union.find(other):
+                        continue
+                    if distance_m(points[index], points[other]) > radius_m:
+                        continue
+                    phone, other_phone = phones[index], phones[other]
+                    same_phone = bool(phone) and phone == other_phone
+                    conflicting_phones = bool(phone) and bool(other_phone) and phone != other_phone
+                    if same_phone or (
+                        similar_names(names[index], names[other], threshold)
+                        and (not conflicting_phones or names[index] == names[other])
+                    ):
+                        union.union(index, other)
+
+    clusters = defaultdict(list)
+    for index in range(len(records)):
+        clusters[union.find(index)].append(index)
+    return list(clusters.values())
+
+
+def merge_records(records):
+    """One record for a cluster: the listing with the most reviews, blanks filled from the others."""
+    ranked = sorted(records, key=lambda record: parse_review_count(record.get("reviews_amount")) or 0, reverse=True)
+    merged = dict(ranked[0])
+    for record in ranked[1:]:
+        for name, value in record.items():
+            if merged.get(name) in (None, "") and value not in (None, ""):
+                merged[name] = value
+    return merged
+
+
+def merge_near_duplicates(records, radius_m=DEFAULT_RADIUS_M, threshold=DEFAULT_NAME_THRESHOLD, key=None):
+    """(merged records, clusters of original records with more than one member)."""
+    records = list(records)
+    merged = []
+    duplicates = []
+    for cluster in find_clusters(records, radius_m, threshold, key):
+        members = [records[index] for index in cluster]
+        merged.append(merge_records(members) if len(members) > 1 else members[0])
+        if len(members) > 1:
+            duplicates.append(members)
+    return merged, duplicates
+
@@ -0,0 +1,108 @@
+import os
+import statistics
+import time
+from collections import deque
+
+try:
+    import psutil
+except ImportError:  # psutil opsional, /proc dipakai sebagai gantinya (Linux)
+    psutil = None
+
+
+def process_tree_rss(root_pid=None):
+    """RSS in bytes of root_pid (default: this process) plus every descendant."""
+    root_pid = root_pid or os.getpid()
+    if psutil is not None:
+        try:
+            root = psutil.Process(root_pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return 0
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+    return _proc_tree_rss(root_pid)
+
+
+def _proc_tree_rss(root_pid):
+    parents = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as file:
+                parents[int(name)] = int(file.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+
+    tree = {root_pid}
+    changed = True
+    while changed:
+        changed = False
+        for pid, parent in parents.items():
+            if parent in tree and pid not in tree:
+                tree.add(pid)
+                changed = True
+
+    total = 0
+    for pid in tree:
+        try:
+            with open(f"/proc/{pid}/status") as file:
+                for line in file:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
+
+
+class DriverHealth:
+    """Tracks one browser's memory and per-place latency and says when to recycle it.
+
+    Each limit is off when 0: max_places places on this browser, max_rss
+    bytes for the browser process tree, or max_drift times the baseline
+    latency (median of the first window places) for the median of the last
+    window places. RSS is sampled at most every rss_interval seconds.
+    """
+
+    def __init__(self, pid, max_places=0, max_rss=0, max_drift=0.0, window=20, rss_interval=5.0):
+        self.pid = pid
+        self.max_places = max_places
+        self.max_rss = max_rss
+        self.max_drift = max_drift
+        self.window = window
+        self.rss_interval = rss_interval
+        self.places = 0
+        self.latencies = deque(maxlen=window)
+        self.baseline = None
+        self.rss = 0
+        self.rss_sampled_at = 0.0
+
+    def add_place(self, seconds):
+        self.places += 1
+        self.latencies.append(seconds)
+        if self.baseline is None and len(self.latencies) == self.window:
+            self.baseline = statistics.median(self.latencies)
+
+    def sample_rss(self):
+        if self.pid and time.time() - self.rss_sampled_at >= self.rss_interval:
+            self.rss = process_tree_rss(self.pid)
+            self.rss_sampled_at = time.time()
+        return self.rss
+
+    def recycle_reason(self):
+        """Why this browser should be replaced now, or None while it is healthy."""
+        if self.max_places and self.places >= self.max_places:
+            return f"{self.places} places"
+        if self.max_rss and self.sample_rss() >= self.max_rss:
+            return f"RSS {self.rss / 1_000_000:.0f} MB"
+        if self.max_drift and self.baseline and len(self.latencies) == self.window:
+            recent = statistics.median(self.latencies)
+            if recent > self.baseline * self.max_drift:
+                return f"latency {recent:.2f} s/place vs {self.baseline:.2f} s baseline"
+        return None
@@ -0,0 +1,387 @@
+import argparse
+import csv
+import html
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, quote_plus, unquote, urlparse
+
+# Hasil pencarian "Toko Bahan Bangunan en Semarang" yang menjadi sumber contoh output
+DEFAULT_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "google_maps_Semarang.csv")
+PAGE_SIZE = 20
+# Sama dengan VIEWPORT di App_2.0.py, supaya tile yang diminta mencakup area yang sama
+VIEWPORT = (1366, 768)
+# Pengganti bundle JS Maps yang berukuran besar dan boleh di-cache selamanya
+BUNDLE_PATH = "/maps/_/js/app.js"
+BUNDLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+SHELL_PAGE = """<!doctype html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Google Maps</title>
+<script src="/maps/_/js/app.js"></script>
+<style>
+#side {{ position: absolute; left: 0; top: 0; width: 408px; height: 100vh; display: flex; flex-direction: column; }}
+#results {{ flex: 1; min-height: 0; display: flex; }}
+div[role="feed"] {{ flex: 1; overflow-y: auto; }}
+.Nv2PK {{ position: relative; height: 110px; border-bottom: 1px solid #ddd; }}
+a.hfpxzc {{ position: absolute; inset: 0; }}
+.qjESne.veYFef {{ height: 40px; }}
+#panel {{ position: absolute; left: 420px; top: 0; right: 0; }}
+</style>
+</head>
+<body>
+<div id="side">
+<input id="searchboxinput" class="searchboxinput" name="q" value="{query}">
+<button id="searchbox-searchbutton">Search</button>
+<div id="results"></div>
+</div>
+<div id="panel">{panel}</div>
+<script>
+window.APP_INITIALIZATION_STATE = {state};
+const INITIAL_QUERY = {initial_query};
+const PAGE_SIZE = {page_size};
+let query = null, offset = 0, loading = false, exhausted = false, feed = null;
+
+function decode(text) {{
+    const body = JSON.parse(text.replace(/\\/\\*""\\*\\/$/, ""));
+    return JSON.parse(body.d.slice(4));
+}}
+
+function escapeHtml(value) {{
+    const div = document.createElement("div");
+    div.textContent = value == null ? "" : String(value);
+    return div.innerHTML;
+}}
+
+function renderCards(entries) {{
+    feed.querySelectorAll(".qjESne.veYFef").forEach(loader => loader.remove());
+    for (const entry of entries) {{
+        const place = entry[14];
+        const card = document.createElement("div");
+        card.className = "Nv2PK";
+        card.innerHTML =
+            '<a class="hfpxzc" aria-label="' + escapeHtml(place[11]) + '" href="' + escapeHtml(place[200]) + '" data-id="' + escapeHtml(place[10]) + '"></a>' +
+            '<div class="fontHeadlineSmall">' + escapeHtml(place[11]) + '</div>' +
+            (place[4] ? '<span class="MW4etd">' + String(place[4][7]).replace(".", ",") + '</span><span class="UY7F9">(' + place[4][8] + ')</span>' : '');
+        feed.appendChild(card);
+    }}
+    offset += entries.length;
+    if (entries.length < PAGE_SIZE) {{
+        exhausted = true;
+        const end = document.createElement("span");
+        end.className = "HlvSq";
+        end.textContent = "Anda telah mencapai akhir daftar.";
+        feed.appendChild(end);
+    }} else {{
+        const loader = document.createElement("div");
+        loader.className = "qjESne veYFef";
+        feed.appendChild(loader);
+    }}
+}}
+
+async function loadMore() {{
+    if (loading || exhausted) {{
+        return;
+    }}
+    loading = true;
+    const viewport = (location.pathname.match(/@[^/]+/) || [""])[0];
+    const params = new URLSearchParams({{tbm: "map", q: query, offset: offset, vp: viewport}});
+    const response = await fetch("/search?" + params.toString());
+    renderCards(decode(await response.text())[0][1].slice(1));
+    loading = false;
+}}
+
+function startFeed(value) {{
+    query = value;
+    offset = 0;
+    exhausted = false;
+    document.getElementById("results").innerHTML = '<div role="feed" aria-label="Hasil"></div>';
+    feed = document.querySelector('div[role="feed"]');
+    feed.addEventListener("scroll", () => {{
+        if (feed.scrollTop + feed.clientHeight >= feed.scrollHeight - 60) {{
+            loadMore();
+        }}
+    }});
+}}
+
+function search(value) {{
+    startFeed(value);
+    loadMore();
+}}
+
+document.getElementById("searchbox-searchbutton").addEventListener("click", () => search(document.getElementById("searchboxinput").value));
+document.getElementById("searchboxinput").addEventListener("keydown", event => {{
+    if (event.key === "Enter") {{
+        search(event.target.value);
+    }}
+}});
+document.addEventListener("click", async event => {{
+    const link = event.target.closest("a.hfpxzc");
+    if (!link) {{
+        return;
+    }}
+    event.preventDefault();
+    const response = await fetch("/maps/api/panel?id=" + encodeURIComponent(link.dataset.id));
+    document.getElementById("panel").innerHTML = await response.text();
+    history.pushState(null, "", link.getAttribute("href"));
+}});
+
+if (INITIAL_QUERY !== null) {{
+    startFeed(INITIAL_QUERY);
+    const initial = window.APP_INITIALIZATION_STATE[3][2];
+    if (initial) {{
+        renderCards(JSON.parse(initial.slice(4))[0][1].slice(1));
+    }} else {{
+        loadMore();
+    }}
+}}
+</script>
+</body>
+</html>
+"""
+
+PANEL = """<div class="lMbq3e">
+<h1 class="DUwDvf lfPIob">{name}</h1>
+<div class="skqShb"><div class="rating"></div><div class="F7nice"><span><span aria-hidden="true">{rating}</span></span><span><span><span aria-label="{reviews} ulasan">({reviews})</span></span></span></div></div>
+</div>
+<button data-item-id="address"><div class="fontBodyMedium">{address}</div></button>
+<button data-item-id="phone:tel:{phone_digits}"><div class="fontBodyMedium">{phone}</div></button>
+<div jsaction="pane.reviewChart.moreReviews"><div role="img" aria-label="{rating} bintang"></div></div>
+"""
+
+
+def load_places(path):
+    """Recorded places (one per row of a scraper output CSV) with their IDs and real coordinates."""
+    places = []
+    with open(path, newline="", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            link = row["googlemaps_link"]
+            feature_id = re.search(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)", link)
+            if not feature_id:
+                continue
+            g_id = re.search(r"!16s([^!?&]+)", link)
+            latitude = float(re.search(r"!3d(-?[\d.]+)", link).group(1))
+            longitude = float(re.search(r"!4d(-?[\d.]+)", link).group(1))
+            places.append({
+                "name": row["name"],
+                "phone": row["phone"],
+                "address": row["full_address"],
+                "rating": row["reviews_score"],
+                "reviews": row["reviews_amount"],
+                "latitude": latitude,
+                "longitude": longitude,
+                "feature_id": feature_id.group(1),
+                "g_id": unquote(g_id.group(1)) if g_id else None,
+            })
+    return places
+
+
+def in_viewport(place, viewport):
+    """True if place lies inside an '@lat,lng,zoomz' viewport (same geometry as App_2.0.Tile)."""
+    match = re.match(r"@(-?[\d.]+),(-?[\d.]+),([\d.]+)z", viewport or "")
+    if not match:
+        return True
+    latitude, longitude, zoom = float(match.group(1)), float(match.group(2)), float(match.group(3))
+    degrees_per_pixel = 360 / (256 * 2 ** zoom)
+    longitude_span = VIEWPORT[0] * degrees_per_pixel
+    latitude_span = VIEWPORT[1] * degrees_per_pixel * math.cos(math.radians(latitude))
+    return abs(place["latitude"] - latitude) <= latitude_span / 2 and abs(place["longitude"] - longitude) <= longitude_span / 2
+
+
+class FixtureServer:
+    """Local stand-in for Google Maps serving recorded results feeds and place panels.
+
+    Every query returns the recorded result set (filtered to the requested
+    viewport and capped like the real site). latency and jitter, in seconds,
+    are added to each search XHR, panel and place page.
+    """
+
+    def __init__(self, data_path=DEFAULT_DATA, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, cap=120,
+                 bundle_kb=512):
+        self.places = load_places(data_path)
+        self.by_id = {place["feature_id"]: place for place in self.places}
+        self.latency = latency
+        self.jitter = jitter
+        self.cap = cap
+        line = "/* fixture bundle padding */\n"
+        self.bundle = "window.fixtureBundle = true;\n" + line * (bundle_kb * 1024 // len(line))
+        self.requests = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def maps_url(self):
+        return f"{self.base_url}/maps"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def delay(self):
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+    def place_url(self, place):
+        slug = quote_plus(place["name"])
+        coordinates = f"!3d{place['latitude']}!4d{place['longitude']}"
+        g_id = f"!16s{quote(place['g_id'], safe='')}" if place["g_id"] else ""
+        return (
+            f"{self.maps_url}/place/{slug}/@{place['latitude']},{place['longitude']},17z"
+            f"/data=!4m7!3m6!1s{place['feature_id']}!8m2{coordinates}{g_id}?entry=ttu"
+        )
+
+    def place_array(self, place):
+        """A place in the layout search_parser.FIELD_PATHS reads; index 200 carries the card href."""
+        array = [None] * 201
+        array[2] = [part.strip() for part in place["address"].split(",")[:2]]
+        if place["rating"]:
+            array[4] = [None] * 7 + [float(place["rating"]), int(place["reviews"])]
+        array[9] = [None, None, place["latitude"], place["longitude"]]
+        array[10] = place["feature_id"]
+        array[11] = place["name"]
+        array[39] = place["address"]
+        array[89] = place["g_id"]
+        array[178] = [[place["phone"]]] if place["phone"] else None
+        array[200] = self.place_url(place)
+        return array
+
+    def search_payload(self, query, offset, viewport):
+        matching = [place for place in self.places if in_viewport(place, viewport)][:self.cap]
+        page = matching[offset:offset + PAGE_SIZE]
+        data = [[query, [[query, None, [offset, len(page)]]] + [[None] * 14 + [self.place_array(place)] for place in page]]]
+        return ")]}'\n" + json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+    def panel(self, place):
+        rating = place["rating"].replace(".", ",") if place["rating"] else ""
+        return PANEL.format(
+            name=html.escape(place["name"]),
+            rating=rating,
+            reviews=place["reviews"],
+            address=html.escape(place["address"]),
+            phone=html.escape(place["phone"]),
+            phone_digits="".join(filter(str.isdigit, place["phone"])),
+        )
+
+    def shell(self, query="", panel="", initial_query=None, initial_payload=None):
+        state = [None, None, None, [None, None, initial_payload]]
+        return SHELL_PAGE.format(
+            query=html.escape(query),
+            panel=panel,
+            state=json.dumps(state, ensure_ascii=False),
+            initial_query=json.dumps(initial_query),
+            page_size=PAGE_SIZE,
+        )
+
+    def handle(self, request):
+        with self.lock:
+            self.requests += 1
+        url = urlparse(request.path)
+        params = parse_qs(url.query)
+        path = unquote(url.path)
+
+        if path == "/search":
+            self.delay()
+            payload = self.search_payload(
+                params.get("q", [""])[0], int(params.get("offset", ["0"])[0]), params.get("vp", [""])[0]
+            )
+            body = json.dumps({"c": 0, "d": payload}, ensure_ascii=False) + '/*""*/'
+            return self.send(request, body, "application/json")
+
+        if path == "/maps/api/panel":
+            self.delay()
+            place = self.by_id.get(params.get("id", [""])[0])
+            return self.send(request, self.panel(place) if place else "", status=200 if place else 404)
+
+        if path.startswith("/maps/place/"):
+            self.delay()
+            match = re.search(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)", path)
+            place = self.by_id.get(match.group(1)) if match else None
+            if place is None:
+                return self.send(request, "", status=404)
+            return self.send(request, self.shell(query=place["name"], panel=self.panel(place)))
+
+        if path.startswith("/maps/search/"):
+            parts = path[len("/maps/search/"):].split("/")
+            query = parts[0].replace("+", " ")
+            viewport = parts[1] if len(parts) > 1 and parts[1].startswith("@") else ""
+            if not viewport:
+                # Seperti Maps asli: URL langsung diberi pusat viewport area yang dicari
+                latitude = sum(place["latitude"] for place in self.places) / len(self.places)
+                longitude = sum(place["longitude"] for place in self.places) / len(self.places)
+                location = f"/maps/search/{quote_plus(query)}/@{latitude:.7f},{longitude:.7f},12z"
+                request.send_response(302)
+                request.send_header("Location", location)
+                request.end_headers()
+                return
+            self.delay()
+            payload = self.search_payload(query, 0, viewport)
+            return self.send(request, self.shell(query=query, initial_query=query, initial_payload=payload))
+
+        if path == BUNDLE_PATH:
+            return self.send(request, self.bundle, "text/javascript", cache_control=BUNDLE_CACHE_CONTROL)
+
+        if path in ("/maps", "/maps/"):
+            return self.send(request, self.shell())
+
+        self.send(request, "", status=404)
+
+    def send(self, request, body, content_type="text/html; charset=utf-8", status=200, cache_control=None):
+        data = body.encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        if cache_control:
+            request.send_header("Cache-Control", cache_control)
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fixture server Google Maps untuk uji offline")
+    parser.add_argument("--data", default=DEFAULT_DATA, help="CSV output scraper yang disajikan ulang")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Latensi per request (detik)")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Variasi latensi acak (detik)")
+    parser.add_argument("--cap", type=int, default=120, help="Jumlah hasil maksimum per pencarian")
+    parser.add_argument("--bundle-kb", type=int, default=512, help="Ukuran bundle JS tiruan yang dimuat setiap halaman")
+    args = parser.parse_args()
+
+    server = FixtureServer(args.data, port=args.port, latency=args.latency, jitter=args.jitter, cap=args.cap,
+                           bundle_kb=args.bundle_kb)
+    print(f"⭐ Fixture server: {server.maps_url} ({len(server.places)} places)")
+    server.start()
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
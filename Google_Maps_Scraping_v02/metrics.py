@@ -0,0 +1,206 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+STAGES = ("search", "scroll", "click", "panel_wait", "extract", "save")
+# Batas atas bucket histogram (detik)
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, math.inf)
+
+
+class Histogram:
+    """Cumulative-bucket histogram of stage durations, Prometheus style."""
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[index] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "mean": round(self.sum / self.count, 4) if self.count else 0.0,
+            "max": round(self.max, 4),
+            "buckets": {_bound_label(bound): value for bound, value in zip(BUCKETS, self.buckets)},
+        }
+
+
+def _bound_label(bound):
+    return "+Inf" if bound == math.inf else repr(bound)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class StageMetrics:
+    """Per-stage timers aggregated per (category, zone) into histograms.
+
+    A disabled instance (NULL_METRICS) turns every timer into a no-op, so
+    functions can take a metrics argument without callers having to care.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.places = 0
+        self.started = time.time()
+
+    @contextmanager
+    def timer(self, stage, category, zone):
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, category, zone, time.perf_counter() - started)
+
+    def observe(self, stage, category, zone, seconds):
+        with self.lock:
+            key = (stage, category, zone)
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(seconds)
+
+    def add_place(self):
+        with self.lock:
+            self.places += 1
+
+    def places_per_minute(self):
+        elapsed = time.time() - self.started
+        return self.places / elapsed * 60 if elapsed > 0 else 0.0
+
+    def stage_totals(self):
+        totals = {stage: 0.0 for stage in STAGES}
+        with self.lock:
+            for (stage, _, _), histogram in self.histograms.items():
+                totals[stage] = totals.get(stage, 0.0) + histogram.sum
+        return totals
+
+    def report(self):
+        with self.lock:
+            stages = [
+                {"stage": stage, "category": category, "zone": zone, **histogram.as_dict()}
+                for (stage, category, zone), histogram in sorted(self.histograms.items())
+            ]
+        totals = self.stage_totals()
+        return {
+            "duration_seconds": round(time.time() - self.started, 2),
+            "places": self.places,
+            "places_per_minute": round(self.places_per_minute(), 2),
+            "stage_totals_seconds": {stage: round(total, 4) for stage, total in totals.items()},
+            "dominant_stage": max(totals, key=totals.get) if any(totals.values()) else None,
+            "stages": stages,
+        }
+
+    def write_json(self, path):
+        _atomic_write(path, json.dumps(self.report(), indent=2, ensure_ascii=False))
+
+    def write_prometheus(self, path):
+        """Writes a node_exporter textfile-collector file."""
+        lines = [
+            "# HELP gmaps_stage_seconds Time spent per scraping stage.",
+            "# TYPE gmaps_stage_seconds histogram",
+        ]
+        with self.lock:
+            for (stage, category, zone), histogram in sorted(self.histograms.items()):
+                labels = f'stage="{_escape(stage)}",category="{_escape(category)}",zone="{_escape(zone)}"'
+                for bound, value in zip(BUCKETS, histogram.buckets):
+                    lines.append(f'gmaps_stage_seconds_bucket{{{labels},le="{_bound_label(bound)}"}} {value}')
+                lines.append(f"gmaps_stage_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+                lines.append(f"gmaps_stage_seconds_count{{{labels}}} {histogram.count}")
+        lines += [
+            "# HELP gmaps_places_total Places stored in this run.",
+            "# TYPE gmaps_places_total counter",
+            f"gmaps_places_total {self.places}",
+            "# HELP gmaps_places_per_minute Average places stored per minute in this run.",
+            "# TYPE gmaps_places_per_minute gauge",
+            f"gmaps_places_per_minute {self.places_per_minute():.4f}",
+        ]
+        _atomic_write(path, "\n".join(lines) + "\n")
+
+    def print_summary(self):
+        totals = self.stage_totals()
+        overall = sum(totals.values())
+        if not overall:
+            return
+        shares = " | ".join(
+            f"{stage} {total / overall:.0%}" for stage, total in sorted(totals.items(), key=lambda item: -item[1]) if total
+        )
+        print(f"📊 Stage time: {shares}")
+
+
+NULL_METRICS = StageMetrics(enabled=False)
+
+
+def _atomic_write(path, text):
+    # Tulis ke file sementara lalu rename, supaya collector tidak membaca file setengah jadi
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        file.write(text)
+    os.replace(temporary, path)
+
+
+class LiveProgress:
+    """Optional periodic progress line with places/minute and an ETA.
+
+    The ETA assumes searches that have not been scrolled yet will yield as
+    many places as the average scrolled search so far.
+    """
+
+    def __init__(self, metrics: StageMetrics, interval=10):
+        self.metrics = metrics
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.searches_total = 0
+        self.searches_scrolled = 0
+        self.places_found = 0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def add_searches(self, count):
+        with self.lock:
+            self.searches_total += count
+
+    def add_found(self, count):
+        with self.lock:
+            self.searches_scrolled += 1
+            self.places_found += count
+
+    def line(self):
+        rate = self.metrics.places_per_minute()
+        with self.lock:
+            remaining_searches = max(0, self.searches_total - self.searches_scrolled)
+            average = self.places_found / self.searches_scrolled if self.searches_scrolled else 0
+            expected = self.places_found + average * remaining_searches
+        remaining = max(0, expected - self.metrics.places)
+        eta = f"{remaining / rate:.1f} min" if rate > 0 and expected else "?"
+        return f"⏱️ {self.metrics.places}/{expected:.0f} places | {rate:.1f}/min | ETA {eta}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            print(self.line())
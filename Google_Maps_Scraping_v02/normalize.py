@@ -0,0 +1,152 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# Field mentah yang disimpan per tempat: hasil PLACE_PANEL_JS ditambah kategori dan zona
+RAW_FIELDS = [
+    "url", "name", "phone", "address", "rating_text", "reviews_text", "rating_label", "reviews_label",
+    "category", "zone",
+]
+
+
+def normalize_frame(raw: pd.DataFrame) -> pd.DataFrame:
+    """Turns a frame of raw panel snapshots into Business columns with vectorized string ops.
+
+    Same rules as format_phone_number and parse_address in App_2.0.py: an
+    address with fewer than three comma parts leaves every address column
+    empty, and an unparsable review count empties both review columns.
+    """
+    raw = raw.reindex(columns=RAW_FIELDS).fillna("").astype(str)
+    out = pd.DataFrame(index=raw.index)
+    out["name"] = raw["name"].str.replace(r"['\"&]", "", regex=True)
+
+    # Nomor telepon: nomor dengan 024 dibiarkan, selain itu hanya angka dan 08 diganti 62
+    phone = raw["phone"].str.replace(r"[^\w\s,.()]", "", regex=True).str.strip()
+    digits = phone.str.replace(r"\D", "", regex=True)
+    digits = digits.where(~digits.str.startswith("08"), "62" + digits.str[1:])
+    out["phone"] = phone.where((phone == "") | phone.str.contains("024", regex=False), digits)
+    out["category"] = raw["category"]
+
+    # Alamat: ..., kecamatan, kota, provinsi kode_pos
+    parts = raw["address"].str.split(",")
+
+    def part(index):
+        # Baris dengan bagian yang kurang menghasilkan NaN; tanpa astype satu batch bisa bertipe float
+        return parts.str[index].fillna("").astype(str).str.strip()
+
+    tail_words = part(-1).str.split()
+    valid = (parts.str.len() >= 3) & (tail_words.str.len() > 0)
+    last_word = tail_words.str[-1].fillna("").astype(str)
+    columns = {
+        "full_address": raw["address"].str.replace(r"[^\w\s,.]", "", regex=True).str.strip(),
+        "district": part(-3),
+        "city": part(-2),
+        "province": tail_words.str[:-1].str.join(" "),
+        "postal_code": last_word.where(last_word.str.isdigit(), ""),
+    }
+    for name, column in columns.items():
+        out[name] = column.where(valid, "").fillna("")
+
+    # Review score dan jumlah review
+    amount = raw["reviews_text"].str.replace(r"[(\")\".]", "", regex=True).str.strip()
+    has_amount = amount.str.fullmatch(r"[+-]?\d+").fillna(False).astype(bool)
+    out["reviews_score"] = raw["rating_text"].str.replace(",", ".", regex=False).where(has_amount, "")
+    out["reviews_amount"] = pd.to_numeric(amount.where(has_amount), errors="coerce").astype("Int64")
+
+    # Koordinat (latitude, longitude) dari titik tempat "!3d…!4d…" di URL;
+    # "@lat,lng" hanya pusat viewport dan dipakai bila titik tempat tidak ada
+    coordinates = raw["url"].str.extract(r"!3d(-?\d+(?:\.\d+)?)!4d(-?\d+(?:\.\d+)?)")
+    viewport = raw["url"].str.extract(r"@(-?\d+\.\d+),(-?\d+\.\d+)")
+    coordinates = coordinates.fillna(viewport)
+    out["latitude"] = pd.to_numeric(coordinates[0], errors="coerce")
+    out["longitude"] = pd.to_numeric(coordinates[1], errors="coerce")
+    out["googlemaps_link"] = raw["url"]
+    out["zone"] = raw["zone"]
+    return out
+
+
+def normalize_batch(snapshots):
+    """Business field dicts for a list of raw snapshots; runs inside a worker process."""
+    if not snapshots:
+        return []
+    frame = normalize_frame(pd.DataFrame(snapshots, index=range(len(snapshots))))
+    records = frame.astype(object).to_dict("records")
+    for record in records:
+        for name in ("reviews_amount", "latitude", "longitude"):
+            if pd.isna(record[name]):
+                record[name] = "" if name == "reviews_amount" else None
+            elif name == "reviews_amount":
+                record[name] = int(record[name])
+            else:
+                record[name] = float(record[name])
+    return records
+
+
+class BatchNormalizer:
+    """Normalizes raw panel snapshots in batches, off the browser threads.
+
+    submit() only queues a snapshot. Full batches go to a process pool
+    (workers > 0) or are parsed in the calling thread (workers = 0), and
+    on_records is called with each batch of normalized field dicts.
+    drain() sends the partial batch and waits until everything submitted
+    has been handed to on_records.
+    """
+
+    def __init__(self, on_records, workers=1, batch_size=50):
+        self.on_records = on_records
+        self.batch_size = batch_size
+        # spawn, bukan fork: proses dibuat belakangan saat thread Selenium, heartbeat dan daemon sedang berjalan
+        self.executor = (
+            ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            if workers > 0 else None
+        )
+        self.pending = []
+        self.outstanding = 0
+        self.errors = 0
+        self.condition = threading.Condition()
+
+    def submit(self, snapshot: dict):
+        with self.condition:
+            self.pending.append(snapshot)
+            if len(self.pending) < self.batch_size:
+                return
+            batch, self.pending = self.pending, []
+            self.outstanding += 1
+        self._dispatch(batch)
+
+    def drain(self):
+        with self.condition:
+            batch, self.pending = self.pending, []
+            if batch:
+                self.outstanding += 1
+        if batch:
+            self._dispatch(batch)
+        with self.condition:
+            self.condition.wait_for(lambda: self.outstanding == 0)
+
+    def close(self):
+        self.drain()
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def _dispatch(self, batch):
+        if self.executor is None:
+            self._deliver(lambda: normalize_batch(batch), len(batch))
+            return
+        future = self.executor.submit(normalize_batch, batch)
+        future.add_done_callback(lambda done: self._deliver(done.result, len(batch)))
+
+    def _deliver(self, result, size):
+        try:
+            self.on_records(result())
+        except Exception as e:
+            # Snapshot mentah tetap ada di file .raw.jsonl dan bisa diproses ulang dengan --reparse
+            with self.condition:
+                self.errors += size
+            print(f"❌ Normalizing {size} places failed: {e}")
+        finally:
+            with self.condition:
+                self.outstanding -= 1
+                self.condition.notify_all()
@@ -0,0 +1,65 @@
+import os
+import threading
+
+
+class PlaceIndex:
+    """Place IDs already scraped, shared by all workers and optionally kept on disk.
+
+    claim() is checked from a card's href before the place is opened, so a
+    shop that shows up under several categories or zones is fetched once.
+    IDs are appended to the on-disk file only once their record has been
+    flushed (persist), so the file never lists a place that is not stored.
+    """
+
+    def __init__(self, path=None):
+        self.lock = threading.Lock()
+        self.seen = set()
+        self.lookups = 0
+        self.hits = 0
+        self.file = None
+        if path:
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as file:
+                    self.seen.update(line.strip() for line in file if line.strip())
+            self.file = open(path, "a", encoding="utf-8")
+
+    def __len__(self):
+        return len(self.seen)
+
+    def add(self, place_ids):
+        """Seeds the index without counting lookups (e.g. from a resumed run)."""
+        with self.lock:
+            self.seen.update(place_ids)
+
+    def claim(self, place_id):
+        """True the first time place_id is seen; False is a dedup hit."""
+        with self.lock:
+            self.lookups += 1
+            if place_id in self.seen:
+                self.hits += 1
+                return False
+            self.seen.add(place_id)
+            return True
+
+    def release(self, place_id):
+        """Forgets a claimed place whose extraction failed, so it can be retried."""
+        with self.lock:
+            self.seen.discard(place_id)
+
+    def persist(self, place_ids):
+        if self.file is None:
+            return
+        with self.lock:
+            self.file.writelines(f"{place_id}\n" for place_id in place_ids)
+            self.file.flush()
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def report(self):
+        print(f"🔁 Dedup: {self.hits}/{self.lookups} cards skipped ({self.hit_rate:.1%})")
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
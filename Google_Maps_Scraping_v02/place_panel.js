@@ -0,0 +1,22 @@
+() => {
+    const first = selector => document.querySelector(selector);
+    const text = element => element ? element.innerText.trim() : "";
+    const label = element => element ? (element.getAttribute("aria-label") || "").trim() : "";
+    const fieldText = selector => {
+        const button = first(selector);
+        return button ? text(button.querySelector(".fontBodyMedium") || button) : "";
+    };
+    const reviewCount = document.evaluate(
+        "//div[2]/span[2]/span/span", document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+    return {
+        url: location.href,
+        name: text(first("h1.DUwDvf")),
+        phone: fieldText('[data-item-id^="phone:tel:"]'),
+        address: fieldText('[data-item-id^="address"]'),
+        rating_text: text(first('div.F7nice span[aria-hidden="true"]')),
+        reviews_text: text(first('div.F7nice span:nth-child(2) span[aria-label]')),
+        rating_label: label(first('div[jsaction="pane.reviewChart.moreReviews"] div[role="img"]')),
+        reviews_label: label(reviewCount),
+    };
+}
@@ -0,0 +1,86 @@
+import sqlite3
+import threading
+import time
+
+
+class ProgressStore:
+    """SQLite record of finished (category, zone) searches and extracted places.
+
+    Places are only marked after the sink has fsynced them (see
+    StreamingSink.on_flush), so everything the store calls done is on disk.
+    A tile that was split instead of scraped is done too, but keeps the
+    keys of its child tiles, so a resumed run can queue them again.
+    """
+
+    def __init__(self, path, reset=False):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            if reset:
+                self.conn.execute("DROP TABLE IF EXISTS searches")
+                self.conn.execute("DROP TABLE IF EXISTS places")
+                self.conn.execute("DROP TABLE IF EXISTS splits")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS searches ("
+                "category TEXT, zone TEXT, finished_at REAL, PRIMARY KEY (category, zone))"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS places ("
+                "category TEXT, zone TEXT, place_id TEXT, PRIMARY KEY (category, zone, place_id))"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS splits ("
+                "category TEXT, zone TEXT, child TEXT, PRIMARY KEY (category, zone, child))"
+            )
+
+    def is_search_done(self, category, zone):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM searches WHERE category = ? AND zone = ?", (category, zone)
+            ).fetchone()
+        return row is not None
+
+    def done_places(self, category, zone):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT place_id FROM places WHERE category = ? AND zone = ?", (category, zone)
+            ).fetchall()
+        return {place_id for (place_id,) in rows}
+
+    def all_places(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT DISTINCT place_id FROM places").fetchall()
+        return {place_id for (place_id,) in rows}
+
+    def mark_places(self, places):
+        """Marks (category, zone, place_id) tuples as extracted in one transaction."""
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO places VALUES (?, ?, ?)", places)
+
+    def mark_search_done(self, category, zone):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO searches VALUES (?, ?, ?)", (category, zone, time.time())
+            )
+
+    def mark_search_split(self, category, zone, children):
+        """Marks a capped tile done together with the keys of the child tiles that replace it."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO splits VALUES (?, ?, ?)", [(category, zone, child) for child in children]
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO searches VALUES (?, ?, ?)", (category, zone, time.time())
+            )
+
+    def split_children(self, category, zone):
+        """Child tile keys of a split search, [] for a search that was scraped."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT child FROM splits WHERE category = ? AND zone = ? ORDER BY child", (category, zone)
+            ).fetchall()
+        return [child for (child,) in rows]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
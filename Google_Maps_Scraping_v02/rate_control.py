@@ -0,0 +1,174 @@
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Halaman yang dikirim Google sebagai pengganti Maps saat trafik dianggap mencurigakan
+BLOCK_PAGE_MARKERS = (
+    ("/sorry/", "captcha"),
+    ("consent.google.com", "consent"),
+)
+
+
+def blocked_page_reason(url):
+    """'captcha' or 'consent' when url is one of Google's interstitials, else None."""
+    for marker, reason in BLOCK_PAGE_MARKERS:
+        if marker in (url or ""):
+            return reason
+    return None
+
+
+def backoff_seconds(attempt, base, cap):
+    """Exponential backoff with full jitter: uniform between 0 and base * 2^attempt, capped."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def cooldown_seconds(attempt, base, cap):
+    """Exponential backoff with equal jitter: half of base * 2^attempt (capped) plus a random part up to the other half."""
+    delay = min(cap, base * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class TokenBucket:
+    """Global request rate: rate tokens per second, up to burst saved up. rate 0 = unlimited."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.waited = 0.0
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+                self.waited += wait
+            time.sleep(wait)
+
+
+class RateController:
+    """Token bucket plus an AIMD concurrency limit shared by every worker of a run.
+
+    Each page request (a search or opening a place) runs inside slot(), but
+    only place panel opens report their latency to success(). The limit
+    grows by one after `limit` panel opens in a row stay fast, and is
+    halved when a request times out or a panel open is slower than
+    latency_factor times the baseline (median of the first window panel
+    opens; 0 turns that off). A CAPTCHA or
+    consent page drops the limit to min_concurrency and pauses every
+    worker for a jittered, exponentially growing cooldown.
+    """
+
+    def __init__(self, rate=0.0, max_concurrency=1, min_concurrency=1, latency_factor=2.0, window=20,
+                 retry_base=2.0, retry_cap=60.0, block_base=30.0, block_cap=600.0):
+        self.bucket = TokenBucket(rate)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = max_concurrency
+        self.latency_factor = latency_factor
+        self.window = window
+        self.retry_base = retry_base
+        self.retry_cap = retry_cap
+        self.block_base = block_base
+        self.block_cap = block_cap
+        self.active = 0
+        self.successes = 0
+        self.latencies = deque(maxlen=window)
+        self.baseline = None
+        self.paused_until = 0.0
+        self.decreased_at = 0.0
+        self.timeouts = 0
+        self.blocks = 0
+        self.condition = threading.Condition()
+
+    def set_max_concurrency(self, value):
+        with self.condition:
+            self.max_concurrency = max(self.min_concurrency, value)
+            self.limit = self.max_concurrency
+            self.condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        with self.condition:
+            while True:
+                pause = self.paused_until - time.time()
+                if pause > 0:
+                    self.condition.wait(pause)
+                elif self.active >= self.limit:
+                    self.condition.wait()
+                else:
+                    break
+            self.active += 1
+        try:
+            self.bucket.acquire()
+            yield
+        finally:
+            with self.condition:
+                self.active -= 1
+                self.condition.notify_all()
+
+    def success(self, seconds):
+        with self.condition:
+            self.latencies.append(seconds)
+            if self.baseline is None and len(self.latencies) == self.window:
+                self.baseline = statistics.median(self.latencies)
+            if self.latency_factor and self.baseline and seconds > self.baseline * self.latency_factor:
+                self._decrease()
+                return
+            self.successes += 1
+            if self.successes >= self.limit and self.limit < self.max_concurrency:
+                self.limit += 1
+                self.successes = 0
+                self.condition.notify_all()
+
+    def timeout(self):
+        with self.condition:
+            self.timeouts += 1
+            self._decrease()
+
+    def blocked(self):
+        """Pauses every worker after a CAPTCHA/consent page; returns the cooldown in seconds."""
+        with self.condition:
+            # Jeda blokir tidak boleh mendekati 0 detik, jadi setengahnya tetap
+            cooldown = cooldown_seconds(self.blocks, self.block_base, self.block_cap)
+            self.blocks += 1
+            self.limit = self.min_concurrency
+            self.successes = 0
+            self.paused_until = max(self.paused_until, time.time() + cooldown)
+            return cooldown
+
+    def retry_delay(self, attempt):
+        return backoff_seconds(attempt, self.retry_base, self.retry_cap)
+
+    def wait_until_resumed(self):
+        with self.condition:
+            while time.time() < self.paused_until:
+                self.condition.wait(self.paused_until - time.time())
+
+    def _decrease(self):
+        # Permintaan yang sedang berjalan bersamaan tidak boleh memotong limit berkali-kali sekaligus
+        now = time.time()
+        if now - self.decreased_at < 1.0:
+            return
+        self.decreased_at = now
+        self.limit = max(self.min_concurrency, self.limit // 2)
+        self.successes = 0
+
+    def report(self):
+        print(
+            f"🚦 Rate control: concurrency {self.limit}/{self.max_concurrency}, "
+            f"{self.timeouts} timeouts, {self.blocks} CAPTCHA/consent pages, "
+            f"{self.bucket.waited:.0f} s throttled"
+        )
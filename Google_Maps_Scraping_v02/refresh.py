@@ -0,0 +1,74 @@
+import re
+import threading
+
+from sink import format_of, iter_records
+
+
+def parse_rating(value):
+    """4.5 from a card text like "4,5" or a stored reviews_score; None when there is none."""
+    if value is None or value == "":
+        return None
+    try:
+        return round(float(str(value).replace(",", ".")), 1)
+    except ValueError:
+        return None
+
+
+def parse_review_count(value):
+    """1234 from a card text like "(1.234)" or a stored reviews_amount; None when there is none."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    digits = re.sub(r"\D", "", str(value))
+    return int(digits) if digits else None
+
+
+class RefreshIndex:
+    """Records of a previous run by place ID, to tell which result cards changed since.
+
+    A card whose rating and review count still match the stored record is
+    carried forward as is; anything else (new or changed) is opened again.
+    """
+
+    def __init__(self, records, key):
+        self.records = {}
+        for record in records:
+            place_id = key(record.get("googlemaps_link"))
+            if place_id:
+                self.records[place_id] = record
+        self.lock = threading.Lock()
+        self.carried = 0
+        self.changed = 0
+        self.new = 0
+
+    @classmethod
+    def load(cls, path, key):
+        """Reads a previous CSV, JSONL or Parquet output; key maps a place URL to its ID."""
+        return cls(iter_records(path, format_of(path)), key)
+
+    def __len__(self):
+        return len(self.records)
+
+    def unchanged(self, place_id, rating, reviews):
+        """The stored record when the card still shows the same rating and review count, else None."""
+        previous = self.records.get(place_id)
+        same = previous is not None and (
+            parse_rating(previous.get("reviews_score")) == parse_rating(rating)
+            and parse_review_count(previous.get("reviews_amount")) == parse_review_count(reviews)
+        )
+        with self.lock:
+            if previous is None:
+                self.new += 1
+            elif same:
+                self.carried += 1
+            else:
+                self.changed += 1
+        return previous if same else None
+
+    def report(self):
+        seen = self.carried + self.changed + self.new
+        print(
+            f"🔄 Refresh: {self.carried}/{seen} cards unchanged and carried forward, "
+            f"{self.changed} changed, {self.new} new"
+        )
@@ -0,0 +1,118 @@
+import json
+import sys
+import time
+from urllib.parse import quote_plus
+
+# Penanda XHR hasil pencarian yang ditangkap dari log jaringan
+SEARCH_RESPONSE_MARKER = "/search?tbm=map"
+XSSI_PREFIX = ")]}'"
+
+# Posisi setiap field di dalam array tempat (entry[14]) pada payload pencarian.
+# Google kadang menggeser susunan ini; cukup perbarui tabel ini bila itu terjadi.
+FIELD_PATHS = {
+    "name": (11,),
+    "full_address": (39,),
+    "address_lines": (2,),
+    "reviews_score": (4, 7),
+    "reviews_amount": (4, 8),
+    "latitude": (9, 2),
+    "longitude": (9, 3),
+    "phone": (178, 0, 0),
+    "feature_id": (10,),
+    "g_id": (89,),
+}
+
+
+def _dig(data, path):
+    for index in path:
+        if not isinstance(data, list) or index >= len(data):
+            return None
+        data = data[index]
+    return data
+
+
+def decode_payload(text):
+    """Turns a raw /search?tbm=map body (or an APP_INITIALIZATION_STATE string) into JSON."""
+    text = text.strip()
+    if text.endswith('/*""*/'):
+        text = text[:-len('/*""*/')]
+    if text.startswith("{"):
+        text = json.loads(text)["d"]
+    if text.startswith(XSSI_PREFIX):
+        text = text[len(XSSI_PREFIX):]
+    return json.loads(text)
+
+
+def place_link(name, feature_id, latitude, longitude):
+    """Place URL carrying the feature ID and coordinates, like the ones the DOM flow stores."""
+    link = f"https://www.google.com/maps/place/{quote_plus(name or '')}/data=!4m5!3m4!1s{feature_id}"
+    if latitude is not None and longitude is not None:
+        link += f"!8m2!3d{latitude}!4d{longitude}"
+    return link
+
+
+def parse_place(place):
+    """Raw field dict of one place array, or None if it is not a place."""
+    name = _dig(place, FIELD_PATHS["name"])
+    feature_id = _dig(place, FIELD_PATHS["feature_id"])
+    if not name or not feature_id:
+        return None
+
+    full_address = _dig(place, FIELD_PATHS["full_address"])
+    if not full_address:
+        lines = _dig(place, FIELD_PATHS["address_lines"]) or []
+        full_address = ", ".join(line for line in lines if isinstance(line, str))
+
+    phone = _dig(place, FIELD_PATHS["phone"])
+    latitude = _dig(place, FIELD_PATHS["latitude"])
+    longitude = _dig(place, FIELD_PATHS["longitude"])
+    return {
+        "name": name,
+        "phone": phone if isinstance(phone, str) else "",
+        "full_address": full_address or "",
+        "reviews_score": _dig(place, FIELD_PATHS["reviews_score"]),
+        "reviews_amount": _dig(place, FIELD_PATHS["reviews_amount"]),
+        "latitude": latitude,
+        "longitude": longitude,
+        "googlemaps_link": place_link(name, feature_id, latitude, longitude),
+        "g_id": _dig(place, FIELD_PATHS["g_id"]),
+    }
+
+
+def parse_search_data(data):
+    """Places of a decoded search payload: data[0][1] holds the results, entry[14] each place."""
+    places = []
+    for entry in _dig(data, (0, 1)) or []:
+        place = parse_place(_dig(entry, (14,)))
+        if place is not None:
+            places.append(place)
+    return places
+
+
+def parse_search_response(text):
+    try:
+        return parse_search_data(decode_payload(text))
+    except (ValueError, KeyError, TypeError):
+        return []
+
+
+def parse_app_initialization_state(state):
+    """Places embedded in window.APP_INITIALIZATION_STATE of a directly loaded search URL."""
+    places = []
+    for value in _dig(state, (3,)) or []:
+        if isinstance(value, str) and value.startswith(XSSI_PREFIX):
+            places.extend(parse_search_response(value))
+    return places
+
+
+if __name__ == "__main__":
+    # Benchmark offline: python search_parser.py fixtures/search/*.txt
+    total = 0
+    started = time.perf_counter()
+    for path in sys.argv[1:]:
+        with open(path, encoding="utf-8") as file:
+            places = parse_search_response(file.read())
+        total += len(places)
+        print(f"{path}: {len(places)} places")
+    elapsed = time.perf_counter() - started
+    print(f"{total} places in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,274 @@
+import csv
+import json
+import os
+import shutil
+import threading
+import uuid
+
+
+class StreamingSink:
+    """Appends records to a CSV or JSONL file as they arrive, flushing in batches.
+
+    Only the current batch is kept in memory, so a crash loses at most
+    batch_size records and memory stays flat however long the run is.
+    on_flush, if set, is called with the sources of every batch right after
+    it has been fsynced.
+
+    Writing a batch and recording it through on_flush are two steps, so a
+    crash in between leaves rows on disk that were never marked done. When
+    a file is reopened with append=True, a torn last line is cut off and,
+    given key, the keys of the rows already in the file are kept in
+    existing_keys; a record with one of those keys is not written again,
+    but its source is still passed to on_flush.
+    """
+
+    def __init__(self, path, fieldnames, fmt="csv", batch_size=50, append=False, on_flush=None, key=None):
+        if fmt not in ("csv", "jsonl"):
+            raise ValueError(f"Unsupported sink format: {fmt}")
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.buffer = []
+        self.sources = []
+        self.on_flush = on_flush
+        self.lock = threading.Lock()
+        self.key = key
+        self.existing_keys = set()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        if append and os.path.exists(path):
+            # csv.writer mengakhiri baris dengan \r\n; di JSONL baris baru di dalam nilai selalu di-escape
+            _truncate_torn_line(path, b"\r\n" if fmt == "csv" else b"\n")
+            self.existing_keys = self._read_keys()
+        has_rows = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self.file = open(path, "a" if append else "w", newline="", encoding="utf-8")
+        if fmt == "csv":
+            self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames, extrasaction="ignore")
+            if not has_rows:
+                self.writer.writeheader()
+
+    def _read_keys(self):
+        if self.key is None:
+            return set()
+        return {self.key(record) for record in iter_records(self.path, self.fmt)}
+
+    def write(self, record: dict, source=None):
+        with self.lock:
+            key = self.key(record) if self.key is not None else None
+            if not key or key not in self.existing_keys:
+                self.buffer.append(record)
+            self.sources.append(source)
+            if len(self.sources) >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            self.file.close()
+
+    def _flush(self):
+        if not self.sources:
+            return
+        if self.fmt == "csv":
+            self.writer.writerows(self.buffer)
+        else:
+            for record in self.buffer:
+                self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.buffer.clear()
+        if self.on_flush is not None:
+            self.on_flush(self.sources)
+        self.sources = []
+
+
+# Tipe kolom Parquet; kolom lain disimpan sebagai string
+PARQUET_TYPES = {
+    "reviews_score": "float64",
+    "reviews_amount": "int64",
+    "latitude": "float64",
+    "longitude": "float64",
+}
+
+
+def _typed(value, type_name):
+    if value is None or value == "":
+        return None
+    if type_name == "int64":
+        return int(value)
+    if type_name == "float64":
+        return float(str(value).replace(",", "."))
+    return str(value)
+
+
+class ParquetSink(StreamingSink):
+    """Streams records into a Parquet dataset partitioned by category and zone.
+
+    path is the dataset directory (category=<x>/zone=<y>/part-*.parquet).
+    Every batch is first appended to a JSONL staging file in that directory
+    and fsynced before on_flush runs. Once compact_rows records are staged
+    they are rewritten as one Parquet file per partition, so a long run
+    yields a few large files instead of one per batch. Staging files start
+    with "_" and are ignored by pyarrow/pandas readers; one left behind by a
+    crash is compacted when the sink is opened again.
+
+    The schema is fixed: the numeric fields in PARQUET_TYPES are typed and
+    everything else is a string, with "" stored as null. Needs pyarrow.
+    """
+
+    def __init__(self, path, fieldnames, batch_size=50, append=False, on_flush=None,
+                 partition_cols=("category", "zone"), compact_rows=10_000, key=None):
+        import pyarrow as pa
+
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.fmt = "parquet"
+        self.batch_size = batch_size
+        self.compact_rows = compact_rows
+        self.buffer = []
+        self.sources = []
+        self.on_flush = on_flush
+        self.lock = threading.Lock()
+        self.key = key
+        self.existing_keys = set()
+        self.partition_cols = list(partition_cols)
+        self.types = {name: PARQUET_TYPES.get(name, "string") for name in self.fieldnames + self.partition_cols}
+        self.schema = pa.schema([pa.field(name, getattr(pa, type_name)()) for name, type_name in self.types.items()])
+
+        if not append and os.path.exists(path):
+            shutil.rmtree(path)
+        os.makedirs(path, exist_ok=True)
+        for name in sorted(os.listdir(path)):
+            if name.startswith("_staging-") and name.endswith(".jsonl"):
+                self._compact(os.path.join(path, name))
+        if append:
+            self.existing_keys = self._read_keys()
+        self._open_staging()
+
+    def _open_staging(self):
+        # Nama file Parquet diturunkan dari ID staging, jadi compaction yang diulang menimpa file yang sama
+        self.staging_id = uuid.uuid4().hex[:8]
+        self.staging_path = os.path.join(self.path, f"_staging-{self.staging_id}.jsonl")
+        self.staging = open(self.staging_path, "w", encoding="utf-8")
+        self.staged = 0
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            self.staging.close()
+            self._compact(self.staging_path)
+
+    def _flush(self):
+        if not self.sources:
+            return
+        for record in self.buffer:
+            self.staging.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self.staging.flush()
+        os.fsync(self.staging.fileno())
+        self.staged += len(self.buffer)
+        self.buffer.clear()
+        if self.on_flush is not None:
+            self.on_flush(self.sources)
+        self.sources = []
+        if self.staged >= self.compact_rows:
+            self.staging.close()
+            self._compact(self.staging_path)
+            self._open_staging()
+
+    def _compact(self, staging_path):
+        """Writes the records of a staging file as Parquet files, then deletes it."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        records = []
+        with open(staging_path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Baris terakhir yang terpotong saat crash belum pernah di-fsync atau dicatat selesai
+                    break
+        if records:
+            columns = {
+                name: [_typed(record.get(name), type_name) for record in records]
+                for name, type_name in self.types.items()
+            }
+            table = pa.Table.from_pydict(columns, schema=self.schema)
+            written = []
+            staging_id = os.path.basename(staging_path)[len("_staging-"):-len(".jsonl")]
+            pq.write_to_dataset(
+                table, self.path, partition_cols=self.partition_cols,
+                basename_template=f"part-{staging_id}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+                file_visitor=lambda written_file: written.append(written_file.path),
+            )
+            for written_path in written:
+                with open(written_path, "rb") as file:
+                    os.fsync(file.fileno())
+        os.remove(staging_path)
+
+
+def _truncate_torn_line(path, terminator):
+    """Cuts a last line that a crash left without its terminator."""
+    with open(path, "rb+") as file:
+        data = file.read()
+        if not data or data.endswith(terminator):
+            return
+        end = data.rfind(terminator)
+        file.truncate(end + len(terminator) if end >= 0 else 0)
+
+
+def format_of(path):
+    """Sink format of an output path, from its extension."""
+    extension = os.path.splitext(path.rstrip("/\\"))[1].lower()
+    return {".parquet": "parquet", ".jsonl": "jsonl"}.get(extension, "csv")
+
+
+def iter_records(path, fmt="csv"):
+    """Yields the records of a streamed file one at a time."""
+    if fmt == "parquet":
+        import pyarrow.dataset as ds
+
+        for batch in ds.dataset(path, format="parquet", partitioning="hive").to_batches():
+            yield from batch.to_pylist()
+        return
+    with open(path, newline="", encoding="utf-8") as file:
+        if fmt == "csv":
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _cell(value, numeric):
+    if value is None or value == "":
+        return None
+    if numeric and isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                return value
+    return value
+
+
+def write_xlsx(source_path, xlsx_path, fieldnames, fmt="csv", numeric_fields=()):
+    """Converts a streamed CSV/JSONL file to XLSX with openpyxl's constant-memory writer."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(list(fieldnames))
+    for record in iter_records(source_path, fmt):
+        sheet.append([_cell(record.get(name), name in numeric_fields) for name in fieldnames])
+    workbook.save(xlsx_path)
@@ -0,0 +1,22 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modul di folder ini saling import dengan nama biasa (from sink import ...)
+sys.path.insert(0, PACKAGE_DIR)
+
+
+@pytest.fixture(scope="session")
+def app():
+    """App_2.0.py loaded as a module (its file name is not importable); needs selenium, not Chrome."""
+    pytest.importorskip("selenium")
+    pytest.importorskip("pandas")
+    spec = importlib.util.spec_from_file_location("app_2_0", os.path.join(PACKAGE_DIR, "App_2.0.py"))
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses resolve string annotations through sys.modules
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,40 @@
+import argparse
+import functools
+
+import pytest
+
+import benchmark
+
+
+@functools.lru_cache(maxsize=None)
+def browser_missing(version):
+    """Why the browser an engine drives cannot start here, or None when it can."""
+    try:
+        if version == "v1":
+            from playwright.sync_api import sync_playwright
+
+            with sync_playwright() as p:
+                p.chromium.launch(headless=True).close()
+        else:
+            from selenium import webdriver
+
+            options = webdriver.ChromeOptions()
+            options.add_argument("--headless=new")
+            webdriver.Chrome(options=options).quit()
+    except Exception as e:
+        return f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+    return None
+
+
+@pytest.mark.parametrize("engine", benchmark.ENGINES)
+def test_engine_output_matches_the_fixture_server(engine):
+    reason = browser_missing(engine.split("-")[0])
+    if reason:
+        pytest.skip(f"no browser for {engine}: {reason}")
+    args = argparse.Namespace(
+        data=benchmark.DEFAULT_DATA, latency=0.0, jitter=0.0, max_results=10, pages=2,
+        workers=1, detail_workers=2, cache_proxy=False,
+    )
+    result = benchmark.run_engine(engine, args)
+    assert result["output_problems"] == []
+    assert result["places"] > 0
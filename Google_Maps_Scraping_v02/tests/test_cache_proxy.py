@@ -0,0 +1,66 @@
+import os
+import urllib.request
+
+from cache_proxy import CachingProxy, DiskLRU, is_static_asset, max_age
+from fixture_server import BUNDLE_PATH, FixtureServer
+
+META = {"status": 200, "headers": [], "expires": 0}
+
+
+def entry_size(body):
+    return len(b'{"status": 200, "headers": [], "expires": 0}\n') + len(body)
+
+
+def test_least_recently_used_entry_is_evicted_first(tmp_path):
+    cache = DiskLRU(str(tmp_path), max_bytes=2 * entry_size(b"x" * 100))
+    cache.put("a", META, b"a" * 100)
+    cache.put("b", META, b"b" * 100)
+    assert cache.get("a") == (META, b"a" * 100)
+    cache.put("c", META, b"c" * 100)
+    assert cache.get("b") is None
+    assert not os.path.exists(cache.path("b"))
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.size == 2 * entry_size(b"x" * 100)
+
+
+def test_entry_larger_than_the_cache_is_not_stored(tmp_path):
+    cache = DiskLRU(str(tmp_path), max_bytes=100)
+    cache.put("a", META, b"a" * 200)
+    assert cache.get("a") is None
+    assert cache.size == 0
+
+
+def test_recency_order_survives_a_restart(tmp_path):
+    cache = DiskLRU(str(tmp_path), max_bytes=3 * entry_size(b"x" * 100))
+    for key in "abc":
+        cache.put(key, META, key.encode() * 100)
+    # Sentuhan dari get() disimpan sebagai mtime, jadi "a" menjadi yang terbaru
+    for age, key in enumerate("cba"):
+        os.utime(cache.path(key), (1_000_000 + age, 1_000_000 + age))
+    reopened = DiskLRU(str(tmp_path), max_bytes=2 * entry_size(b"x" * 100))
+    assert list(reopened.entries) == ["b", "a"]
+    assert not os.path.exists(cache.path("c"))
+
+
+def test_only_long_lived_static_responses_are_cached():
+    bundle = {"Content-Type": "text/javascript", "Cache-Control": "public, max-age=31536000"}
+    assert max_age(bundle) == 31536000
+    assert is_static_asset(200, bundle)
+    assert not is_static_asset(200, dict(bundle, **{"Set-Cookie": "NID=1"}))
+    assert not is_static_asset(200, dict(bundle, **{"Cache-Control": "max-age=600"}))
+    assert not is_static_asset(200, dict(bundle, **{"Vary": "Cookie"}))
+    assert not is_static_asset(200, {"Content-Type": "text/html", "Cache-Control": "max-age=31536000"})
+    assert not is_static_asset(404, bundle)
+
+
+def test_proxy_serves_a_repeated_asset_from_disk(tmp_path):
+    server = FixtureServer(bundle_kb=16).start()
+    proxy = CachingProxy(str(tmp_path), 1_000_000, intercept_hosts=()).start()
+    try:
+        opener = urllib.request.build_opener(urllib.request.ProxyHandler({"http": proxy.url}))
+        bodies = [opener.open(f"{server.base_url}{BUNDLE_PATH}", timeout=10).read() for _ in range(3)]
+    finally:
+        proxy.stop()
+        server.stop()
+    assert bodies[0] == bodies[1] == bodies[2] == server.bundle.encode("utf-8")
+    assert (proxy.stored, proxy.hits) == (1, 2)
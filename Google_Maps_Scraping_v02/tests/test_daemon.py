@@ -0,0 +1,58 @@
+import queue
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+
+def daemon(app, monkeypatch, size=3):
+    monkeypatch.setattr(sys, "argv", ["App_2.0.py"])
+    return app.ScrapeDaemon(app.parse_args(), SimpleNamespace(size=size, available=size))
+
+
+JOB = {"categories": ["Toko Bahan Bangunan"], "target_locations": ["Semarang"]}
+
+
+@pytest.mark.parametrize("payload", [
+    [1, 2],
+    {**JOB, "categories": "abc"},
+    {**JOB, "categories": [1]},
+    {**JOB, "options": {"workers": "2"}},
+    {**JOB, "options": {"fast": 1}},
+    {**JOB, "options": {"unknown": True}},
+    {**JOB, "options": []},
+    {**JOB, "file_name": "../escape"},
+    {**JOB, "file_name": "sub/dir"},
+    {**JOB, "file_name": ".."},
+])
+def test_invalid_jobs_are_rejected(app, monkeypatch, payload):
+    with pytest.raises(ValueError):
+        daemon(app, monkeypatch).submit(payload)
+
+
+def test_valid_job_is_queued(app, monkeypatch):
+    job = daemon(app, monkeypatch).submit({**JOB, "file_name": "semarang", "options": {"workers": 2, "max_rate": 1.5}})
+    assert job["status"] == "queued"
+    assert job["file_name"] == "semarang"
+
+
+class DeadDriver:
+    pool_slot = 1
+
+    def quit(self):
+        pass
+
+
+def test_pool_drops_a_slot_that_cannot_restart(app, monkeypatch):
+    monkeypatch.setattr(app.time, "sleep", lambda seconds: None)
+    pool = app.DriverPool.__new__(app.DriverPool)
+    pool.size = 1
+    pool.idle = queue.Queue()
+    pool.lock = app.threading.Lock()
+    monkeypatch.setattr(pool, "_open", lambda slot: (_ for _ in ()).throw(OSError("chrome crashed")))
+
+    pool._replace(DeadDriver())
+
+    assert pool.size == 0
+    with pytest.raises(RuntimeError):
+        pool.acquire()
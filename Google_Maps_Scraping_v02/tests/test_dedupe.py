@@ -0,0 +1,50 @@
+from dedupe import coordinates, merge_near_duplicates, normalize_name
+
+LINK = "https://www.google.com/maps/place/{slug}/@{viewport},13z/data=!4m7!3m6!1s{place_id}!8m2!3d-6.9721843!4d110.4310073"
+
+
+def listing(name, phone, viewport, place_id):
+    latitude, longitude = map(float, viewport.split(","))
+    return {
+        "name": name, "phone": phone, "latitude": latitude, "longitude": longitude,
+        "googlemaps_link": LINK.format(slug=name.replace(" ", "+"), viewport=viewport, place_id=place_id),
+    }
+
+
+SAME_PLACE = [
+    listing("TB Subur Makmur", "(024) 3511888", "-6.9721843,110.3589095", "0x2e70f35463d94545:0xa3829f66e38435ea"),
+    listing("Toko Bangunan Subur Makmur", "", "-7.0051,110.4383", "0x2e70f35463d94545:0x1111111111111111"),
+]
+
+
+def test_normalize_name_drops_shop_prefixes_and_suffix_notes():
+    assert normalize_name("TB. Subur Makmur") == "subur makmur"
+    assert normalize_name("Toko Bangunan Subur Makmur") == "subur makmur"
+    assert normalize_name("CV Subur Makmur | Semarang") == "subur makmur"
+
+
+def test_coordinates_prefer_the_place_point_over_the_columns():
+    assert coordinates(SAME_PLACE[1]) == (-6.9721843, 110.4310073)
+    assert coordinates({"latitude": "-6.97", "longitude": "110.43"}) == (-6.97, 110.43)
+    assert coordinates({"latitude": float("nan"), "longitude": 110.43}) is None
+
+
+def test_listings_with_the_same_place_point_are_merged():
+    merged, clusters = merge_near_duplicates(SAME_PLACE)
+    assert len(merged) == 1
+    assert merged[0]["phone"] == "(024) 3511888"
+    assert len(clusters) == 1
+
+
+def test_numbered_branch_with_another_phone_is_kept():
+    branch = dict(SAME_PLACE[0], name="TB Subur Makmur 2", phone="(024) 7000000")
+    merged, _ = merge_near_duplicates(SAME_PLACE + [branch])
+    assert len(merged) == 2
+
+
+def test_listing_with_most_reviews_wins_and_blanks_are_filled():
+    few = dict(SAME_PLACE[0], reviews_amount="3", full_address="")
+    many = dict(SAME_PLACE[1], reviews_amount="1.204", full_address="Jl. Pemuda No. 1")
+    merged, _ = merge_near_duplicates([few, many])
+    assert merged[0]["name"] == "Toko Bangunan Subur Makmur"
+    assert merged[0]["phone"] == "(024) 3511888"
@@ -0,0 +1,74 @@
+import itertools
+import re
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from normalize import normalize_batch, normalize_frame
+
+
+def snapshot(url, **fields):
+    return dict({"name": "TB Maju", "phone": "", "address": "", "rating_text": "", "reviews_text": "", "url": url}, **fields)
+
+
+def test_coordinates_come_from_the_place_point_not_the_viewport():
+    url = ("https://www.google.com/maps/place/TB+Maju/@-7.0051,110.4383,13z/"
+           "data=!4m7!3m6!1s0x2e70f35463d94545:0xa3829f66e38435ea!8m2!3d-6.9721843!4d110.4310073")
+    out = normalize_frame(pd.DataFrame([snapshot(url)]))
+    assert out.loc[0, "latitude"] == pytest.approx(-6.9721843)
+    assert out.loc[0, "longitude"] == pytest.approx(110.4310073)
+
+
+def test_viewport_is_used_when_the_link_has_no_place_point():
+    out = normalize_frame(pd.DataFrame([snapshot("https://www.google.com/maps/place/TB+Maju/@-7.0051,110.4383,17z")]))
+    assert out.loc[0, "latitude"] == pytest.approx(-7.0051)
+    assert out.loc[0, "longitude"] == pytest.approx(110.4383)
+
+
+PHONES = ["(024) 3511888", "0812-3456-7890", "+62 812-3456-7890", "0274 367585", "024-7000", "", "Hubungi kami"]
+ADDRESSES = [
+    "Jl. Pemuda No. 1, Sekayu, Kec. Semarang Tengah, Kota Semarang, Jawa Tengah 50132",
+    "Jl. Majapahit No.12, Kec. Pedurungan, Kota Semarang, Jawa Tengah",
+    "Ruko Sentra #3, Genuk, Semarang, Jawa Tengah 50117",
+    "Jl. Raya Kaliwungu, Kendal",
+    "a, b, ",
+    "",
+]
+REVIEWS = [("4,5", "(1.234)"), ("5,0", "(12)"), ("4,0", "(baru)"), ("", ""), ("3,9", "(+7)")]
+
+
+def baseline_fields(app, raw):
+    """The fields get_place_data used to compute from the live panel, before normalize.py existed."""
+    phone = app.format_phone_number(re.sub(r"[^\w\s,.()]", "", raw["phone"]).strip())
+    try:
+        full_address, district, city, province, postal_code = app.parse_address(raw["address"])
+    except IndexError:
+        full_address = district = city = province = postal_code = ""
+    try:
+        reviews_score = re.sub(r"[,]", ".", raw["rating_text"])
+        reviews_amount = int(re.sub(r"[(\")\".]", "", raw["reviews_text"]))
+    except ValueError:
+        reviews_score = reviews_amount = ""
+    return {
+        "name": re.sub(r"['\"&]", "", raw["name"]), "phone": phone, "full_address": full_address,
+        "district": district, "city": city, "province": province, "postal_code": postal_code,
+        "reviews_score": reviews_score, "reviews_amount": reviews_amount,
+    }
+
+
+def test_normalize_batch_matches_the_baseline_parsing_rules(app):
+    snapshots = [
+        snapshot(
+            "https://www.google.com/maps/place/x/data=!3d-6.97!4d110.43", name=f"TB \"Maju\" & Jaya {index}",
+            phone=phone, address=address, rating_text=rating, reviews_text=reviews, category="Toko", zone="Semarang",
+        )
+        for index, (phone, address, (rating, reviews)) in enumerate(
+            itertools.product(PHONES, ADDRESSES, REVIEWS)
+        )
+    ]
+    records = normalize_batch(snapshots)
+    assert len(records) == len(snapshots)
+    for raw, record in zip(snapshots, records):
+        expected = baseline_fields(app, raw)
+        assert {name: record[name] for name in expected} == expected, raw
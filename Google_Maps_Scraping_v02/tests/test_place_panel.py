@@ -0,0 +1,12 @@
+import os
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_v01_copy_of_the_place_panel_extractor_matches():
+    # App.py (v01) membawa salinan sendiri agar bisa dijalankan tanpa folder v02
+    with open(os.path.join(PACKAGE_DIR, "place_panel.js"), encoding="utf-8") as file:
+        original = file.read()
+    with open(os.path.join(PACKAGE_DIR, "..", "Google_Maps_Scraping_v01", "place_panel.js"), encoding="utf-8") as file:
+        copy = file.read()
+    assert copy == original
@@ -0,0 +1,105 @@
+import pytest
+
+import rate_control
+from rate_control import RateController, TokenBucket, blocked_page_reason, cooldown_seconds
+
+
+class Clock:
+    """Stands in for the time module: sleep() only moves the clock forward."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    monotonic = time
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_control, "time", clock)
+    return clock
+
+
+def test_token_bucket_spends_the_burst_then_waits_for_new_tokens(clock):
+    bucket = TokenBucket(rate=2, burst=2)
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.slept == []
+    bucket.acquire()
+    assert clock.slept == [pytest.approx(0.5)]
+    assert bucket.waited == pytest.approx(0.5)
+
+
+def test_token_bucket_without_a_rate_never_waits(clock):
+    bucket = TokenBucket(rate=0)
+    for _ in range(100):
+        bucket.acquire()
+    assert clock.slept == []
+
+
+def test_limit_grows_by_one_after_limit_fast_panel_opens(clock):
+    rate = RateController(max_concurrency=4, latency_factor=0)
+    rate.limit = 2
+    rate.success(1.0)
+    assert rate.limit == 2
+    rate.success(1.0)
+    assert rate.limit == 3
+    for _ in range(3):
+        rate.success(1.0)
+    assert rate.limit == 4
+    rate.success(1.0)
+    assert rate.limit == 4
+
+
+def test_timeouts_halve_the_limit_at_most_once_per_second(clock):
+    rate = RateController(max_concurrency=8, min_concurrency=1)
+    rate.timeout()
+    rate.timeout()
+    assert rate.limit == 4
+    clock.now += 1.5
+    rate.timeout()
+    assert rate.limit == 2
+    assert rate.timeouts == 3
+
+
+def test_panel_slower_than_the_baseline_halves_the_limit(clock):
+    rate = RateController(max_concurrency=8, latency_factor=2.0, window=4)
+    for _ in range(4):
+        rate.success(1.0)
+    assert rate.baseline == 1.0
+    rate.success(1.9)
+    assert rate.limit == 8
+    rate.success(2.5)
+    assert rate.limit == 4
+
+
+def test_block_page_drops_to_the_minimum_and_pauses_with_a_growing_cooldown(clock):
+    rate = RateController(max_concurrency=8, min_concurrency=2, block_base=30, block_cap=600)
+    first = rate.blocked()
+    assert rate.limit == 2
+    assert 15 <= first <= 30
+    assert rate.paused_until == clock.now + first
+    second = rate.blocked()
+    assert 30 <= second <= 60
+    assert rate.paused_until == clock.now + max(first, second)
+
+
+def test_cooldown_keeps_at_least_half_of_the_capped_delay():
+    for attempt in range(10):
+        delay = min(600, 30 * 2 ** attempt)
+        assert delay / 2 <= cooldown_seconds(attempt, 30, 600) <= delay
+
+
+def test_blocked_page_reason():
+    assert blocked_page_reason("https://www.google.com/sorry/index?continue=x") == "captcha"
+    assert blocked_page_reason("https://consent.google.com/ml?continue=x") == "consent"
+    assert blocked_page_reason("https://www.google.com/maps/search/toko") is None
+    assert blocked_page_reason(None) is None
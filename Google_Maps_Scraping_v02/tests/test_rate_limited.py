@@ -0,0 +1,101 @@
+import time
+from types import SimpleNamespace
+
+from rate_control import RateController
+
+
+class EmptySearchDriver:
+    """Driver whose search loads a results pane without cards."""
+
+    current_url = "https://www.google.com/maps/search/toko/@-6.9,110.4,14z"
+
+    def get(self, url):
+        pass
+
+    def execute_script(self, script, *args):
+        return None
+
+    def find_elements(self, by, value):
+        return ["results pane"]
+
+
+class SlowWait:
+    """WebDriverWait that gives up after advancing the clock by its timeout."""
+
+    clock = [1_000_000.0]
+    error = Exception
+
+    def __init__(self, driver, timeout):
+        self.driver = driver
+        self.timeout = timeout
+
+    def until(self, condition):
+        condition(self.driver)
+        self.clock[0] += self.timeout
+        raise self.error()
+
+
+def session_with(app, rate):
+    return app.ScrapeSession(None, rate=rate)
+
+
+def fake_clock(monkeypatch, app):
+    monkeypatch.setattr(SlowWait, "error", app.TimeoutException)
+    monkeypatch.setattr(app, "WebDriverWait", SlowWait)
+    monkeypatch.setattr(time, "time", lambda: SlowWait.clock[0])
+
+
+def test_empty_search_leaves_the_limit_unchanged(app, monkeypatch):
+    fake_clock(monkeypatch, app)
+    rate = RateController(max_concurrency=8, window=1)
+    rate.success(0.5)
+    session = session_with(app, rate)
+    driver = EmptySearchDriver()
+    tile = SimpleNamespace(url=lambda query: "https://www.google.com/maps/search/toko")
+
+    outcome, seconds = app.rate_limited(session, driver, app.open_tile, driver, tile, "toko")
+
+    assert outcome == "empty"
+    assert seconds == 10
+    assert rate.limit == 8
+    assert rate.timeouts == 0
+
+
+def test_slow_panel_halves_the_limit(app, monkeypatch):
+    fake_clock(monkeypatch, app)
+    rate = RateController(max_concurrency=8, window=1)
+    rate.success(0.5)
+    session = session_with(app, rate)
+
+    def slow_panel():
+        SlowWait.clock[0] += 5
+        return {"name": "TB Subur Makmur"}
+
+    place, seconds = app.rate_limited(session, None, slow_panel, panel=True)
+
+    assert place["name"] == "TB Subur Makmur"
+    assert seconds == 5
+    assert rate.limit == 4
+
+
+def test_seconds_exclude_the_wait_for_a_slot(app, monkeypatch):
+    fake_clock(monkeypatch, app)
+    rate = RateController(max_concurrency=1)
+    rate.paused_until = SlowWait.clock[0] - 1
+    session = session_with(app, rate)
+    original_slot = rate.slot
+
+    def slow_slot():
+        # Antre slot dan token selama 30 detik sebelum permintaan berjalan
+        SlowWait.clock[0] += 30
+        return original_slot()
+
+    monkeypatch.setattr(rate, "slot", slow_slot)
+
+    def panel():
+        SlowWait.clock[0] += 2
+        return {}
+
+    _, seconds = app.rate_limited(session, None, panel, panel=True)
+
+    assert seconds == 2
@@ -0,0 +1,46 @@
+import re
+
+import pytest
+
+from refresh import RefreshIndex, parse_rating, parse_review_count
+from sink import StreamingSink
+
+FIELDS = ["name", "reviews_score", "reviews_amount", "googlemaps_link"]
+
+
+def place_id(url):
+    match = re.search(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)", url or "")
+    return match.group(1) if match else None
+
+
+def record(number, score, amount):
+    return {
+        "name": f"TB Maju {number}", "reviews_score": score, "reviews_amount": amount,
+        "googlemaps_link": f"https://www.google.com/maps/place/TB+Maju/data=!4m5!3m4!1s0x2e70:0x{number}",
+    }
+
+
+@pytest.mark.parametrize("value, expected", [("4,5", 4.5), ("4.5", 4.5), (4.46, 4.5), ("", None), ("baru", None)])
+def test_parse_rating(value, expected):
+    assert parse_rating(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [("(1.234)", 1234), ("1.234", 1234), (27, 27), ("", None), ("()", None)])
+def test_parse_review_count(value, expected):
+    assert parse_review_count(value) == expected
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_only_cards_with_the_same_rating_and_review_count_are_carried(tmp_path, fmt):
+    path = str(tmp_path / f"previous.{fmt}")
+    sink = StreamingSink(path, FIELDS, fmt=fmt)
+    for place in (record(1, "4,5", "1234"), record(2, "4,0", "10"), {"name": "no link", "googlemaps_link": ""}):
+        sink.write(place)
+    sink.close()
+
+    index = RefreshIndex.load(path, place_id)
+    assert len(index) == 2
+    assert index.unchanged("0x2e70:0x1", "4,5", "(1.234)")["name"] == "TB Maju 1"
+    assert index.unchanged("0x2e70:0x2", "4,0", "(11)") is None
+    assert index.unchanged("0x2e70:0x3", "5,0", "(1)") is None
+    assert (index.carried, index.changed, index.new) == (1, 1, 1)
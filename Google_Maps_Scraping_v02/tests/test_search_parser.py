@@ -0,0 +1,59 @@
+import glob
+import json
+import os
+import re
+
+import pytest
+
+from fixture_server import DEFAULT_DATA, load_places
+from search_parser import (
+    XSSI_PREFIX, parse_app_initialization_state, parse_place, parse_search_response,
+)
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = sorted(glob.glob(os.path.join(PACKAGE_DIR, "fixtures", "search", "*.txt")))
+
+
+def read(path):
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+
+def feature_id(place):
+    return re.search(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)", place["googlemaps_link"]).group(1)
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+def test_every_fixture_page_yields_twenty_places(path):
+    assert len(parse_search_response(read(path))) == 20
+
+
+def test_fixture_places_match_the_recorded_output():
+    recorded = {place["feature_id"]: place for place in load_places(DEFAULT_DATA)}
+    parsed = [place for path in FIXTURES for place in parse_search_response(read(path))]
+    # Halaman hasil yang direkam bisa mengulang tempat yang sama
+    assert len(parsed) == 100
+    for place in parsed:
+        source = recorded[feature_id(place)]
+        assert place["name"] == source["name"]
+        assert place["full_address"] == source["address"]
+        assert re.sub(r"\D", "", place["phone"]) == re.sub(r"\D", "", source["phone"])
+        assert (place["latitude"], place["longitude"]) == (source["latitude"], source["longitude"])
+        # Tempat tanpa ulasan tidak punya rating maupun jumlah ulasan di payload
+        assert place["reviews_score"] == (float(source["rating"]) if source["rating"] else None)
+        assert place["reviews_amount"] == (int(source["reviews"]) if source["reviews"] else None)
+        assert f"!3d{source['latitude']}!4d{source['longitude']}" in place["googlemaps_link"]
+
+
+def test_app_initialization_state_carries_the_same_places():
+    payload = json.loads(read(FIXTURES[0]).strip().removesuffix('/*""*/'))["d"]
+    state = [None, None, None, [None, "not a payload", payload]]
+    assert parse_app_initialization_state(state) == parse_search_response(read(FIXTURES[0]))
+    assert payload.startswith(XSSI_PREFIX)
+
+
+def test_places_without_a_name_or_feature_id_and_broken_payloads_are_skipped():
+    assert parse_place(None) is None
+    assert parse_place([None] * 12) is None
+    assert parse_search_response("<html>sorry</html>") == []
+    assert parse_search_response(")]}'\n[]") == []
@@ -0,0 +1,146 @@
+import os
+
+import pytest
+
+from sink import StreamingSink, iter_records, write_xlsx
+
+FIELDS = ["name", "phone", "reviews_score", "reviews_amount", "latitude", "longitude"]
+
+
+def place(number, zone="Semarang"):
+    return {
+        "name": f"TB Maju {number}", "phone": "", "reviews_score": "4,5", "reviews_amount": str(number),
+        "latitude": "-6.97", "longitude": "110.43", "category": "Toko Bahan Bangunan", "zone": zone,
+    }
+
+
+def test_csv_sink_calls_on_flush_with_the_sources_of_each_batch(tmp_path):
+    flushed = []
+    sink = StreamingSink(str(tmp_path / "out.csv"), FIELDS, batch_size=2, on_flush=flushed.append)
+    for number in range(3):
+        sink.write(place(number), source=number)
+    assert flushed == [[0, 1]]
+    sink.close()
+    assert flushed == [[0, 1], [2]]
+    assert [record["name"] for record in iter_records(str(tmp_path / "out.csv"))] == ["TB Maju 0", "TB Maju 1", "TB Maju 2"]
+
+
+
+def test_jsonl_sink_round_trips_values_with_newlines_and_commas(tmp_path):
+    path = str(tmp_path / "out.jsonl")
+    sink = StreamingSink(path, FIELDS, fmt="jsonl", batch_size=10)
+    sink.write(dict(place(1), name="TB Maju, Jaya\nCabang 2"))
+    assert list(iter_records(path, "jsonl")) == []
+    sink.close()
+    assert [record["name"] for record in iter_records(path, "jsonl")] == ["TB Maju, Jaya\nCabang 2"]
+
+
+def test_xlsx_export_keeps_numeric_columns_as_numbers(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    sink = StreamingSink(str(tmp_path / "out.csv"), FIELDS)
+    sink.write(dict(place(1234), reviews_amount="1234", latitude="-6.97", phone=""))
+    sink.close()
+    write_xlsx(sink.path, str(tmp_path / "out.xlsx"), FIELDS, numeric_fields=("reviews_amount", "latitude"))
+    rows = list(openpyxl.load_workbook(tmp_path / "out.xlsx").active.iter_rows(values_only=True))
+    assert rows[0] == tuple(FIELDS)
+    assert rows[1] == ("TB Maju 1234", None, "4,5", 1234, -6.97, "110.43")
+
+def parquet_files(path):
+    return [name for _, _, names in os.walk(path) for name in names if name.endswith(".parquet")]
+
+
+def test_parquet_round_trip_keeps_types_and_partitions(tmp_path):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    from sink import ParquetSink
+
+    path = str(tmp_path / "out.parquet")
+    sink = ParquetSink(path, FIELDS, batch_size=2)
+    for number in range(5):
+        sink.write(place(number, zone="Semarang" if number % 2 else "Kendal"))
+    sink.close()
+
+    frame = pd.read_parquet(path).sort_values("reviews_amount")
+    assert list(frame["reviews_amount"]) == [0, 1, 2, 3, 4]
+    assert frame["reviews_score"].tolist() == [4.5] * 5
+    assert frame["phone"].isna().all()
+    assert sorted(frame["zone"].astype(str).unique()) == ["Kendal", "Semarang"]
+    # Satu file per partisi, bukan satu per batch
+    assert len(parquet_files(path)) == 2
+
+
+def test_parquet_batches_are_on_disk_before_on_flush(tmp_path):
+    pytest.importorskip("pyarrow")
+    from sink import ParquetSink
+
+    path = str(tmp_path / "out.parquet")
+    staged = []
+
+    def on_flush(sources):
+        staged.append(sum(1 for _ in open(sink.staging_path, encoding="utf-8")))
+
+    sink = ParquetSink(path, FIELDS, batch_size=2, on_flush=on_flush)
+    for number in range(4):
+        sink.write(place(number))
+    assert staged == [2, 4]
+    sink.close()
+
+
+def test_parquet_staging_left_by_a_crash_is_compacted_on_reopen(tmp_path):
+    pytest.importorskip("pyarrow")
+    from sink import ParquetSink
+
+    path = str(tmp_path / "out.parquet")
+    crashed = ParquetSink(path, FIELDS, batch_size=1)
+    crashed.write(place(1))
+    crashed.staging.write('{"name": "TB Terpo')
+    crashed.staging.flush()
+
+    ParquetSink(path, FIELDS, append=True).close()
+
+    records = list(iter_records(path, "parquet"))
+    assert [record["name"] for record in records] == ["TB Maju 1"]
+    assert not [name for name in os.listdir(path) if name.startswith("_staging-")]
+
+
+def by_name(record):
+    return record.get("name")
+
+
+def test_reopened_csv_drops_a_torn_line_and_skips_rows_already_written(tmp_path):
+    path = str(tmp_path / "out.csv")
+    sink = StreamingSink(path, FIELDS, batch_size=2)
+    for number in range(2):
+        sink.write(place(number))
+    sink.close()
+    # Crash di tengah menulis batch berikutnya
+    with open(path, "a", encoding="utf-8") as file:
+        file.write("TB Maju 2,,4")
+
+    flushed = []
+    sink = StreamingSink(path, FIELDS, batch_size=2, append=True, on_flush=flushed.append, key=by_name)
+    assert sink.existing_keys == {"TB Maju 0", "TB Maju 1"}
+    # Tempat 1 sudah ditulis tapi belum dicatat di progress sebelum crash
+    sink.write(place(1), source=1)
+    sink.write(place(2), source=2)
+    sink.close()
+
+    assert flushed == [[1, 2]]
+    assert [record["name"] for record in iter_records(path)] == ["TB Maju 0", "TB Maju 1", "TB Maju 2"]
+
+
+def test_reopened_parquet_skips_rows_already_written(tmp_path):
+    pytest.importorskip("pyarrow")
+    from sink import ParquetSink
+
+    path = str(tmp_path / "out.parquet")
+    sink = ParquetSink(path, FIELDS, batch_size=1)
+    sink.write(place(1))
+    sink.close()
+
+    sink = ParquetSink(path, FIELDS, batch_size=1, append=True, key=by_name)
+    sink.write(place(1))
+    sink.write(place(2))
+    sink.close()
+
+    assert sorted(record["name"] for record in iter_records(path, "parquet")) == ["TB Maju 1", "TB Maju 2"]
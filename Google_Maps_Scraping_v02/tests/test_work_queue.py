@@ -0,0 +1,82 @@
+import pytest
+
+import work_queue
+from work_queue import WorkQueue
+
+UNITS = [("Toko Bahan Bangunan", "Semarang", ""), ("Toko Besi", "Semarang", "")]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(work_queue, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite3"), max_attempts=2)
+    queue.enqueue(UNITS)
+    yield queue
+    queue.close()
+
+
+def test_enqueue_ignores_units_already_in_the_queue(queue):
+    assert queue.enqueue(UNITS + [("Toko Cat", "Semarang", "")]) == 1
+    assert queue.counts()["queued"] == 3
+
+
+def test_each_unit_is_leased_to_one_worker_at_a_time(queue):
+    first = queue.lease("a", lease_seconds=60)
+    second = queue.lease("b", lease_seconds=60)
+    assert (first.category, second.category) == ("Toko Bahan Bangunan", "Toko Besi")
+    assert queue.lease("c", lease_seconds=60) is None
+
+
+def test_expired_lease_goes_to_the_next_worker(queue, clock):
+    unit = queue.lease("a", lease_seconds=60)
+    queue.lease("b", lease_seconds=60)
+    clock.now += 61
+    retry = queue.lease("c", lease_seconds=60)
+    assert (retry.id, retry.attempts) == (unit.id, 2)
+    # Worker lama tidak bisa lagi memperpanjang atau menyelesaikan unit yang sudah pindah tangan
+    assert not queue.heartbeat(unit.id, "a")
+    assert not queue.complete(unit.id, "a", "partial-a.csv")
+    assert queue.complete(unit.id, "c", "partial-c.csv")
+    assert [partial for _, partial in queue.done_units()] == ["partial-c.csv"]
+
+
+def test_heartbeat_keeps_a_lease_alive(queue, clock):
+    unit = queue.lease("a", lease_seconds=60)
+    clock.now += 50
+    assert queue.heartbeat(unit.id, "a", lease_seconds=60)
+    clock.now += 50
+    queue.lease("b", lease_seconds=60)
+    assert queue.lease("c", lease_seconds=60) is None
+
+
+def test_lease_expiring_after_the_last_attempt_fails_the_unit(queue, clock):
+    for worker in ("a", "b"):
+        unit = queue.lease(worker, lease_seconds=60)
+        assert unit.category == "Toko Bahan Bangunan"
+        clock.now += 61
+    queue.lease("c", lease_seconds=60)
+    assert queue.counts()["failed"] == 1
+
+
+def test_fail_requeues_until_the_retry_cap(queue):
+    unit = queue.lease("a")
+    queue.fail(unit.id, "a", "timeout")
+    assert queue.lease("b").id == unit.id
+    queue.fail(unit.id, "b", "timeout")
+    assert queue.counts() == {"failed": 1, "queued": 1}
+    queue.complete(queue.lease("c").id, "c", "partial.csv")
+    assert queue.is_finished()
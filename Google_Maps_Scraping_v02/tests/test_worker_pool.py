@@ -0,0 +1,46 @@
+import queue
+import threading
+
+import pytest
+
+
+def failing_session(app):
+    session = app.ScrapeSession(None)
+
+    def open_driver():
+        raise OSError("chrome not found")
+
+    session.open_driver = open_driver
+    return session
+
+
+def test_detail_pool_fails_when_no_worker_started_chrome(app):
+    session = failing_session(app)
+    pool = app.DetailPool(2, session)
+    urls = ["https://maps.test/place/a/data=!1s0x1:0x1", "https://maps.test/place/b/data=!1s0x2:0x2"]
+    for url in urls:
+        assert session.claim_place(url)
+    pool.submit_search(urls, "Toko Bahan Bangunan", "Semarang")
+
+    with pytest.raises(RuntimeError, match="2 URL"):
+        pool.close()
+    # Tempat yang tidak dibuka boleh diklaim lagi oleh run berikutnya
+    assert session.claim_place(urls[0])
+
+
+def test_worker_pool_stops_when_every_worker_died(app):
+    session = failing_session(app)
+    config = {"categories": ["Toko Bahan Bangunan"], "target_locations": ["Semarang", "Kendal"]}
+    finished = threading.Event()
+    errors = queue.Queue()
+
+    def run():
+        try:
+            app.run_worker_pool(config, session, workers=2)
+        except RuntimeError as e:
+            errors.put(e)
+        finished.set()
+
+    threading.Thread(target=run, daemon=True).start()
+    assert finished.wait(10)
+    assert "2 pencarian" in str(errors.get_nowait())
@@ -0,0 +1,178 @@
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+LEASE_SECONDS = 120
+MAX_ATTEMPTS = 3
+
+
+@dataclass
+class WorkUnit:
+    """One leased search: category × location, optionally a single map tile."""
+    id: int
+    category: str
+    location: str
+    tile: str
+    attempts: int
+
+
+class WorkQueue:
+    """SQLite queue of work units leased by worker processes on one or more nodes.
+
+    A lease expires after lease_seconds unless the worker sends heartbeats;
+    an expired unit is handed to the next worker asking for work, up to
+    max_attempts times. Every worker opens the same file, so it has to live
+    on a disk all of them can reach with working file locks.
+    """
+
+    def __init__(self, path, reset=False, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        # isolation_level=None: transaksi diatur sendiri dengan BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        with self.lock:
+            if reset:
+                self.conn.execute("DROP TABLE IF EXISTS units")
+                self.conn.execute("DROP TABLE IF EXISTS meta")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS units ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, category TEXT, location TEXT, tile TEXT, "
+                "status TEXT DEFAULT 'queued', worker TEXT, lease_expires REAL, attempts INTEGER DEFAULT 0, "
+                "partial TEXT, error TEXT, UNIQUE (category, location, tile))"
+            )
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def set_meta(self, key, value):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+
+    def get_meta(self, key, default=None):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def enqueue(self, units):
+        """Adds (category, location, tile_key) units; units already in the queue are ignored."""
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO units (category, location, tile) VALUES (?, ?, ?)",
+                [(category, location, tile or "") for category, location, tile in units],
+            )
+            self.conn.execute("COMMIT")
+            return self.conn.total_changes - before
+
+    def lease(self, worker, lease_seconds=LEASE_SECONDS):
+        """Leases the next queued or expired unit to worker, or returns None."""
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Lease yang kedaluwarsa setelah percobaan terakhir dianggap gagal
+                self.conn.execute(
+                    "UPDATE units SET status = 'failed', error = 'lease expired' "
+                    "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                    (now, self.max_attempts),
+                )
+                row = self.conn.execute(
+                    "SELECT id, category, location, tile, attempts FROM units "
+                    "WHERE status = 'queued' OR (status = 'leased' AND lease_expires < ?) "
+                    "ORDER BY id LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    self.conn.execute("COMMIT")
+                    return None
+                self.conn.execute(
+                    "UPDATE units SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 "
+                    "WHERE id = ?",
+                    (worker, now + lease_seconds, row[0]),
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        unit_id, category, location, tile, attempts = row
+        return WorkUnit(unit_id, category, location, tile, attempts + 1)
+
+    def heartbeat(self, unit_id, worker, lease_seconds=LEASE_SECONDS):
+        """Extends a lease; False if the unit is no longer leased to worker."""
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE units SET lease_expires = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + lease_seconds, unit_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, unit_id, worker, partial):
+        """Records the partial result file of a unit; False if the lease was lost meanwhile."""
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE units SET status = 'done', partial = ?, lease_expires = NULL "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (partial, unit_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, unit_id, worker, error):
+        """Gives a unit back for a retry, or marks it failed after max_attempts."""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE units SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "error = ?, lease_expires = NULL WHERE id = ? AND worker = ? AND status = 'leased'",
+                (self.max_attempts, error, unit_id, worker),
+            )
+
+    def counts(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM units GROUP BY status").fetchall()
+        return Counter(dict(rows))
+
+    def is_finished(self):
+        counts = self.counts()
+        return counts["queued"] == 0 and counts["leased"] == 0
+
+    def done_units(self):
+        """(WorkUnit, partial path) of every finished unit, in queue order."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, category, location, tile, attempts, partial FROM units "
+                "WHERE status = 'done' ORDER BY id"
+            ).fetchall()
+        return [(WorkUnit(*row[:5]), row[5]) for row in rows]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class LeaseHeartbeat:
+    """Background thread that keeps a unit's lease alive while it is being scraped."""
+
+    def __init__(self, queue: WorkQueue, unit: WorkUnit, worker, lease_seconds=LEASE_SECONDS):
+        self.queue = queue
+        self.unit = unit
+        self.worker = worker
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+
+    def _run(self):
+        while not self.stopped.wait(self.lease_seconds / 3):
+            if not self.queue.heartbeat(self.unit.id, self.worker, self.lease_seconds):
+                self.lost = True
+                print(f"❓ Lease on unit {self.unit.id} lost")
+                return